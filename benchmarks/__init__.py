@@ -0,0 +1,26 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Benchmarks for pygls' hot paths.
+
+Benchmarks follow `asv <https://asv.readthedocs.io>`__'s conventions: each
+``bench_*.py`` module contains classes whose ``time_*`` methods are timed, once for
+each combination of the class's ``params``. ``setup`` and ``teardown`` methods, if
+present, are called with the same parameters before and after timing.
+
+Run the suite using ``python -m benchmarks``, see ``python -m benchmarks --help``
+for details.
+"""
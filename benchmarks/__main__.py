@@ -0,0 +1,161 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Run the benchmark suite.
+
+Results can be saved to a file with ``--json`` and compared against in a later run
+with ``--compare``, in which case the exit code indicates if any benchmark has
+regressed beyond the given ``--threshold``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import pathlib
+import platform
+import re
+import statistics
+import sys
+import timeit
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+HERE = pathlib.Path(__file__).parent
+
+
+def iter_benchmarks(
+    pattern: Optional[str],
+) -> Iterator[Tuple[str, type, str, Tuple[Any, ...]]]:
+    """Yield the name, class, method and parameters of each benchmark."""
+    for path in sorted(HERE.glob("bench_*.py")):
+        module = importlib.import_module(f"{__package__}.{path.stem}")
+
+        for cls_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+
+            params: List[Any] = getattr(cls, "params", [])
+            if len(getattr(cls, "param_names", [])) <= 1:
+                params = [params] if params else []
+
+            for method in sorted(m for m in dir(cls) if m.startswith("time_")):
+                for combination in itertools.product(*params):
+                    args = ", ".join(map(str, combination))
+                    name = f"{path.stem}.{cls_name}.{method}({args})"
+
+                    if pattern is None or re.search(pattern, name):
+                        yield name, cls, method, combination
+
+
+def run_benchmark(
+    cls: type, method: str, params: Tuple[Any, ...], repeat: int
+) -> Optional[List[float]]:
+    """Time the given benchmark, returning the time taken per call for each
+    repetition, or ``None`` if the benchmark was skipped."""
+    instance = cls()
+
+    try:
+        if hasattr(instance, "setup"):
+            instance.setup(*params)
+    except NotImplementedError:
+        return None
+
+    try:
+        func = getattr(instance, method)
+        timer = timeit.Timer(lambda: func(*params))
+
+        number, _ = timer.autorange()
+        return [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    finally:
+        if hasattr(instance, "teardown"):
+            instance.teardown(*params)
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f}{unit}"
+
+    return f"{seconds / 1e-9:.1f}ns"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument(
+        "-k", dest="pattern", help="only run benchmarks matching the given regex"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="number of samples to take (default: 5)"
+    )
+    parser.add_argument("--json", type=pathlib.Path, help="save the results to a file")
+    parser.add_argument(
+        "--compare", type=pathlib.Path, help="compare against previously saved results"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown considered a regression (default: 0.1)",
+    )
+    args = parser.parse_args(argv)
+
+    baseline: Dict[str, Dict[str, float]] = {}
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["results"]
+
+    results: Dict[str, Dict[str, float]] = {}
+    regressions = []
+
+    for name, cls, method, params in iter_benchmarks(args.pattern):
+        samples = run_benchmark(cls, method, params, args.repeat)
+        if samples is None:
+            print(f"{name:<72} skipped")
+            continue
+
+        median = statistics.median(samples)
+        results[name] = {"median": median, "min": min(samples)}
+        line = f"{name:<72} {format_time(median):>10} (min {format_time(min(samples))})"
+
+        if (previous := baseline.get(name)) is not None:
+            ratio = median / previous["median"]
+            line += f" {ratio:.2f}x"
+
+            if ratio > 1 + args.threshold:
+                line += " REGRESSION"
+                regressions.append(name)
+
+        print(line, flush=True)
+
+    if args.json:
+        data = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        args.json.write_text(json.dumps(data, indent=2))
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
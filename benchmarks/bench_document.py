@@ -0,0 +1,149 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Editing documents and converting positions."""
+
+from lsprotocol import types
+
+from pygls.workspace import PositionCodec, TextDocument
+from pygls.workspace.diff import compute_text_edits
+
+URI = "file:///bench.txt"
+
+
+def edit(line: int, character: int, text: str, length: int = 0):
+    return types.TextDocumentContentChangePartial(
+        range=types.Range(
+            start=types.Position(line=line, character=character),
+            end=types.Position(line=line, character=character + length),
+        ),
+        text=text,
+    )
+
+
+class IncrementalEdits:
+    """Apply incremental changes to the middle of a document."""
+
+    params = [1_000, 10_000, 100_000]
+    param_names = ["lines"]
+
+    def setup(self, lines: int):
+        source = "".join(f"line {n}: the quick brown fox\n" for n in range(lines))
+        self.document = TextDocument(URI, source)
+        self.line = lines // 2
+
+        # Ensure the document's lines have been computed
+        len(self.document.lines)
+
+    def time_insert_character(self, lines: int):
+        self.document.apply_change(edit(self.line, 0, "x"))
+        self.document.apply_change(edit(self.line, 0, "", length=1))
+
+    def time_insert_line(self, lines: int):
+        self.document.apply_change(edit(self.line, 0, "a new line\n"))
+        self.document.apply_change(
+            types.TextDocumentContentChangePartial(
+                range=types.Range(
+                    start=types.Position(line=self.line, character=0),
+                    end=types.Position(line=self.line + 1, character=0),
+                ),
+                text="",
+            )
+        )
+
+    def time_read_lines(self, lines: int):
+        self.document.apply_change(edit(self.line, 0, "x"))
+        len(self.document.lines)
+        self.document.apply_change(edit(self.line, 0, "", length=1))
+        len(self.document.lines)
+
+
+class FullChanges:
+    """Apply full changes, as sent by clients that do not support incremental
+    synchronization, to a document."""
+
+    params = [1_000, 10_000, 100_000]
+    param_names = ["lines"]
+
+    def setup(self, lines: int):
+        source = "".join(f"line {n}: the quick brown fox\n" for n in range(lines))
+        self.document = TextDocument(
+            URI, source, sync_kind=types.TextDocumentSyncKind.Full
+        )
+
+        middle = source.index(f"line {lines // 2}:")
+        self.changes = [
+            types.TextDocumentContentChangeWholeDocument(
+                text=source[:middle] + "x" + source[middle:]
+            ),
+            types.TextDocumentContentChangeWholeDocument(text=source),
+        ]
+
+    def time_insert_character(self, lines: int):
+        for change in self.changes:
+            self.document.apply_change(change)
+
+
+class FormattingEdits:
+    """Compute the edits needed to reformat 1% of the lines in a document."""
+
+    params = [1_000, 10_000, 100_000]
+    param_names = ["lines"]
+
+    def setup(self, lines: int):
+        source = "".join(f"value_{n} = compute( {n} ,x)\n" for n in range(lines))
+        self.document = TextDocument(URI, source)
+
+        new_lines = list(self.document.lines)
+        for n in range(0, lines, 100):
+            new_lines[n] = f"value_{n} = compute({n}, x)\n"
+
+        self.formatted = "".join(new_lines)
+
+    def time_compute_text_edits(self, lines: int):
+        compute_text_edits(self.document, self.formatted)
+
+
+class PositionConversion:
+    """Convert positions at the end of lines containing mixed scripts."""
+
+    params = [
+        types.PositionEncodingKind.Utf8.value,
+        types.PositionEncodingKind.Utf16.value,
+        types.PositionEncodingKind.Utf32.value,
+    ]
+    param_names = ["encoding"]
+
+    def setup(self, encoding: str):
+        self.codec = PositionCodec(encoding)
+        self.lines = ["ascii text, Ελληνικά, 中文字符, emoji 🐍🚀 " * 4 + "\n"] * 100
+
+        self.server_positions = [
+            types.Position(line=n, character=len(line) - 1)
+            for n, line in enumerate(self.lines)
+        ]
+        self.client_positions = [
+            self.codec.position_to_client_units(self.lines, position)
+            for position in self.server_positions
+        ]
+
+    def time_position_from_client_units(self, encoding: str):
+        for position in self.client_positions:
+            self.codec.position_from_client_units(self.lines, position)
+
+    def time_position_to_client_units(self, encoding: str):
+        for position in self.server_positions:
+            self.codec.position_to_client_units(self.lines, position)
@@ -0,0 +1,66 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Encoding large responses."""
+
+from lsprotocol import types
+
+from pygls.lsp.server import LanguageServer
+
+
+class NullWriter:
+    def close(self):
+        pass
+
+    def write(self, data: bytes):
+        pass
+
+    def writelines(self, data):
+        pass
+
+
+class ResponseEncoding:
+    """Serialize and write the response to a request."""
+
+    params = [1_000, 100_000]
+    param_names = ["items"]
+
+    def setup(self, items: int):
+        self.server = LanguageServer("bench", "v1")
+        self.protocol = self.server.protocol
+        self.protocol.set_writer(NullWriter())
+
+        self.locations = [
+            types.Location(
+                uri=f"file:///src/module_{n % 100}.py",
+                range=types.Range(
+                    start=types.Position(line=n, character=4),
+                    end=types.Position(line=n, character=12),
+                ),
+            )
+            for n in range(items)
+        ]
+        self.numbers = {"numbers": list(range(items))}
+        self.fragment = self.protocol.encode_result(self.locations)
+
+    def time_locations(self, items: int):
+        self.protocol._send_response(1, result=self.locations)
+
+    def time_plain_data(self, items: int):
+        self.protocol._send_response(1, result=self.numbers)
+
+    def time_pre_encoded(self, items: int):
+        self.protocol._send_response(1, result=self.fragment)
@@ -0,0 +1,66 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Framing and decoding of incoming message streams."""
+
+import asyncio
+import io
+import json
+import threading
+
+from pygls.io_ import run, run_async
+from pygls.protocol import JsonRPCProtocol, default_converter
+from pygls.server import JsonRPCServer
+
+MESSAGES = 1_000
+
+
+def frame(body: bytes) -> bytes:
+    return b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+
+
+class Framing:
+    """Read, decode and dispatch a stream of notifications."""
+
+    params = [100, 10_000]
+    param_names = ["message_size"]
+
+    def setup(self, message_size: int):
+        self.server = JsonRPCServer(JsonRPCProtocol, default_converter)
+
+        @self.server.feature("bench/notify")
+        def notify(params):
+            pass
+
+        message = {
+            "jsonrpc": "2.0",
+            "method": "bench/notify",
+            "params": {"text": "x" * message_size},
+        }
+        self.data = frame(json.dumps(message).encode()) * MESSAGES
+
+    def time_run_async(self, message_size: int):
+        async def main():
+            reader = asyncio.StreamReader()
+            reader.feed_data(self.data)
+            reader.feed_eof()
+
+            await run_async(threading.Event(), reader, self.server.protocol)
+
+        asyncio.run(main())
+
+    def time_run(self, message_size: int):
+        run(threading.Event(), io.BytesIO(self.data), self.server.protocol)
@@ -0,0 +1,105 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""End-to-end request round-trips against a server running in a subprocess."""
+
+import asyncio
+import pathlib
+import socket
+import subprocess
+import sys
+import time
+from typing import Optional
+
+from pygls.client import JsonRPCClient
+
+SERVER = pathlib.Path(__file__).parent / "server.py"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class RoundTrip:
+    """Send a request and wait for its response."""
+
+    params = ["stdio", "tcp", "websockets"]
+    param_names = ["transport"]
+
+    def setup(self, transport: str):
+        if transport == "websockets":
+            try:
+                import websockets  # noqa: F401
+            except ImportError:
+                raise NotImplementedError("websockets is not installed")
+
+        self.loop = asyncio.new_event_loop()
+        self.client = JsonRPCClient()
+        self.process: Optional[subprocess.Popen] = None
+
+        if transport == "stdio":
+            self.loop.run_until_complete(
+                self.client.start_io(sys.executable, str(SERVER), "stdio")
+            )
+        else:
+            port = free_port()
+            self.process = subprocess.Popen(
+                [sys.executable, str(SERVER), transport, str(port)]
+            )
+            self.loop.run_until_complete(self.connect(transport, port))
+
+        self.params = {"text": "hello, world", "numbers": list(range(10))}
+
+        # Wait for the server to be ready
+        self.time_request(transport)
+
+    async def connect(self, transport: str, port: int):
+        start = self.client.start_tcp if transport == "tcp" else self.client.start_ws
+        deadline = time.monotonic() + 10
+
+        while True:
+            try:
+                await start("127.0.0.1", port)
+                return
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+
+                await asyncio.sleep(0.05)
+
+    def teardown(self, transport: str):
+        self.client.protocol.notify("exit", {})
+
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+        try:
+            self.loop.run_until_complete(asyncio.wait_for(self.client.stop(), 5))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self.loop.close()
+
+    async def request(self):
+        return await self.client.protocol.send_request_async("bench/echo", self.params)
+
+    def time_request(self, transport: str):
+        self.loop.run_until_complete(self.request())
@@ -0,0 +1,208 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Managing notebook documents in the workspace."""
+
+from lsprotocol import types
+
+from pygls.workspace import Workspace
+
+NOTEBOOK_URI = "file:///bench.ipynb"
+
+
+def cell_uri(n: int) -> str:
+    return f"vscode-notebook-cell:/bench.ipynb#cell{n}"
+
+
+class DocumentLookup:
+    """Look up documents opened in the workspace, as done for every request."""
+
+    params = [10, 1_000]
+    param_names = ["documents"]
+
+    def setup(self, documents: int):
+        self.workspace = Workspace(None)
+        self.uris = [
+            f"file:///path/to/some%20project/file{n}.py" for n in range(documents)
+        ]
+        for uri in self.uris:
+            self.workspace.put_text_document(
+                types.TextDocumentItem(
+                    uri=uri, language_id="python", version=0, text="x = 1\n"
+                )
+            )
+
+    def time_get_text_document(self, documents: int):
+        for uri in self.uris:
+            self.workspace.get_text_document(uri)
+
+
+class FolderLookup:
+    """Find the workspace folder containing a document, in a large multi-root
+    workspace."""
+
+    params = [10, 1_000]
+    param_names = ["folders"]
+
+    def setup(self, folders: int):
+        self.workspace = Workspace(
+            "file:///repo",
+            workspace_folders=[
+                types.WorkspaceFolder(uri=f"file:///repo/packages/pkg{n}", name=str(n))
+                for n in range(folders)
+            ],
+        )
+        self.uri = f"file:///repo/packages/pkg{folders - 1}/src/module/file.py"
+
+    def time_folder_for(self, folders: int):
+        self.workspace.folder_for(self.uri)
+
+
+class FullChangeHunks:
+    """Synchronize a large document whose every third line changes, producing a
+    hunk per changed line."""
+
+    params = [1_000, 10_000, 100_000]
+    param_names = ["lines"]
+
+    def setup(self, lines: int):
+        uri = "file:///bench.txt"
+        original = "".join(f"line {n}: the quick brown fox\n" for n in range(lines))
+        changed = "".join(
+            f"line {n}: the quick brown fox\n" if n % 3 else f"changed {n}\n"
+            for n in range(lines)
+        )
+
+        self.workspace = Workspace(None)
+        self.workspace.put_text_document(
+            types.TextDocumentItem(
+                uri=uri, language_id="plaintext", version=0, text=original
+            )
+        )
+        self.version = 0
+        self.sources = [original, changed]
+        self.document = types.VersionedTextDocumentIdentifier(uri=uri, version=0)
+
+    def time_update_text_document(self, lines: int):
+        self.version += 1
+        self.document.version = self.version
+        self.workspace.update_text_document(
+            self.document,
+            types.TextDocumentContentChangeWholeDocument(
+                text=self.sources[self.version % 2]
+            ),
+        )
+
+
+class NotebookChanges:
+    """Apply changes to a cell in the middle of a notebook."""
+
+    params = [10, 100, 1_000]
+    param_names = ["cells"]
+
+    def setup(self, cells: int):
+        self.workspace = Workspace(None)
+        self.workspace.put_notebook_document(
+            types.DidOpenNotebookDocumentParams(
+                notebook_document=types.NotebookDocument(
+                    uri=NOTEBOOK_URI,
+                    notebook_type="jupyter-notebook",
+                    version=0,
+                    cells=[
+                        types.NotebookCell(
+                            kind=types.NotebookCellKind.Code, document=cell_uri(n)
+                        )
+                        for n in range(cells)
+                    ],
+                ),
+                cell_text_documents=[
+                    types.TextDocumentItem(
+                        uri=cell_uri(n),
+                        language_id="python",
+                        version=0,
+                        text=f"x_{n} = {n}\n",
+                    )
+                    for n in range(cells)
+                ],
+            )
+        )
+
+        middle = cells // 2
+        self.version = 0
+        self.cell = types.NotebookCell(
+            kind=types.NotebookCellKind.Code,
+            document=cell_uri(middle),
+            metadata={"tags": []},
+        )
+        self.edit = types.NotebookDocumentCellContentChanges(
+            document=types.VersionedTextDocumentIdentifier(
+                uri=cell_uri(middle), version=1
+            ),
+            changes=[
+                types.TextDocumentContentChangePartial(
+                    range=types.Range(
+                        start=types.Position(line=0, character=0),
+                        end=types.Position(line=0, character=0),
+                    ),
+                    text="\n",
+                ),
+                types.TextDocumentContentChangePartial(
+                    range=types.Range(
+                        start=types.Position(line=0, character=0),
+                        end=types.Position(line=1, character=0),
+                    ),
+                    text="",
+                ),
+            ],
+        )
+        self.moved = [
+            types.NotebookCell(kind=types.NotebookCellKind.Code, document=cell_uri(n))
+            for n in (middle + 1, middle)
+        ]
+
+    def _change(self, cells: types.NotebookDocumentCellChanges):
+        self.version += 1
+        self.workspace.update_notebook_document(
+            types.DidChangeNotebookDocumentParams(
+                notebook_document=types.VersionedNotebookDocumentIdentifier(
+                    uri=NOTEBOOK_URI, version=self.version
+                ),
+                change=types.NotebookDocumentChangeEvent(cells=cells),
+            )
+        )
+
+    def time_update_cell_data(self, cells: int):
+        self._change(types.NotebookDocumentCellChanges(data=[self.cell]))
+
+    def time_swap_cells(self, cells: int):
+        middle = cells // 2
+        self._change(
+            types.NotebookDocumentCellChanges(
+                structure=types.NotebookDocumentCellChangeStructure(
+                    array=types.NotebookCellArrayChange(
+                        start=middle, delete_count=2, cells=self.moved
+                    )
+                )
+            )
+        )
+
+    def time_edit_cell_concatenated(self, cells: int):
+        concatenated = self.workspace.get_concatenated_notebook_document(
+            notebook_uri=NOTEBOOK_URI
+        )
+        self._change(types.NotebookDocumentCellChanges(text_content=[self.edit]))
+        concatenated.source
+        concatenated.position_to_cell(types.Position(line=cells, character=0))
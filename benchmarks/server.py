@@ -0,0 +1,52 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""A minimal server used by the round-trip benchmarks.
+
+Usage: ``python server.py stdio|tcp|websockets [PORT]``
+"""
+
+import sys
+
+from pygls.protocol import JsonRPCProtocol, default_converter
+from pygls.server import JsonRPCServer
+
+server = JsonRPCServer(JsonRPCProtocol, default_converter)
+
+
+@server.feature("bench/echo")
+def echo(params):
+    return params
+
+
+@server.feature("exit")
+def exit(params):
+    if server._server is None:
+        sys.exit(0)
+
+    # Stop serving tcp/websocket connections
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    transport = sys.argv[1]
+
+    if transport == "tcp":
+        server.start_tcp("127.0.0.1", int(sys.argv[2]))
+    elif transport == "websockets":
+        server.start_ws("127.0.0.1", int(sys.argv[2]))
+    else:
+        server.start_io()
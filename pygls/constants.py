@@ -17,6 +17,7 @@
 
 # Dynamically assigned attributes
 ATTR_EXECUTE_IN_THREAD = "execute_in_thread"
+ATTR_CACHE_RESULT = "cache_result"
 ATTR_COMMAND_TYPE = "command"
 ATTR_FEATURE_TYPE = "feature"
 ATTR_REGISTERED_NAME = "reg_name"
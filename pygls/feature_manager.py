@@ -22,6 +22,7 @@ import logging
 from typing import Any, Callable, Dict, Optional, get_type_hints
 
 from pygls.constants import (
+    ATTR_CACHE_RESULT,
     ATTR_COMMAND_TYPE,
     ATTR_EXECUTE_IN_THREAD,
     ATTR_FEATURE_TYPE,
@@ -35,7 +36,7 @@ from pygls.exceptions import (
     ThreadDecoratorError,
     ValidationError,
 )
-from pygls.lsp import get_method_options_type, is_instance
+from pygls.lsp import METHOD_TO_PARTIAL_RESULT, get_method_options_type, is_instance
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +50,10 @@ def assign_thread_attr(f):
     setattr(f, ATTR_EXECUTE_IN_THREAD, True)
 
 
+def assign_cache_attr(f):
+    setattr(f, ATTR_CACHE_RESULT, True)
+
+
 def get_help_attrs(f):
     return getattr(f, ATTR_REGISTERED_NAME, None), getattr(
         f, ATTR_REGISTERED_TYPE, None
@@ -78,6 +83,10 @@ def is_thread_function(f):
     return getattr(f, ATTR_EXECUTE_IN_THREAD, False)
 
 
+def is_cached_function(f):
+    return getattr(f, ATTR_CACHE_RESULT, False)
+
+
 def wrap_with_server(f, server):
     """Returns a new callable/coroutine with server as first argument."""
     if not has_ls_param_or_annotation(f, type(server)):
@@ -97,6 +106,9 @@ def wrap_with_server(f, server):
         if is_thread_function(f):
             assign_thread_attr(wrapped)
 
+    if is_cached_function(f):
+        assign_cache_attr(wrapped)
+
     return wrapped
 
 
@@ -120,12 +132,14 @@ class FeatureManager:
         self._feature_options = {}
         self._features = {}
         self._commands = {}
+        self._generation = 0
         self.server = server
         self.converter = converter
 
     def add_builtin_feature(self, feature_name: str, func: Callable) -> None:
         """Registers builtin (predefined) feature."""
         self._builtin_features[feature_name] = func
+        self._generation += 1
         logger.info("Registered builtin feature %s", feature_name)
 
     @property
@@ -133,6 +147,29 @@ class FeatureManager:
         """Returns server builtin features."""
         return self._builtin_features
 
+    def cache(self) -> Callable:
+        """Decorator that marks a feature's results as cacheable.
+
+        See :class:`~pygls.result_cache.ResultCache` for details.
+        """
+
+        def decorator(f):
+            # Allow any decorator order
+            try:
+                reg_name = getattr(f, ATTR_REGISTERED_NAME)
+                reg_type = getattr(f, ATTR_REGISTERED_TYPE)
+
+                if reg_type is ATTR_FEATURE_TYPE:
+                    assign_cache_attr(self.features[reg_name])
+                    self._generation += 1
+
+            except AttributeError:
+                assign_cache_attr(f)
+
+            return f
+
+        return decorator
+
     def command(self, command_name: str) -> Callable:
         """Decorator used to register custom commands.
 
@@ -192,6 +229,18 @@ class FeatureManager:
                 logger.error('Feature "%s" is already registered.', feature_name)
                 raise FeatureAlreadyRegisteredError(feature_name)
 
+            if (
+                inspect.isasyncgenfunction(f)
+                and feature_name not in METHOD_TO_PARTIAL_RESULT
+            ):
+                logger.error(
+                    'Feature "%s" does not support partial results.', feature_name
+                )
+                raise ValidationError(
+                    f'Feature "{feature_name}" does not support partial results, '
+                    "it cannot be implemented as an async generator."
+                )
+
             assign_help_attrs(f, feature_name, ATTR_FEATURE_TYPE)
 
             wrapped = wrap_with_server(f, self.server)
@@ -199,6 +248,7 @@ class FeatureManager:
             assign_help_attrs(wrapped, feature_name, ATTR_FEATURE_TYPE)
 
             self._features[feature_name] = wrapped
+            self._generation += 1
 
             if options:
                 options_type = get_method_options_type(feature_name)
@@ -230,6 +280,12 @@ class FeatureManager:
         """Returns registered features"""
         return self._features
 
+    @property
+    def generation(self) -> int:
+        """Incremented whenever the set of registered features (or the way they are
+        executed) changes."""
+        return self._generation
+
     def thread(self) -> Callable:
         """Decorator that mark function to execute it in a thread."""
 
@@ -246,6 +302,7 @@ class FeatureManager:
 
                 if reg_type is ATTR_FEATURE_TYPE:
                     assign_thread_attr(self.features[reg_name])
+                    self._generation += 1
                 elif reg_type is ATTR_COMMAND_TYPE:
                     assign_thread_attr(self.commands[reg_name])
 
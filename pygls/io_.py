@@ -17,17 +17,16 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import re
+import threading
 import typing
 
 from pygls.exceptions import JsonRpcException
 
 if typing.TYPE_CHECKING:
     import logging
-    import threading
-    from collections.abc import Awaitable
+    from collections.abc import Awaitable, Iterable
     from concurrent.futures import ThreadPoolExecutor
     from typing import Any, BinaryIO, Callable, Protocol
 
@@ -44,7 +43,11 @@ if typing.TYPE_CHECKING:
         def read(self, n: int) -> bytes: ...
 
     class Writer(Protocol):
-        """An synchronous writer."""
+        """An synchronous writer.
+
+        Writers may also provide a ``writelines`` method, which will be used in
+        preference to ``write`` when sending a message made up of multiple chunks.
+        """
 
         def close(self) -> None: ...
 
@@ -92,13 +95,22 @@ class StdoutWriter:
 
     def __init__(self, stdout: BinaryIO):
         self._stdout = stdout
+        self._lock = threading.Lock()
 
     def close(self):
         self._stdout.close()
 
     def write(self, data: bytes) -> None:
-        self._stdout.write(data)
-        self._stdout.flush()
+        with self._lock:
+            self._stdout.write(data)
+            self._stdout.flush()
+
+    def writelines(self, data: Iterable[bytes]) -> None:
+        # Messages may be sent from multiple threads, hold the lock so that the
+        # chunks of one message are not interleaved with another.
+        with self._lock:
+            self._stdout.writelines(data)
+            self._stdout.flush()
 
 
 class WebSocketWriter:
@@ -142,6 +154,9 @@ async def run_async(
     content_length = 0
     logger = logger or logging.getLogger(__name__)
 
+    if protocol.watchdog is not None:
+        protocol.watchdog.start()
+
     while not stop_event.is_set():
         # Read a header line
         header = await reader.readline()
@@ -163,7 +178,7 @@ async def run_async(
                 break
 
             try:
-                message = json.loads(body, object_hook=protocol.structure_message)
+                message = protocol.decode_message(body)
                 protocol.handle_message(message)
             except Exception as exc:
                 logger.exception("Unable to handle message")
@@ -205,6 +220,10 @@ def run(
     content_length = 0
     logger = logger or logging.getLogger(__name__)
 
+    if protocol.watchdog is not None:
+        # There is no event loop for the watchdog to watch.
+        logger.warning("The watchdog is not supported by the synchronous main loop")
+
     while not stop_event.is_set():
         # Read a header line
         header = reader.readline()
@@ -226,7 +245,7 @@ def run(
                 break
 
             try:
-                message = json.loads(body, object_hook=protocol.structure_message)
+                message = protocol.decode_message(body)
                 protocol.handle_message(message)
             except Exception as exc:
                 logger.exception("Unable to handle message")
@@ -275,6 +294,9 @@ async def run_websocket(
         )
         return
 
+    if protocol.watchdog is not None:
+        protocol.watchdog.start()
+
     while not stop_event.is_set():
         try:
             logger.debug("waiting for a message...")
@@ -285,7 +307,7 @@ async def run_websocket(
             break
 
         try:
-            message = json.loads(data, object_hook=protocol.structure_message)
+            message = protocol.decode_message(data)
             protocol.handle_message(message)
         except Exception as exc:
             logger.exception("Unable to handle message")
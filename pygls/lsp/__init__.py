@@ -15,11 +15,33 @@
 # limitations under the License.                                           #
 ############################################################################
 import cattrs
-from typing import Any, Callable, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from lsprotocol.types import (
     ALL_TYPES_MAP,
+    CALL_HIERARCHY_INCOMING_CALLS,
+    CALL_HIERARCHY_OUTGOING_CALLS,
     METHOD_TO_TYPES,
+    TEXT_DOCUMENT_CODE_ACTION,
+    TEXT_DOCUMENT_CODE_LENS,
+    TEXT_DOCUMENT_COLOR_PRESENTATION,
+    TEXT_DOCUMENT_COMPLETION,
+    TEXT_DOCUMENT_DECLARATION,
+    TEXT_DOCUMENT_DEFINITION,
+    TEXT_DOCUMENT_DOCUMENT_COLOR,
+    TEXT_DOCUMENT_DOCUMENT_HIGHLIGHT,
+    TEXT_DOCUMENT_DOCUMENT_LINK,
+    TEXT_DOCUMENT_DOCUMENT_SYMBOL,
+    TEXT_DOCUMENT_FOLDING_RANGE,
+    TEXT_DOCUMENT_IMPLEMENTATION,
+    TEXT_DOCUMENT_MONIKER,
+    TEXT_DOCUMENT_REFERENCES,
+    TEXT_DOCUMENT_SELECTION_RANGE,
+    TEXT_DOCUMENT_TYPE_DEFINITION,
+    TYPE_HIERARCHY_SUBTYPES,
+    TYPE_HIERARCHY_SUPERTYPES,
+    WORKSPACE_DIAGNOSTIC,
+    WORKSPACE_SYMBOL,
     TEXT_DOCUMENT_DID_SAVE,
     TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL,
     TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL_DELTA,
@@ -35,6 +57,8 @@ from lsprotocol.types import (
     SemanticTokensLegend,
     SemanticTokensRegistrationOptions,
     ShowDocumentResult,
+    WorkspaceDiagnosticReport,
+    WorkspaceDiagnosticReportPartialResult,
 )
 
 from pygls.exceptions import MethodTypeNotRegisteredError
@@ -61,6 +85,37 @@ METHOD_TO_OPTIONS = {
     WORKSPACE_WILL_RENAME_FILES: FileOperationRegistrationOptions,
 }
 
+# Methods whose results can be streamed as partial results. Most return a list of
+# items, each partial result being a list of further items. The others are mapped to
+# the (result type, partial result type) whose ``items`` field holds the list.
+METHOD_TO_PARTIAL_RESULT: Dict[str, Optional[Tuple[Any, Any]]] = {
+    CALL_HIERARCHY_INCOMING_CALLS: None,
+    CALL_HIERARCHY_OUTGOING_CALLS: None,
+    TEXT_DOCUMENT_CODE_ACTION: None,
+    TEXT_DOCUMENT_CODE_LENS: None,
+    TEXT_DOCUMENT_COLOR_PRESENTATION: None,
+    TEXT_DOCUMENT_COMPLETION: None,
+    TEXT_DOCUMENT_DECLARATION: None,
+    TEXT_DOCUMENT_DEFINITION: None,
+    TEXT_DOCUMENT_DOCUMENT_COLOR: None,
+    TEXT_DOCUMENT_DOCUMENT_HIGHLIGHT: None,
+    TEXT_DOCUMENT_DOCUMENT_LINK: None,
+    TEXT_DOCUMENT_DOCUMENT_SYMBOL: None,
+    TEXT_DOCUMENT_FOLDING_RANGE: None,
+    TEXT_DOCUMENT_IMPLEMENTATION: None,
+    TEXT_DOCUMENT_MONIKER: None,
+    TEXT_DOCUMENT_REFERENCES: None,
+    TEXT_DOCUMENT_SELECTION_RANGE: None,
+    TEXT_DOCUMENT_TYPE_DEFINITION: None,
+    TYPE_HIERARCHY_SUBTYPES: None,
+    TYPE_HIERARCHY_SUPERTYPES: None,
+    WORKSPACE_DIAGNOSTIC: (
+        WorkspaceDiagnosticReport,
+        WorkspaceDiagnosticReportPartialResult,
+    ),
+    WORKSPACE_SYMBOL: None,
+}
+
 
 def get_method_registration_options_type(
     method_name, lsp_methods_map=METHOD_TO_TYPES
@@ -5,6 +5,7 @@ import typing
 from lsprotocol import types
 
 from pygls.exceptions import FeatureRequestError
+from pygls.profiler import Profiler
 
 from ._base_server import BaseLanguageServer
 
@@ -76,6 +77,62 @@ class LanguageServer(BaseLanguageServer):
         self.process_id: int | None = None
         super().__init__(*args, **kwargs)
 
+    def cache(self) -> Callable[[F], F]:
+        """Decorator that marks a feature's results as cacheable.
+
+        Results are cached per document version, so repeat requests for an unchanged
+        document are answered without calling the handler again.
+
+        Example
+        -------
+        ::
+
+           @ls.cache()
+           @ls.feature(types.TEXT_DOCUMENT_FOLDING_RANGE)
+           def folding_ranges(ls, params: types.FoldingRangeParams):
+               ...
+        """
+        return self.protocol.fm.cache()
+
+    def enable_profiler(
+        self, command: str = "pygls.profile", directory: str | None = None
+    ) -> Profiler:
+        """Register a command that allows the client to profile the server.
+
+        The command accepts an action (``start``, ``stop`` or ``status``) and an
+        optional dictionary of options. For example, a client can capture a profile
+        by sending the following ``workspace/executeCommand`` requests::
+
+           {"command": "pygls.profile", "arguments": ["start", {"mode": "sample"}]}
+           {"command": "pygls.profile", "arguments": ["stop"]}
+
+        The response to the ``stop`` action contains the path to the written profile.
+        See :class:`~pygls.profiler.Profiler` for the supported modes.
+
+        This method must be called before the server is initialized.
+
+        Parameters
+        ----------
+        command
+           The name of the command to register
+
+        directory
+           The directory to write profiles to, defaults to the system's temporary
+           directory.
+
+        Returns
+        -------
+        Profiler
+           The profiler controlled by the command
+        """
+        profiler = Profiler(directory)
+
+        @self.command(command)
+        def profile(*args):
+            return profiler.execute_command(*args)
+
+        return profiler
+
     @property
     def client_capabilities(self) -> types.ClientCapabilities:
         """The client's capabilities."""
@@ -0,0 +1,398 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Lightweight, in-process metrics for pygls servers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import typing
+
+from pygls.protocol.json_rpc import wrap_handler
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterator
+    from concurrent.futures import Future
+    from http.server import ThreadingHTTPServer
+    from typing import Any, Dict, List, Optional, Tuple
+
+    from pygls.protocol.json_rpc import HandlerKind, MessageCallback, MessageHandler
+
+logger = logging.getLogger(__name__)
+
+# Each power of two is split into this many sub-buckets, bounding the relative
+# error of any recorded value to 1 / 2**(_SUB_BUCKET_BITS - 1)
+_SUB_BUCKET_BITS = 7
+_SUB_BUCKET_COUNT = 1 << _SUB_BUCKET_BITS
+_SUB_BUCKET_HALF = _SUB_BUCKET_COUNT >> 1
+
+
+def _bucket_index(value: int) -> int:
+    """Return the index of the bucket the given value belongs to."""
+    if value < _SUB_BUCKET_COUNT:
+        return value
+
+    # Keep the top _SUB_BUCKET_BITS bits of the value
+    shift = value.bit_length() - _SUB_BUCKET_BITS
+    mantissa = value >> shift
+    offset = mantissa - _SUB_BUCKET_HALF
+    return _SUB_BUCKET_COUNT + (shift - 1) * _SUB_BUCKET_HALF + offset
+
+
+def _bucket_bounds(index: int) -> Tuple[int, int]:
+    """Return the lowest and highest values that fall into the given bucket."""
+    if index < _SUB_BUCKET_COUNT:
+        return index, index
+
+    shift, offset = divmod(index - _SUB_BUCKET_COUNT, _SUB_BUCKET_HALF)
+    mantissa = offset + _SUB_BUCKET_HALF
+    return mantissa << (shift + 1), ((mantissa + 1) << (shift + 1)) - 1
+
+
+class Histogram:
+    """A histogram of non-negative integer values, in the style of an HDR histogram.
+
+    Values are counted in buckets whose width grows with the magnitude of the value,
+    so that any recorded value can be recovered to within ~1.5% no matter how large
+    it is, while only needing storage for the buckets that are actually used.
+    """
+
+    def __init__(self) -> None:
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def record(self, value: int) -> None:
+        """Record a value."""
+        value = max(int(value), 0)
+        index = _bucket_index(value)
+
+        self._counts[index] = self._counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+
+        if self.min is None or value < self.min:
+            self.min = value
+
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, percentile: float) -> int:
+        """Return the value below which the given percentage of values fall.
+
+        Parameters
+        ----------
+        percentile
+           The percentile to compute, between ``0`` and ``100``
+
+        Returns
+        -------
+        int
+           The highest value equivalent to the requested percentile, or ``0`` if no
+           values have been recorded.
+        """
+        if self.count == 0 or self.max is None:
+            return 0
+
+        target = max(1, round(self.count * percentile / 100))
+        seen = 0
+
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= target:
+                return min(_bucket_bounds(index)[1], self.max)
+
+        return self.max
+
+    def buckets(self) -> Iterator[Tuple[int, int, int]]:
+        """Iterate over the ``(lowest value, highest value, count)`` of each
+        non-empty bucket, in order."""
+        for index in sorted(self._counts):
+            low, high = _bucket_bounds(index)
+            yield low, high, self._counts[index]
+
+
+class MethodMetrics:
+    """The metrics recorded for a single method.
+
+    Durations are recorded in microseconds, payload sizes in bytes.
+
+    Attributes
+    ----------
+    decode_time
+       Time spent parsing and structuring incoming messages
+
+    queue_time
+       Time spent between a message being dispatched and its handler starting to
+       execute, e.g. waiting for a free thread in the thread pool.
+
+    handler_time
+       Time taken for the handler to complete, including any time spent awaiting or
+       waiting on sub-handlers.
+
+    encode_time
+       Time spent serializing and writing the response
+
+    request_bytes
+       The size of incoming messages
+
+    response_bytes
+       The size of outgoing responses
+
+    errors
+       The number of times the handler raised an exception
+
+    cancelled
+       The number of requests that were cancelled
+    """
+
+    def __init__(self) -> None:
+        self.decode_time = Histogram()
+        self.queue_time = Histogram()
+        self.handler_time = Histogram()
+        self.encode_time = Histogram()
+        self.request_bytes = Histogram()
+        self.response_bytes = Histogram()
+        self.errors = 0
+        self.cancelled = 0
+
+    def histograms(self) -> Iterator[Tuple[str, Histogram]]:
+        """Iterate over the name and value of each histogram."""
+        yield "decode_time", self.decode_time
+        yield "queue_time", self.queue_time
+        yield "handler_time", self.handler_time
+        yield "encode_time", self.encode_time
+        yield "request_bytes", self.request_bytes
+        yield "response_bytes", self.response_bytes
+
+
+def _elapsed_us(start: int) -> int:
+    return (time.perf_counter_ns() - start) // 1000
+
+
+class Metrics:
+    """A registry of per-method metrics.
+
+    Metrics are disabled by default, enable them using
+    :meth:`~pygls.server.JsonRPCServer.enable_metrics`::
+
+       metrics = server.enable_metrics(port=9090)
+
+       stats = metrics.method("textDocument/completion")
+       print(stats.handler_time.percentile(99))
+
+    Attributes
+    ----------
+    stalls
+       The number of times the event loop was found to be unresponsive, see
+       :mod:`pygls.watchdog`
+    """
+
+    PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+    """The percentiles reported when exporting metrics."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._methods: Dict[str, MethodMetrics] = {}
+        self.stalls = 0
+
+    def method(self, name: str) -> MethodMetrics:
+        """Return the metrics for the given method."""
+        if (metrics := self._methods.get(name)) is None:
+            metrics = self._methods.setdefault(name, MethodMetrics())
+
+        return metrics
+
+    @property
+    def methods(self) -> Dict[str, MethodMetrics]:
+        """The metrics recorded so far, indexed by method name."""
+        return dict(self._methods)
+
+    def record(self, method: str, histogram: str, value: int) -> None:
+        """Record a value in one of the histograms of the given method."""
+        metrics = self.method(method)
+        with self._lock:
+            getattr(metrics, histogram).record(value)
+
+    def increment(self, method: str, counter: str) -> None:
+        """Increment one of the counters of the given method."""
+        metrics = self.method(method)
+        with self._lock:
+            setattr(metrics, counter, getattr(metrics, counter) + 1)
+
+    def record_stall(self) -> None:
+        """Record that the event loop was found to be unresponsive."""
+        with self._lock:
+            self.stalls += 1
+
+    def record_decode(self, method: str, start: int, size: int) -> None:
+        """Record the decoding of an incoming message.
+
+        Parameters
+        ----------
+        method
+           The method of the message
+
+        start
+           The value of :func:`time.perf_counter_ns` before the message was decoded
+
+        size
+           The size of the message
+        """
+        metrics = self.method(method)
+        with self._lock:
+            metrics.decode_time.record(_elapsed_us(start))
+            metrics.request_bytes.record(size)
+
+    def instrument_handler(
+        self, method: str, handler: MessageHandler, kind: HandlerKind
+    ) -> MessageHandler:
+        """Wrap the given handler so that its queue and execution time are recorded.
+
+        The returned handler should be executed the same way as the original.
+        """
+        queued = time.perf_counter_ns()
+
+        def started() -> int:
+            self.record(method, "queue_time", _elapsed_us(queued))
+            return time.perf_counter_ns()
+
+        def finished(start: int, error: Optional[BaseException] = None):
+            self.record(method, "handler_time", _elapsed_us(start))
+
+            # Cancellations are counted when the request's result is sent.
+            if error is not None and not isinstance(error, asyncio.CancelledError):
+                self.increment(method, "errors")
+
+        return wrap_handler(handler, kind, started, finished)
+
+    def instrument_callback(
+        self, method: str, callback: MessageCallback
+    ) -> MessageCallback:
+        """Wrap the given callback, used to send the result of a request, so that the
+        time taken to encode the response is recorded."""
+
+        def wrapper(future: Future[Any]):
+            if future.cancelled():
+                self.increment(method, "cancelled")
+
+            start = time.perf_counter_ns()
+            size = callback(future)
+            self.record(method, "encode_time", _elapsed_us(start))
+
+            if isinstance(size, int):
+                self.record(method, "response_bytes", size)
+
+        return wrapper
+
+    def to_prometheus(self, prefix: str = "pygls") -> str:
+        """Export the current metrics in the Prometheus text exposition format.
+
+        Histograms are exported as summaries, durations are converted into seconds.
+
+        Parameters
+        ----------
+        prefix
+           The prefix to give each metric name
+        """
+        lines: List[str] = []
+        methods = sorted(self.methods.items())
+
+        for name, _ in MethodMetrics().histograms():
+            is_time = name.endswith("_time")
+            metric = f"{prefix}_{name[:-5]}_seconds" if is_time else f"{prefix}_{name}"
+            scale = 1e-6 if is_time else 1
+
+            lines.append(f"# TYPE {metric} summary")
+            for method, metrics in methods:
+                with self._lock:
+                    histogram = getattr(metrics, name)
+                    values = [(p, histogram.percentile(p)) for p in self.PERCENTILES]
+                    count, total = histogram.count, histogram.total
+
+                if count == 0:
+                    continue
+
+                for percentile, value in values:
+                    labels = f'method="{method}",quantile="{percentile / 100:g}"'
+                    lines.append(f"{metric}{{{labels}}} {value * scale:g}")
+
+                lines.append(f'{metric}_sum{{method="{method}"}} {total * scale:g}')
+                lines.append(f'{metric}_count{{method="{method}"}} {count}')
+
+        for counter in ("errors", "cancelled"):
+            metric = f"{prefix}_{counter}_total"
+            lines.append(f"# TYPE {metric} counter")
+
+            for method, metrics in methods:
+                value = getattr(metrics, counter)
+                lines.append(f'{metric}{{method="{method}"}} {value}')
+
+        lines.append(f"# TYPE {prefix}_event_loop_stalls_total counter")
+        lines.append(f"{prefix}_event_loop_stalls_total {self.stalls}")
+
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(
+        self, port: int, host: str = "127.0.0.1"
+    ) -> ThreadingHTTPServer:
+        """Serve the metrics in the Prometheus text format from a background thread.
+
+        Parameters
+        ----------
+        port
+           The port to listen on, use ``0`` to pick a free port
+
+        host
+           The address to listen on, defaults to the local machine only
+
+        Returns
+        -------
+        ThreadingHTTPServer
+           The running server, call its ``shutdown()`` method to stop it.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.to_prometheus().encode("utf-8")
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format, *args)
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+
+        thread = threading.Thread(
+            target=server.serve_forever, name="pygls-metrics", daemon=True
+        )
+        thread.start()
+
+        logger.info("Serving metrics on http://%s:%s", *server.server_address[:2])
+        return server
@@ -0,0 +1,238 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Profile a running server on demand."""
+
+from __future__ import annotations
+
+import cProfile
+import logging
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+import typing
+from collections import Counter
+
+if typing.TYPE_CHECKING:
+    from types import FrameType
+    from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{code.co_name}:{code.co_firstlineno}"
+
+
+def collapse_stack(frame: Optional[FrameType]) -> str:
+    """Return the given stack in the collapsed format used by flamegraph tools.
+
+    Frames are listed outermost first, separated by semicolons.
+    """
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+
+    return ";".join(reversed(names))
+
+
+class _Sampler(threading.Thread):
+    """Periodically record the stack of the target thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="pygls-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            if (frame := sys._current_frames().get(self.thread_id)) is not None:
+                self.stacks[collapse_stack(frame)] += 1
+
+            # Don't keep the target thread's frames alive
+            del frame
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class Profiler:
+    """Profile the server's event loop on demand.
+
+    Two modes are supported
+
+    ``sample`` (the default)
+       A background thread records the stack of the profiled thread at a fixed
+       interval. This has very low overhead and produces a collapsed stack file that
+       can be passed to flamegraph tools such as ``flamegraph.pl`` or speedscope.
+
+    ``cprofile``
+       Uses :mod:`cProfile` to trace every function call made on the profiled
+       thread, producing a :mod:`pstats` dump. This is more precise but has a
+       significant overhead.
+
+    Both modes only profile the thread that started the session, for a server this
+    is the thread running the event loop.
+
+    See :meth:`~pygls.lsp.server.LanguageServer.enable_profiler` for how to control
+    the profiler from a client.
+
+    Parameters
+    ----------
+    directory
+       The directory to write profiles to, defaults to the system's temporary
+       directory.
+    """
+
+    MODES = ("sample", "cprofile")
+
+    def __init__(self, directory: Optional[Union[str, os.PathLike]] = None):
+        self.directory = pathlib.Path(directory or tempfile.gettempdir())
+
+        self._mode: Optional[str] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_Sampler] = None
+        self._started = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        """Indicates if a profiling session is in progress."""
+        return self._mode is not None
+
+    def start(self, mode: str = "sample", interval: float = 0.005):
+        """Start a profiling session.
+
+        Parameters
+        ----------
+        mode
+           The kind of profiler to use, either ``sample`` or ``cprofile``
+
+        interval
+           The time between samples, in seconds. Only used in ``sample`` mode.
+        """
+        if self.is_running:
+            raise RuntimeError("A profiling session is already in progress")
+
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiler mode {mode!r}")
+
+        if mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = _Sampler(threading.get_ident(), interval)
+            self._sampler.start()
+
+        self._mode = mode
+        self._started = time.monotonic()
+        logger.info("Started profiling (%s)", mode)
+
+    def stop(self, path: Optional[Union[str, os.PathLike]] = None) -> pathlib.Path:
+        """Stop the current profiling session and write out the results.
+
+        Parameters
+        ----------
+        path
+           The file to write the profile to. If not set, a file in
+           :attr:`directory` will be used.
+
+        Returns
+        -------
+        pathlib.Path
+           The path to the written profile
+        """
+        if (mode := self._mode) is None:
+            raise RuntimeError("No profiling session is in progress")
+
+        if path is None:
+            suffix = "prof" if mode == "cprofile" else "collapsed"
+            timestamp = time.strftime("%Y%m%d-%H%M%S")
+            path = self.directory / f"pygls-{os.getpid()}-{timestamp}.{suffix}"
+
+        path = pathlib.Path(path)
+
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(path)
+
+        elif self._sampler is not None:
+            self._sampler.stop()
+            lines = [f"{stack} {n}\n" for stack, n in self._sampler.stacks.items()]
+            path.write_text("".join(lines), encoding="utf-8")
+
+        logger.info(
+            "Stopped profiling after %.1fs, profile written to: %s",
+            time.monotonic() - self._started,
+            path,
+        )
+
+        self._mode = None
+        self._profile = None
+        self._sampler = None
+
+        return path
+
+    def _resolve_path(self, path: Optional[str]) -> Optional[pathlib.Path]:
+        """Resolve a path given by the client, ensuring that it is inside
+        :attr:`directory`."""
+        if path is None:
+            return None
+
+        directory = self.directory.resolve()
+        resolved = (directory / path).resolve()
+        if not resolved.is_relative_to(directory):
+            raise ValueError(f"Profile path {path!r} is outside of {str(directory)!r}")
+
+        return resolved
+
+    def execute_command(self, *args: Any) -> Dict[str, Any]:
+        """Control the profiler using the arguments of a ``workspace/executeCommand``
+        request.
+
+        The first argument selects the action, either ``start``, ``stop`` or
+        ``status``. An optional second argument can provide additional options e.g.
+        ``["start", {"mode": "cprofile"}]`` or ``["stop", {"path": "out.prof"}]``
+
+        Since the arguments are supplied by the client, the ``path`` of a ``stop``
+        action is resolved relative to :attr:`directory` and must be inside it.
+        """
+        action = args[0] if len(args) > 0 else "status"
+        options = args[1] if len(args) > 1 and args[1] is not None else {}
+
+        if action == "start":
+            self.start(
+                mode=options.get("mode", "sample"),
+                interval=options.get("interval", 0.005),
+            )
+            return {"running": True, "mode": self._mode}
+
+        if action == "stop":
+            path = self.stop(self._resolve_path(options.get("path", None)))
+            return {"running": False, "path": str(path)}
+
+        if action == "status":
+            return {"running": self.is_running, "mode": self._mode}
+
+        raise ValueError(f"Unknown profiler action {action!r}")
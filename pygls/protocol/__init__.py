@@ -5,6 +5,7 @@ from typing import Any
 from lsprotocol import converters
 
 from pygls.protocol.json_rpc import (
+    JsonFragment,
     JsonRPCNotification,
     JsonRPCProtocol,
     JsonRPCRequestMessage,
@@ -61,6 +62,7 @@ def default_converter():
 
 
 __all__ = (
+    "JsonFragment",
     "JsonRPCProtocol",
     "LanguageServerProtocol",
     "JsonRPCRequestMessage",
@@ -20,14 +20,16 @@ import asyncio
 import contextvars
 import enum
 import inspect
+import itertools
 import json
 import logging
 import sys
+import time
 import traceback
+import types
 import typing
-import uuid
 from concurrent.futures import Future
-from functools import partial
+from functools import partial, update_wrapper
 from typing import Any, Callable, Protocol, Type, Union, runtime_checkable
 
 import attrs
@@ -48,18 +50,25 @@ from pygls.exceptions import (
     JsonRpcMethodNotFound,
     JsonRpcRequestCancelled,
 )
-from pygls.feature_manager import FeatureManager, is_thread_function
+from pygls.feature_manager import (
+    FeatureManager,
+    assign_thread_attr,
+    is_thread_function,
+)
 
 if typing.TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import AsyncGenerator, Generator
 
     from cattrs import Converter
 
     from pygls.io_ import AsyncWriter, Writer
+    from pygls.metrics import Metrics
     from pygls.server import JsonRPCServer
+    from pygls.tracing import Span, Tracer
+    from pygls.watchdog import Watchdog
 
     MessageHandler = Union[Callable[[Any], Any],]
-    MessageCallback = Callable[[Future[Any]], None]
+    MessageCallback = Callable[[Future[Any]], Any]
 
 logger = logging.getLogger(__name__)
 
@@ -134,6 +143,259 @@ class JsonRPCResponseMessage:
     result: Any
 
 
+@attrs.frozen
+class JsonFragment:
+    """A pre-encoded JSON value.
+
+    Returning an instance of this class from a request handler sends ``data`` to the
+    client as the ``result`` of the response, as-is. This allows results that are
+    expensive to serialize to be encoded once and sent many times.
+
+    See :meth:`JsonRPCProtocol.encode_result`
+    """
+
+    data: bytes
+
+
+class MessageKind(enum.Enum):
+    """The kinds of JSON-RPC message."""
+
+    Request = enum.auto()
+    Notification = enum.auto()
+    Response = enum.auto()
+    Error = enum.auto()
+
+
+# Message types are fixed attrs classes, so each only needs classifying once.
+_MESSAGE_KINDS: dict[type, MessageKind] = {}
+
+
+def message_kind(message: RPCMessage) -> MessageKind:
+    """Return the kind of the given message."""
+    cls = type(message)
+    if (kind := _MESSAGE_KINDS.get(cls)) is not None:
+        return kind
+
+    if isinstance(message, RPCRequest):
+        kind = MessageKind.Request
+    elif isinstance(message, RPCNotification):
+        kind = MessageKind.Notification
+    elif isinstance(message, RPCResponse):
+        kind = MessageKind.Response
+    else:
+        kind = MessageKind.Error
+
+    if attrs.has(cls):
+        _MESSAGE_KINDS[cls] = kind
+
+    return kind
+
+
+class HandlerKind(enum.Enum):
+    """The different ways a message handler can be executed."""
+
+    Coroutine = enum.auto()
+    AsyncGenerator = enum.auto()
+    Thread = enum.auto()
+    Generator = enum.auto()
+    Sync = enum.auto()
+
+
+def handler_kind(handler: MessageHandler) -> HandlerKind:
+    """Return the way in which the given handler should be executed."""
+    if asyncio.iscoroutinefunction(handler):
+        return HandlerKind.Coroutine
+
+    if inspect.isasyncgenfunction(handler):
+        return HandlerKind.AsyncGenerator
+
+    if is_thread_function(handler):
+        return HandlerKind.Thread
+
+    if inspect.isgeneratorfunction(handler):
+        return HandlerKind.Generator
+
+    return HandlerKind.Sync
+
+
+def wrap_handler(
+    handler: MessageHandler,
+    kind: HandlerKind,
+    enter: Callable[[], Any],
+    exit: Callable[[Any, BaseException | None], None],
+    each_step: bool = False,
+    wrap_threads: bool = True,
+) -> MessageHandler:
+    """Wrap the given handler so that ``enter`` and ``exit`` are called when it starts
+    and finishes executing.
+
+    This is used to instrument handlers without changing how they are executed, the
+    returned handler should be executed the same way as the original.
+
+    Parameters
+    ----------
+    handler
+       The handler to wrap
+
+    kind
+       How the handler will be executed
+
+    enter
+       Called before the handler starts, its return value is passed to ``exit``
+
+    exit
+       Called with the value returned by ``enter`` and the exception raised by the
+       handler, if any, once the handler has finished
+
+    each_step
+       If set, call the hooks around each step of the handler's execution instead,
+       i.e. only while the handler's own code is running. The sub-handlers yielded
+       by generator handlers are wrapped in the same way.
+
+    wrap_threads
+       If unset, handlers executed in the thread pool, including any sub-handlers,
+       are returned unchanged.
+    """
+    if kind is HandlerKind.Thread and not wrap_threads:
+        return handler
+
+    wrapper: Callable[..., Any]
+
+    if each_step and kind is HandlerKind.Coroutine:
+
+        async def wrapper(*args, **kwargs):
+            return await _each_step(handler(*args, **kwargs), enter, exit)
+
+    elif each_step and kind is HandlerKind.AsyncGenerator:
+
+        async def wrapper(*args, **kwargs):
+            gen = handler(*args, **kwargs)
+            while True:
+                try:
+                    chunk = await _each_step(gen.__anext__(), enter, exit)
+                except StopAsyncIteration:
+                    return
+
+                yield chunk
+
+    elif each_step and kind is HandlerKind.Generator:
+
+        def wrapper(*args, **kwargs):
+            gen = handler(*args, **kwargs)
+            value = None
+
+            while True:
+                state = enter()
+                try:
+                    sub_handler, sub_args, sub_kwargs = gen.send(value)
+                except StopIteration as result:
+                    exit(state, None)
+                    return result.value
+                except BaseException as exc:
+                    exit(state, exc)
+                    raise
+
+                exit(state, None)
+                sub_handler = wrap_handler(
+                    sub_handler,
+                    handler_kind(sub_handler),
+                    enter,
+                    exit,
+                    each_step,
+                    wrap_threads,
+                )
+                value = yield sub_handler, sub_args, sub_kwargs
+
+    elif kind is HandlerKind.Coroutine:
+
+        async def wrapper(*args, **kwargs):
+            state = enter()
+            try:
+                result = await handler(*args, **kwargs)
+            except BaseException as exc:
+                exit(state, exc)
+                raise
+
+            exit(state, None)
+            return result
+
+    elif kind is HandlerKind.AsyncGenerator:
+
+        async def wrapper(*args, **kwargs):
+            state = enter()
+            try:
+                async for chunk in handler(*args, **kwargs):
+                    yield chunk
+            except BaseException as exc:
+                exit(state, exc)
+                raise
+
+            exit(state, None)
+
+    elif kind is HandlerKind.Generator:
+
+        def wrapper(*args, **kwargs):
+            state = enter()
+            try:
+                result = yield from handler(*args, **kwargs)
+            except BaseException as exc:
+                exit(state, exc)
+                raise
+
+            exit(state, None)
+            return result
+
+    else:
+
+        def wrapper(*args, **kwargs):
+            state = enter()
+            try:
+                result = handler(*args, **kwargs)
+            except BaseException as exc:
+                exit(state, exc)
+                raise
+
+            exit(state, None)
+            return result
+
+        if kind is HandlerKind.Thread:
+            assign_thread_attr(wrapper)
+
+    return update_wrapper(wrapper, handler)
+
+
+@types.coroutine
+def _each_step(
+    awaitable: Any,
+    enter: Callable[[], Any],
+    exit: Callable[[Any, BaseException | None], None],
+):
+    """Await the given awaitable, calling ``enter`` and ``exit`` around each step of
+    its execution."""
+    value: Any = None
+    error: BaseException | None = None
+
+    while True:
+        state = enter()
+        try:
+            if error is None:
+                future = awaitable.send(value)
+            else:
+                future = awaitable.throw(error)
+        except StopIteration as result:
+            exit(state, None)
+            return result.value
+        except BaseException as exc:
+            exit(state, exc)
+            raise
+
+        exit(state, None)
+        try:
+            value, error = (yield future), None
+        except BaseException as exc:
+            value, error = None, exc
+
+
 class JsonRPCProtocol:
     """Json RPC protocol implementation
 
@@ -147,6 +409,15 @@ class JsonRPCProtocol:
     CONTENT_TYPE = "application/vscode-jsonrpc"
     VERSION = "2.0"
 
+    ENCODE_BATCH_SIZE = 1024
+    """The number of items in a ``result`` list to encode at a time."""
+
+    MSG_ID_PREFIX = "pygls:"
+    """Prefix given to the ids of requests sent by pygls.
+
+    Requests received from the peer are tracked alongside our own, the prefix ensures
+    that our ids cannot collide with theirs."""
+
     def __init__(self, server: JsonRPCServer, converter: Converter):
         self._server = server
         self._converter = converter
@@ -159,8 +430,18 @@ class JsonRPCProtocol:
         )
         self._request_futures: dict[MsgId, Future[Any]] = {}
         self._result_types: dict[MsgId, Any] = {}
+        self._msg_ids = itertools.count(1)
+
+        # Handlers (and how to execute them) indexed by method name, rebuilt whenever
+        # the features registered with the feature manager change.
+        self._dispatch_table: dict[str, tuple[MessageHandler, HandlerKind]] = {}
+        self._dispatch_generation = -1
 
         self.fm = FeatureManager(server, converter)
+        self.metrics: Metrics | None = None
+        self.tracer: Tracer | None = None
+        self.watchdog: Watchdog | None = None
+        self._decode_times: tuple[int, int] | None = None
         self.writer: AsyncWriter | Writer | None = None
         self._include_headers = False
 
@@ -170,23 +451,28 @@ class JsonRPCProtocol:
     @property
     def msg_id(self) -> MsgId | None:
         """Returns the id of the current context (if it exists)."""
-        ctx = contextvars.copy_context()
-        return ctx.get(self._ctx_msg_id)
+        return self._ctx_msg_id.get()
+
+    def _next_msg_id(self) -> str:
+        """Return a new, unique id for a message sent by pygls."""
+        return f"{self.MSG_ID_PREFIX}{next(self._msg_ids)}"
 
     def _execute_handler(
         self,
-        msg_id: MsgId,
+        msg_id: MsgId | None,
         handler: MessageHandler,
         callback: MessageCallback,
         args: tuple[Any, ...] | None = None,
         kwargs: dict[str, Any] | None = None,
+        kind: HandlerKind | None = None,
     ):
         """Execute the given message handler.
 
         Parameters
         ----------
         msg_id
-           The id of the message being handled
+           The id of the message being handled. If ``None`` (e.g. when handling a
+           notification) the handler's future is not tracked and cannot be cancelled.
 
         handler
            The request handler to call
@@ -199,24 +485,37 @@ class JsonRPCProtocol:
 
         kwargs
            Keyword arguments to pass to the handler
+
+        kind
+           How to execute the handler, if already known
         """
         future: Future[Any]
         args = args or tuple()
         kwargs = kwargs or {}
 
-        if asyncio.iscoroutinefunction(handler):
+        if kind is None:
+            kind = handler_kind(handler)
+
+        if kind is HandlerKind.Coroutine:
             future = asyncio.ensure_future(handler(*args, **kwargs))
-            self._request_futures[msg_id] = future
+            self._track_future(msg_id, future)
+            future.add_done_callback(callback)
+
+        elif kind is HandlerKind.AsyncGenerator:
+            future = asyncio.ensure_future(  # type: ignore[assignment]
+                self._gather_chunks(handler(*args, **kwargs))
+            )
+            self._track_future(msg_id, future)
             future.add_done_callback(callback)
 
-        elif is_thread_function(handler):
+        elif kind is HandlerKind.Thread:
             future = self._server.thread_pool.submit(handler, *args, **kwargs)
-            self._request_futures[msg_id] = future
+            self._track_future(msg_id, future)
             future.add_done_callback(callback)
 
-        elif inspect.isgeneratorfunction(handler):
+        elif kind is HandlerKind.Generator:
             future = Future()
-            self._request_futures[msg_id] = future
+            self._track_future(msg_id, future)
             future.add_done_callback(callback)
 
             try:
@@ -238,6 +537,23 @@ class JsonRPCProtocol:
             except Exception as exc:
                 future.set_exception(exc)
 
+    def _track_future(self, msg_id: MsgId | None, future: Future[Any]):
+        """Record the future of an in-flight handler, so that it can be cancelled."""
+        if msg_id is not None:
+            self._request_futures[msg_id] = future
+
+    async def _gather_chunks(self, gen: AsyncGenerator[Any, None]) -> list[Any]:
+        """Gather the chunks yielded by an async generator handler into a single
+        result.
+
+        Each chunk is expected to be a list of items.
+        """
+        result: list[Any] = []
+        async for chunk in gen:
+            result.extend(chunk)
+
+        return result
+
     def _run_generator(
         self,
         future: Future[Any] | None,
@@ -271,16 +587,19 @@ class JsonRPCProtocol:
 
         try:
             value = future.result() if future is not None else None
-            handler, args, kwargs = gen.send(value)
+            handler, args, kwargs, kind = self._advance_generator(gen, value)
 
+            # Only the future of the overall request is tracked, cancelling it stops
+            # the generator before the next sub-handler is executed.
             self._execute_handler(
-                str(uuid.uuid4()),
+                None,
                 handler,
                 args=args,
                 kwargs=kwargs,
                 callback=partial(
                     self._run_generator, gen=gen, result_future=result_future
                 ),
+                kind=kind,
             )
         except StopIteration as result:
             result_future.set_result(result.value)
@@ -288,33 +607,64 @@ class JsonRPCProtocol:
         except Exception as exc:
             result_future.set_exception(exc)
 
-    def _send_handler_result(self, future: Future[Any], *, msg_id: MsgId):
+    def _advance_generator(
+        self, gen: Generator[Any, Any, Any], value: Any
+    ) -> tuple[MessageHandler, Any, Any, HandlerKind]:
+        """Send ``value`` into the given generator handler.
+
+        Synchronous sub-handlers yielded by the generator are called directly, with
+        their result sent straight back into the generator. Raises ``StopIteration``
+        if the generator finishes.
+
+        Returns
+        -------
+        tuple[MessageHandler, Any, Any, HandlerKind]
+           The first sub-handler that cannot be called directly, along with its
+           arguments and how it should be executed.
+        """
+        while True:
+            handler, args, kwargs = gen.send(value)
+            kind = handler_kind(handler)
+
+            if kind is not HandlerKind.Sync:
+                return handler, args, kwargs, kind
+
+            value = handler(*(args or ()), **(kwargs or {}))
+
+    def _send_handler_result(self, future: Future[Any], *, msg_id: MsgId) -> int:
         """Callback function that sends the result of the given future to the client.
 
         Used to respond to request messages.
+
+        Returns
+        -------
+        int
+           The size of the response, in bytes.
         """
         self._request_futures.pop(msg_id, None)
 
         try:
             if not future.cancelled():
-                self._send_response(msg_id, result=future.result())
-            else:
-                self._send_response(
-                    msg_id,
-                    error=JsonRpcRequestCancelled(
-                        f'Request with id "{msg_id}" is canceled'
-                    ).to_response_error(),
-                )
+                return self._send_response(msg_id, result=future.result())
+
+            return self._send_response(
+                msg_id,
+                error=JsonRpcRequestCancelled(
+                    f'Request with id "{msg_id}" is canceled'
+                ).to_response_error(),
+            )
         except JsonRpcException as exc:
             logger.exception('Exception occurred for message "%s"', msg_id)
-            self._send_response(msg_id, error=exc.to_response_error())
+            size = self._send_response(msg_id, error=exc.to_response_error())
             self._server._report_server_error(exc, FeatureRequestError)
+            return size
 
         except Exception:
             error = JsonRpcInternalError.of(sys.exc_info())
             logger.exception('Exception occurred for message "%s"', msg_id)
-            self._send_response(msg_id, error=error.to_response_error())
+            size = self._send_response(msg_id, error=error.to_response_error())
             self._server._report_server_error(error, FeatureRequestError)
+            return size
 
     def _check_handler_result(self, future: Future[Any]):
         """Check the result of the future to see if an error occurred.
@@ -339,6 +689,23 @@ class JsonRPCProtocol:
 
         raise JsonRpcMethodNotFound.of(feature_name)
 
+    def _lookup_handler(self, method_name: str) -> tuple[MessageHandler, HandlerKind]:
+        """Return the handler for the given method and how to execute it.
+
+        Results are stored in a dispatch table so that the work done by
+        :meth:`_get_handler` only happens once per method.
+        """
+        if self._dispatch_generation != self.fm.generation:
+            self._dispatch_table.clear()
+            self._dispatch_generation = self.fm.generation
+
+        if (entry := self._dispatch_table.get(method_name)) is not None:
+            return entry
+
+        handler = self._get_handler(method_name)
+        entry = self._dispatch_table[method_name] = (handler, handler_kind(handler))
+        return entry
+
     def _handle_cancel_notification(self, msg_id: MsgId):
         """Handles a cancel notification from the client."""
         future = self._request_futures.pop(msg_id, None)
@@ -358,13 +725,21 @@ class JsonRPCProtocol:
             return
 
         try:
-            handler = self._get_handler(method_name)
-            self._execute_handler(
-                msg_id=str(uuid.uuid4()),
-                handler=handler,
-                args=(params,),
-                callback=self._check_handler_result,
-            )
+            handler, kind = self._lookup_handler(method_name)
+
+            if (watchdog := self.watchdog) is not None:
+                handler = watchdog.instrument_handler(method_name, None, handler, kind)
+
+            if (metrics := self.metrics) is not None:
+                handler = metrics.instrument_handler(method_name, handler, kind)
+
+            if (span := self._start_span(method_name)) is not None:
+                from pygls.tracing import trace_handler
+
+                handler = trace_handler(span, handler, kind, end=True)
+                span.add_event("scheduled")
+
+            self._execute_notification(handler, kind, params)
         except JsonRpcMethodNotFound:
             logger.warning("Ignoring notification for unknown method %r", method_name)
         except Exception as error:
@@ -376,20 +751,93 @@ class JsonRPCProtocol:
             )
             self._server._report_server_error(error, FeatureNotificationError)
 
-    def _handle_request(self, msg_id: MsgId, method_name: str, params: Any):
-        """Handles a request from the client."""
-        try:
-            handler = self._get_handler(method_name)
+    def _execute_notification(
+        self, handler: MessageHandler, kind: HandlerKind, params: Any
+    ):
+        """Execute the given notification handler.
 
-            # Set the request id within the current context.
-            self._ctx_msg_id.set(msg_id)
+        Synchronous handlers, as well as generator handlers that only yield to
+        synchronous sub-handlers (such as the builtin ``textDocument/didChange``
+        handler calling a synchronous user handler), are run to completion
+        immediately. No futures are created unless a handler needs to be executed
+        asynchronously.
+        """
+        if kind is not HandlerKind.Sync and kind is not HandlerKind.Generator:
             self._execute_handler(
-                msg_id=msg_id,
+                msg_id=None,
                 handler=handler,
                 args=(params,),
-                callback=partial(self._send_handler_result, msg_id=msg_id),
+                callback=self._check_handler_result,
+                kind=kind,
+            )
+            return
+
+        try:
+            if kind is HandlerKind.Sync:
+                handler(params)
+                return
+
+            gen = handler(params)
+            sub_handler, args, kwargs, sub_kind = self._advance_generator(gen, None)
+        except StopIteration:
+            return
+        except Exception:
+            error = JsonRpcInternalError.of(sys.exc_info())
+            self._server._report_server_error(error, FeatureNotificationError)
+            return
+
+        # Fallback to the usual generator machinery
+        future: Future[Any] = Future()
+        future.add_done_callback(self._check_handler_result)
+        self._execute_handler(
+            None,
+            sub_handler,
+            args=args,
+            kwargs=kwargs,
+            callback=partial(self._run_generator, gen=gen, result_future=future),
+            kind=sub_kind,
+        )
+
+    def _handle_request(self, msg_id: MsgId, method_name: str, params: Any):
+        """Handles a request from the client."""
+        span = self._start_span(method_name, msg_id)
+
+        try:
+            handler, kind = self._lookup_handler(method_name)
+            callback: MessageCallback = partial(
+                self._send_handler_result, msg_id=msg_id
             )
 
+            if (watchdog := self.watchdog) is not None:
+                handler = watchdog.instrument_handler(
+                    method_name, msg_id, handler, kind
+                )
+
+            if (metrics := self.metrics) is not None:
+                handler = metrics.instrument_handler(method_name, handler, kind)
+                callback = metrics.instrument_callback(method_name, callback)
+
+            if span is not None:
+                from pygls.tracing import trace_callback, trace_handler
+
+                handler = trace_handler(span, handler, kind)
+                callback = trace_callback(span, callback)
+                span.add_event("scheduled")
+
+            # Set the request id within the current context, any tasks created by the
+            # handler inherit a copy of it.
+            token = self._ctx_msg_id.set(msg_id)
+            try:
+                self._execute_handler(
+                    msg_id=msg_id,
+                    handler=handler,
+                    args=(params,),
+                    callback=callback,
+                    kind=kind,
+                )
+            finally:
+                self._ctx_msg_id.reset(token)
+
         except JsonRpcMethodNotFound as error:
             logger.warning(
                 "Failed to handle request %r, unknown method %r",
@@ -398,6 +846,7 @@ class JsonRPCProtocol:
             )
             self._send_response(msg_id, None, error.to_response_error())
             self._server._report_server_error(error, FeatureRequestError)
+            self._end_span(span, error)
         except JsonRpcException as error:
             logger.exception(
                 "Failed to handle request %s %s %s",
@@ -408,6 +857,7 @@ class JsonRPCProtocol:
             )
             self._send_response(msg_id, None, error.to_response_error())
             self._server._report_server_error(error, FeatureRequestError)
+            self._end_span(span, error)
         except Exception as error:
             logger.exception(
                 "Failed to handle request %s %s %s",
@@ -419,6 +869,40 @@ class JsonRPCProtocol:
             err = JsonRpcInternalError.of(sys.exc_info()).to_response_error()
             self._send_response(msg_id, None, err)
             self._server._report_server_error(error, FeatureRequestError)
+            self._end_span(span, error)
+
+    def _start_span(self, method_name: str, msg_id: MsgId | None = None) -> Span | None:
+        """Start the span used to trace the handling of the given message.
+
+        Returns ``None`` if tracing is not enabled.
+        """
+        if (tracer := self.tracer) is None:
+            return None
+
+        attributes: dict[str, Any] = {
+            "rpc.system": "jsonrpc",
+            "rpc.method": method_name,
+        }
+        if msg_id is not None:
+            attributes["rpc.jsonrpc.request_id"] = str(msg_id)
+
+        received, structured = self._decode_times or (None, None)
+        span = tracer.start_span(
+            method_name, attributes=attributes, start_time=received
+        )
+
+        if structured is not None:
+            span.add_event("message.structured", timestamp=structured)
+
+        return span
+
+    def _end_span(self, span: Span | None, error: BaseException):
+        """End the given span early, due to an error."""
+        if span is None:
+            return
+
+        span.record_exception(error)
+        span.end()
 
     def _handle_response(
         self,
@@ -486,6 +970,25 @@ class JsonRPCProtocol:
             logger.error("Unable to deserialize message\n%s", traceback.format_exc())
             raise JsonRpcInternalError() from exc
 
+    def decode_message(self, data: bytes | str) -> Any:
+        """Parse the given message, structuring it into the appropriate type."""
+        metrics, tracer = self.metrics, self.tracer
+        if metrics is None and tracer is None:
+            return json.loads(data, object_hook=self.structure_message)
+
+        received = time.time_ns()
+        start = time.perf_counter_ns()
+        message = json.loads(data, object_hook=self.structure_message)
+
+        if tracer is not None:
+            # Picked up by the span started for this message in handle_message
+            self._decode_times = (received, time.time_ns())
+
+        if metrics is not None and (method := getattr(message, "method", None)):
+            metrics.record_decode(method, start, len(data))
+
+        return message
+
     def handle_message(self, message: RPCMessage):
         """Delegates message to handlers depending on message type."""
 
@@ -497,64 +1000,160 @@ class JsonRPCProtocol:
             logger.warning("Server shutting down. No more requests!")
             return
 
-        # Run each handler within its own context.
-        ctx = contextvars.copy_context()
-
-        if isinstance(message, RPCRequest):
-            logger.debug("Request %r received", message.method)
-            ctx.run(self._handle_request, message.id, message.method, message.params)
-
-        elif isinstance(message, RPCNotification):
-            logger.debug("Notification %r received", message.method)
-            ctx.run(self._handle_notification, message.method, message.params)
-
-        elif isinstance(message, RPCResponse):
+        try:
+            # Rather than copying the context for every message, any context
+            # variables set while dispatching (such as the request id) are reset
+            # before returning.
+            self._dispatch_message(message)
+        finally:
+            self._decode_times = None
+
+    def _dispatch_message(self, message: RPCMessage):
+        """Call the appropriate handler for the given message."""
+        kind = message_kind(message)
+
+        if kind is MessageKind.Request:
+            request = typing.cast(RPCRequest, message)
+            logger.debug("Request %r received", request.method)
+            self._handle_request(request.id, request.method, request.params)
+
+        elif kind is MessageKind.Notification:
+            notification = typing.cast(RPCNotification, message)
+            logger.debug("Notification %r received", notification.method)
+            self._handle_notification(notification.method, notification.params)
+
+        elif kind is MessageKind.Response:
+            response = typing.cast(RPCResponse, message)
             logger.debug("Response message received.")
-            ctx.run(self._handle_response, message.id, message.result)
+            self._handle_response(response.id, response.result)
 
         else:
+            error = typing.cast(RPCError, message)
             logger.debug("Error message received.")
-            ctx.run(self._handle_response, message.id, None, message.error)
+            self._handle_response(error.id, None, error.error)
+
+    def encode_result(self, result: Any) -> JsonFragment:
+        """Encode the given result, so that it can be sent without being serialized
+        again.
+
+        Parameters
+        ----------
+        result
+           The result to encode
+
+        Returns
+        -------
+        JsonFragment
+           The encoded result
+        """
+        if isinstance(result, JsonFragment):
+            return result
+
+        body = json.dumps(result, default=self._serialize_message)
+        return JsonFragment(body.encode(self.CHARSET))
+
+    def _encode_envelope(self, msg_id: MsgId) -> bytes:
+        """Encode the start of a response message, up to its ``result``."""
+        return b"".join(
+            [
+                b'{"id": ',
+                json.dumps(msg_id).encode(self.CHARSET),
+                b', "jsonrpc": "',
+                JsonRPCProtocol.VERSION.encode(self.CHARSET),
+                b'", "result": ',
+            ]
+        )
+
+    def _encode_chunks(self, data: Any) -> list[bytes]:
+        """Encode the given message as a list of ``bytes`` chunks.
+
+        Large ``result`` lists are unstructured and encoded a batch of items at a
+        time, so that the message is never held in memory as a single string.
+        """
+        result = getattr(data, "result", None)
+        batch_size = self.ENCODE_BATCH_SIZE
 
-    def _send_data(self, data: Any):
-        """Sends data to the client."""
+        if isinstance(result, JsonFragment):
+            return [self._encode_envelope(data.id), result.data, b"}"]
+
+        if not isinstance(result, (list, tuple)) or len(result) <= batch_size:
+            body = json.dumps(data, default=self._serialize_message)
+            return [body.encode(self.CHARSET)]
+
+        chunks = [self._encode_envelope(data.id), b"["]
+        for start in range(0, len(result), batch_size):
+            if start > 0:
+                chunks.append(b", ")
+
+            # Strip the brackets, the items are written into a single list.
+            batch = json.dumps(
+                result[start : start + batch_size], default=self._serialize_message
+            )
+            chunks.append(batch[1:-1].encode(self.CHARSET))
+
+        chunks.append(b"]}")
+        return chunks
+
+    def _send_data(self, data: Any) -> int:
+        """Sends data to the client.
+
+        The message is encoded as a list of chunks which, if supported by the writer,
+        are written using ``writelines`` (allowing for vectored I/O) rather than being
+        joined together first.
+
+        Returns
+        -------
+        int
+           The number of bytes sent
+        """
         if not data:
-            return
+            return 0
 
         if self.writer is None:
             logger.error("Unable to send data, no available transport!")
-            return
+            return 0
 
         try:
-            body = json.dumps(data, default=self._serialize_message)
-            logger.info("Sending data: %s", body)
+            chunks = self._encode_chunks(data)
+
+            # Logging the message requires joining the chunks back together, only do
+            # so when debugging.
+            if logger.isEnabledFor(logging.DEBUG):
+                body = b"".join(chunks).decode(self.CHARSET, errors="replace")
+                logger.debug("Sending data: %s", body)
 
             if self._include_headers:
                 header = (
-                    f"Content-Length: {len(body)}\r\n"
+                    f"Content-Length: {sum(map(len, chunks))}\r\n"
                     f"Content-Type: {self.CONTENT_TYPE}; charset={self.CHARSET}\r\n\r\n"
                 )
-                data = header + body
+                chunks.insert(0, header.encode(self.CHARSET))
+
+            writelines = getattr(self.writer, "writelines", None)
+            if writelines is not None:
+                res = writelines(chunks)
             else:
-                data = body
+                res = self.writer.write(b"".join(chunks))
 
-            res = self.writer.write(data.encode(self.CHARSET))
             if inspect.isawaitable(res):
                 asyncio.ensure_future(res)
 
+            return sum(map(len, chunks))
+
         except BrokenPipeError:
             logger.exception("Error sending data. BrokenPipeError", exc_info=True)
             raise
         except Exception as error:
             logger.exception("Error sending data", exc_info=True)
             self._server._report_server_error(error, JsonRpcInternalError)
+            return 0
 
     def _send_response(
         self,
         msg_id: MsgId,
         result: Any | None = None,
         error: Union[ResponseError, None] = None,
-    ):
+    ) -> int:
         """Send a JSON-RPC response
 
         .. important::
@@ -568,22 +1167,35 @@ class JsonRPCProtocol:
            The id of the message to respond to
 
         result
-           The result to send in the event of a success
+           The result to send in the event of a success. If given a
+           :class:`JsonFragment` it will be sent without being serialized again.
 
         error
            The error to send in the event of a failure
+
+        Returns
+        -------
+        int
+           The number of bytes sent
         """
+        response: Any
 
         if error is not None:
             response = ResponseErrorMessage(id=msg_id, error=error)
 
+        elif isinstance(result, JsonFragment):
+            self._result_types.pop(msg_id, None)
+            response = JsonRPCResponseMessage(
+                id=msg_id, result=result, jsonrpc=JsonRPCProtocol.VERSION
+            )
+
         else:
             response_type = self._result_types.pop(msg_id, JsonRPCResponseMessage)
             response = response_type(
                 id=msg_id, result=result, jsonrpc=JsonRPCProtocol.VERSION
             )
 
-        self._send_data(response)
+        return self._send_data(response)
 
     def set_writer(
         self,
@@ -671,7 +1283,7 @@ class JsonRPCProtocol:
         """
 
         if msg_id is None:
-            msg_id = str(uuid.uuid4())
+            msg_id = self._next_msg_id()
 
         request_type = self.get_message_type(method) or JsonRPCRequestMessage
         logger.debug('Sending request with id "%s": %s %s', msg_id, method, params)
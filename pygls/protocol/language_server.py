@@ -29,8 +29,12 @@ from lsprotocol import types
 
 from pygls.capabilities import ServerCapabilitiesBuilder
 from pygls.constants import PARAM_LS
-from pygls.exceptions import JsonRpcInvalidParams
+from pygls.exceptions import JsonRpcInvalidParams, JsonRpcMethodNotFound
+from pygls.feature_manager import is_cached_function
+from pygls.lsp import METHOD_TO_PARTIAL_RESULT
 from pygls.protocol.json_rpc import JsonRPCProtocol
+from pygls.result_cache import ResultCache
+from pygls.semantic_tokens import SemanticTokensCache
 from pygls.uris import from_fs_path
 from pygls.workspace import Workspace
 
@@ -41,6 +45,9 @@ if typing.TYPE_CHECKING:
     from cattrs import Converter
 
     from pygls.lsp.server import LanguageServer
+    from pygls.protocol.json_rpc import MessageHandler
+    from pygls.result_cache import ResultKey
+    from pygls.semantic_tokens import DeltaResult, FullResult
 
     F = TypeVar("F", bound=Callable)
 
@@ -75,6 +82,8 @@ class LanguageServerProtocol(JsonRPCProtocol):
         from pygls.progress import Progress
 
         self.progress = Progress(self)
+        self.semantic_tokens = SemanticTokensCache()
+        self.result_cache = ResultCache()
 
         self.server_info = types.ServerInfo(
             name=server.name,
@@ -102,6 +111,129 @@ class LanguageServerProtocol(JsonRPCProtocol):
 
         return self._workspace
 
+    def _get_handler(self, feature_name: str) -> MessageHandler:
+        handler = super()._get_handler(feature_name)
+
+        # Only keep track of semantic tokens if the server supports sending deltas.
+        # The user's handler is looked up above, so the requested feature exists.
+        if types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL_DELTA in self.fm.features:
+            if feature_name == types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL:
+                return self._semantic_tokens_full
+
+            if feature_name == types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL_DELTA:
+                return self._semantic_tokens_full_delta
+
+        if is_cached_function(handler):
+            return self._cached_handler(feature_name, handler)
+
+        if inspect.isasyncgenfunction(handler):
+            return self._partial_result_handler(feature_name, handler)
+
+        return handler
+
+    def _cached_handler(
+        self, feature_name: str, handler: MessageHandler
+    ) -> MessageHandler:
+        """Wrap the given handler so that its results are stored in, and served from
+        the result cache."""
+
+        def cached_handler(params: Any) -> Generator[Any, Any, Any]:
+            key = self._result_cache_key(feature_name, params)
+            if key is None:
+                return (yield handler, (params,), None)
+
+            try:
+                return self.result_cache[key]
+            except KeyError:
+                pass
+
+            # Store the encoded result so that repeat requests can also skip
+            # serialization.
+            result = self.encode_result((yield handler, (params,), None))
+            self.result_cache[key] = result
+            return result
+
+        return cached_handler
+
+    def _partial_result_handler(
+        self, feature_name: str, handler: MessageHandler
+    ) -> MessageHandler:
+        """Wrap the given async generator handler so that the chunks it yields are
+        streamed to the client as partial results, if requested."""
+        wrapper_types = METHOD_TO_PARTIAL_RESULT[feature_name]
+        result_type, partial_result_type = wrapper_types or (None, None)
+
+        async def partial_result_handler(params: Any) -> Any:
+            token = getattr(params, "partial_result_token", None)
+
+            if token is None:
+                items = await self._gather_chunks(handler(params))
+                return items if result_type is None else result_type(items=items)
+
+            async for chunk in handler(params):
+                value = chunk
+                if partial_result_type is not None:
+                    value = partial_result_type(items=list(chunk))
+
+                self.notify(
+                    types.PROGRESS, types.ProgressParams(token=token, value=value)
+                )
+
+            # All results have been reported through $/progress notifications, the
+            # final response must be empty.
+            return [] if result_type is None else result_type(items=[])
+
+        return partial_result_handler
+
+    def _result_cache_key(self, feature_name: str, params: Any) -> ResultKey | None:
+        """Return the key to use when caching the result of the given request, or
+        ``None`` if the result should not be cached."""
+        if (text_document := getattr(params, "text_document", None)) is None:
+            return None
+
+        uri = text_document.uri
+        if (version := self.workspace.get_text_document(uri).version) is None:
+            # The document is not managed by the client, there's no way to know
+            # if it has changed.
+            return None
+
+        fields = self._converter.unstructure(params)
+        fields.pop("workDoneToken", None)
+        fields.pop("partialResultToken", None)
+
+        return (uri, version, feature_name, json.dumps(fields, sort_keys=True))
+
+    def _get_user_handler(self, feature_name: str) -> MessageHandler:
+        """Return the handler the user registered for the given feature."""
+        if (handler := self.fm.features.get(feature_name)) is None:
+            raise JsonRpcMethodNotFound.of(feature_name)
+
+        return handler
+
+    def _semantic_tokens_full(
+        self, params: types.SemanticTokensParams
+    ) -> Generator[Any, Any, FullResult]:
+        """Record the tokens returned by the user's handler, so that later delta
+        requests can be answered."""
+        user_handler = self._get_user_handler(types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL)
+        result = yield user_handler, (params,), None
+
+        return self.semantic_tokens.full(params.text_document.uri, result)
+
+    def _semantic_tokens_full_delta(
+        self, params: types.SemanticTokensDeltaParams
+    ) -> Generator[Any, Any, DeltaResult]:
+        """If the user's handler returns the full set of tokens, convert them into a
+        delta."""
+        user_handler = self._get_user_handler(
+            types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL_DELTA
+        )
+        result = yield user_handler, (params,), None
+
+        return self.semantic_tokens.delta(
+            params.text_document.uri, params.previous_result_id, result
+        )
+
     @lru_cache()
     def get_message_type(self, method: str) -> Type[Any] | None:
         """Return LSP type definitions, as provided by `lsprotocol`"""
@@ -221,6 +353,8 @@ class LanguageServerProtocol(JsonRPCProtocol):
         for change in params.content_changes:
             self.workspace.update_text_document(params.text_document, change)
 
+        self.result_cache.invalidate(params.text_document.uri)
+
         if (
             user_handler := self.fm.features.get(types.TEXT_DOCUMENT_DID_CHANGE)
         ) is not None:
@@ -230,6 +364,8 @@ class LanguageServerProtocol(JsonRPCProtocol):
     def lsp_text_document__did_close(self, params: types.DidCloseTextDocumentParams):
         """Removes document from workspace."""
         self.workspace.remove_text_document(params.text_document.uri)
+        self.semantic_tokens.remove(params.text_document.uri)
+        self.result_cache.invalidate(params.text_document.uri)
 
         if (
             user_handler := self.fm.features.get(types.TEXT_DOCUMENT_DID_CLOSE)
@@ -313,6 +449,21 @@ class LanguageServerProtocol(JsonRPCProtocol):
         ) is not None:
             yield user_handler, (params,), None
 
+    @lsp_method(types.WORKSPACE_DID_CHANGE_WATCHED_FILES)
+    def lsp_workspace__did_change_watched_files(
+        self, params: types.DidChangeWatchedFilesParams
+    ):
+        """Discards the cached contents of any changed files."""
+        for change in params.changes:
+            self.workspace.invalidate_text_document(change.uri)
+
+        if (
+            user_handler := self.fm.features.get(
+                types.WORKSPACE_DID_CHANGE_WATCHED_FILES
+            )
+        ) is not None:
+            yield user_handler, (params,), None
+
     @lsp_method(types.WORKSPACE_EXECUTE_COMMAND)
     def lsp_workspace__execute_command(
         self, params: types.ExecuteCommandParams
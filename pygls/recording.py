@@ -0,0 +1,440 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Record and replay sessions between a client and a server.
+
+A session is recorded by wrapping the server's transport, capturing every message
+it receives and sends along with the time, relative to the start of the recording.
+The easiest way to do this is to use
+:meth:`~pygls.server.JsonRPCServer.record_session` before starting the server::
+
+   server.record_session("session.jsonl")
+   server.start_io()
+
+Recorded sessions can then be replayed against a server using
+:func:`replay_session`, without needing an editor, making them useful as
+reproducible performance and regression tests::
+
+   client = JsonRPCClient()
+   await client.start_io(sys.executable, "server.py")
+
+   report = await replay_session(client, "session.jsonl")
+   print(report.summary())
+
+Each line of a recording is a JSON array ``[time, direction, message]``, where
+``direction`` is either ``recv`` or ``send`` from the perspective of the recorded
+server.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+import typing
+from collections import defaultdict, deque
+
+import attrs
+
+from pygls.exceptions import JsonRpcException
+from pygls.metrics import Histogram
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterable
+    from typing import IO, Any, Deque, Dict, List, Optional, Union
+
+    from pygls.client import JsonRPCClient
+
+logger = logging.getLogger(__name__)
+
+RECV = "recv"
+SEND = "send"
+
+_LINE_BREAKS = bytes.maketrans(b"\r\n", b"  ")
+
+
+def _strip_header(data: bytes) -> bytes:
+    """Return the body of the given framed message."""
+    if data.startswith(b"Content-Length"):
+        return data[data.index(b"\r\n\r\n") + 4 :]
+
+    return data
+
+
+class SessionRecorder:
+    """Write the messages sent and received by a server to a file.
+
+    Parameters
+    ----------
+    path
+       The file to write the recording to, any existing contents are replaced.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self.path = pathlib.Path(path)
+
+        self._lock = threading.Lock()
+        self._file: Optional[IO[bytes]] = self.path.open("wb")
+        self._start = time.perf_counter()
+
+    def record(self, direction: str, body: bytes):
+        """Record a message.
+
+        Parameters
+        ----------
+        direction
+           Either ``recv`` or ``send``
+
+        body
+           The encoded message, without any headers
+        """
+        elapsed = time.perf_counter() - self._start
+
+        # The body is already valid JSON, so it can be embedded without re-encoding.
+        # Line breaks cannot appear within JSON strings, so any in the body are
+        # whitespace between tokens and are replaced to keep the message on one line.
+        body = body.strip().translate(_LINE_BREAKS)
+        line = b'[%.6f,"%s",%s]\n' % (elapsed, direction.encode(), body)
+
+        with self._lock:
+            if self._file is None:
+                return
+
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        """Stop recording."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def wrap_reader(self, reader: Any) -> RecordingReader:
+        """Wrap the given reader, so that each message read is recorded."""
+        return RecordingReader(reader, self)
+
+    def wrap_writer(self, writer: Any) -> RecordingWriter:
+        """Wrap the given writer, so that each message written is recorded."""
+        return RecordingWriter(writer, self)
+
+
+class RecordingReader:
+    """A reader that records each message read through it.
+
+    Supports both the synchronous and asynchronous reader interfaces, message bodies
+    are read using ``read`` and ``readexactly`` respectively.
+    """
+
+    def __init__(self, reader: Any, recorder: SessionRecorder):
+        self._reader = reader
+        self._recorder = recorder
+
+    def readline(self):
+        return self._reader.readline()
+
+    def read(self, n: int) -> bytes:
+        data = self._reader.read(n)
+        if data:
+            self._recorder.record(RECV, data)
+
+        return data
+
+    async def readexactly(self, n: int) -> bytes:
+        data = await self._reader.readexactly(n)
+        if data:
+            self._recorder.record(RECV, data)
+
+        return data
+
+
+class RecordingWriter:
+    """A writer that records each message written through it."""
+
+    def __init__(self, writer: Any, recorder: SessionRecorder):
+        self._writer = writer
+        self._recorder = recorder
+
+    def close(self):
+        return self._writer.close()
+
+    def write(self, data: bytes):
+        self._recorder.record(SEND, _strip_header(data))
+        return self._writer.write(data)
+
+    def writelines(self, data: Iterable[bytes]):
+        chunks = list(data)
+        self._recorder.record(SEND, _strip_header(b"".join(chunks)))
+
+        if (writelines := getattr(self._writer, "writelines", None)) is not None:
+            return writelines(chunks)
+
+        return self._writer.write(b"".join(chunks))
+
+
+@attrs.frozen
+class RecordedMessage:
+    """A message from a recorded session."""
+
+    time: float
+    """When the message was sent or received, in seconds since the start of the
+    recording."""
+
+    direction: str
+    """Either ``recv`` or ``send``, from the perspective of the recorded server."""
+
+    message: Dict[str, Any]
+    """The message itself"""
+
+
+def load_recording(path: Union[str, os.PathLike]) -> List[RecordedMessage]:
+    """Load the messages of a recorded session."""
+    messages = []
+
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+
+            timestamp, direction, message = json.loads(line)
+            messages.append(RecordedMessage(timestamp, direction, message))
+
+    return messages
+
+
+@attrs.frozen
+class ResponseDiff:
+    """A response that differs from the one in the recording."""
+
+    method: str
+    """The method of the request"""
+
+    msg_id: Any
+    """The id of the request"""
+
+    expected: Any
+    """The recorded response"""
+
+    actual: Any
+    """The response received during the replay"""
+
+
+@attrs.define
+class ReplayReport:
+    """The outcome of replaying a recorded session."""
+
+    messages: int = 0
+    """The number of messages sent to the server"""
+
+    duration: float = 0.0
+    """The time taken to replay the session, in seconds"""
+
+    latencies: Dict[str, Histogram] = attrs.Factory(lambda: defaultdict(Histogram))
+    """The time taken for the server to respond to each request, indexed by method.
+    Recorded in microseconds."""
+
+    diffs: List[ResponseDiff] = attrs.Factory(list)
+    """The responses that differ from the recording"""
+
+    @property
+    def throughput(self) -> float:
+        """The number of messages sent to the server per second."""
+        return self.messages / self.duration if self.duration > 0 else 0.0
+
+    def summary(self) -> str:
+        """Return a human readable summary of the report."""
+        lines = [
+            f"{self.messages} messages in {self.duration:.3f}s "
+            f"({self.throughput:.1f} msg/s), {len(self.diffs)} differing responses",
+            "",
+            f"{'method':<40} {'count':>6} {'p50':>10} {'p90':>10} {'p99':>10}",
+        ]
+
+        for method, histogram in sorted(self.latencies.items()):
+            p50, p90, p99 = (histogram.percentile(p) / 1000 for p in (50, 90, 99))
+            lines.append(
+                f"{method:<40} {histogram.count:>6} "
+                f"{p50:>8.2f}ms {p90:>8.2f}ms {p99:>8.2f}ms"
+            )
+
+        return "\n".join(lines)
+
+
+def _to_json(converter: Any, value: Any) -> Any:
+    """Convert a result received by the client back into plain JSON values."""
+    if hasattr(value, "_asdict"):
+        # Results of unknown methods are structured into namedtuples
+        value = value._asdict()
+
+    if isinstance(value, dict):
+        return {key: _to_json(converter, item) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        return [_to_json(converter, item) for item in value]
+
+    if hasattr(value, "__attrs_attrs__"):
+        return converter.unstructure(value)
+
+    return value
+
+
+def _response_of(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the part of a response message that should be compared."""
+    if (error := message.get("error")) is not None:
+        return {"error": {"code": error.get("code")}}
+
+    return {"result": message.get("result")}
+
+
+async def replay_session(
+    client: JsonRPCClient,
+    recording: Union[str, os.PathLike, Iterable[RecordedMessage]],
+    speed: Optional[float] = None,
+) -> ReplayReport:
+    """Replay a recorded session against the server the given client is connected
+    to.
+
+    Each message the recorded server received is sent to the server, using the
+    message's original id. Requests sent by the server are answered using the
+    responses found in the recording.
+
+    Parameters
+    ----------
+    client
+       The client to use, it must already be connected to a server. A plain
+       :class:`~pygls.client.JsonRPCClient` is recommended, so that messages are
+       sent exactly as they were recorded.
+
+    recording
+       The path to a recorded session, or the messages it contains
+
+    speed
+       If set, replay the session at the given multiple of its original speed.
+       Otherwise, each message is sent as soon as possible.
+
+    Returns
+    -------
+    ReplayReport
+       The throughput, latencies and any differences in the responses sent by the
+       server.
+    """
+    if isinstance(recording, (str, os.PathLike)):
+        recording = load_recording(recording)
+
+    messages = list(recording)
+    protocol = client.protocol
+    report = ReplayReport()
+
+    # The recorded responses to the server's requests, and the client's requests
+    expected: Dict[Any, Dict[str, Any]] = {}
+    client_responses: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+    server_requests: Dict[Any, str] = {}
+
+    for item in messages:
+        message = item.message
+        if "method" in message or "id" not in message:
+            if item.direction == SEND and "id" in message:
+                server_requests[message["id"]] = message["method"]
+            continue
+
+        if item.direction == SEND:
+            expected[message["id"]] = message
+        elif (method := server_requests.get(message["id"])) is not None:
+            client_responses[method].append(message)
+
+    # Answer the server's requests using the recorded responses.
+    for method in client_responses:
+        if method in protocol.fm.features:
+            continue
+
+        def respond(params, method=method):
+            responses = client_responses[method]
+            response = responses.popleft() if len(responses) > 0 else {}
+
+            if (error := response.get("error")) is not None:
+                raise JsonRpcException(
+                    code=error.get("code"), message=error.get("message", "")
+                )
+
+            return response.get("result")
+
+        client.feature(method)(respond)
+
+    pending: List[asyncio.Future[Any]] = []
+
+    def send_request(method: str, params: Any, msg_id: Any) -> asyncio.Future[Any]:
+        sent = time.perf_counter_ns()
+        future = protocol.send_request(method, params, msg_id=msg_id)
+
+        def on_response(fut):
+            elapsed = (time.perf_counter_ns() - sent) // 1000
+            report.latencies[method].record(elapsed)
+
+            try:
+                actual = {"result": _to_json(protocol._converter, fut.result())}
+            except JsonRpcException as exc:
+                actual = {"error": {"code": exc.code}}
+
+            if (recorded := expected.get(msg_id)) is None:
+                return
+
+            if actual != (want := _response_of(recorded)):
+                report.diffs.append(ResponseDiff(method, msg_id, want, actual))
+
+        future.add_done_callback(on_response)
+        return asyncio.wrap_future(future)
+
+    received = [item for item in messages if item.direction == RECV]
+    origin = received[0].time if received else 0.0
+    start = time.perf_counter()
+
+    for item in received:
+        message = item.message
+        method = message.get("method")
+
+        if method is None:
+            # A response to one of the server's requests, handled above.
+            continue
+
+        if speed is not None:
+            delay = (item.time - origin) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        if method in {"shutdown", "exit"}:
+            # Ensure the server has responded to everything before stopping it.
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        report.messages += 1
+
+        if "id" not in message:
+            protocol.notify(method, message.get("params"))
+            continue
+
+        future = send_request(method, message.get("params"), message["id"])
+        pending.append(future)
+
+        if method == "initialize":
+            await asyncio.gather(future, return_exceptions=True)
+
+    await asyncio.gather(*pending, return_exceptions=True)
+    report.duration = time.perf_counter() - start
+
+    return report
@@ -0,0 +1,93 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+from __future__ import annotations
+
+import logging
+import threading
+import typing
+from collections import OrderedDict
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Hashable, Tuple
+
+    # (uri, version, method, params fingerprint)
+    ResultKey = Tuple[str, int, str, Hashable]
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """A bounded, least recently used cache of feature results.
+
+    Many features such as ``textDocument/documentSymbol`` or
+    ``textDocument/foldingRange`` only depend on the contents of a document, yet
+    clients request them repeatedly. Marking a feature with ``@server.cache()``
+    allows pygls to serve repeat requests from this cache without calling the
+    feature's handler again::
+
+       @server.cache()
+       @server.feature(types.TEXT_DOCUMENT_DOCUMENT_SYMBOL)
+       def document_symbols(ls, params):
+           ...
+
+    Results are keyed by the document's uri and version, the method name and the
+    request's parameters. Only results for documents opened by the client are cached
+    and all entries for a document are dropped when it is changed or closed.
+
+    Parameters
+    ----------
+    max_size
+       The maximum number of results to keep
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._results: OrderedDict[ResultKey, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __getitem__(self, key: ResultKey) -> Any:
+        with self._lock:
+            result = self._results[key]
+            self._results.move_to_end(key)
+
+        logger.debug("Using cached result for %s", key)
+        return result
+
+    def __setitem__(self, key: ResultKey, result: Any):
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+    def clear(self):
+        """Remove all results from the cache."""
+        with self._lock:
+            self._results.clear()
+
+    def invalidate(self, uri: str):
+        """Remove all results associated with the given document."""
+        with self._lock:
+            stale = [key for key in self._results if key[0] == uri]
+
+            for key in stale:
+                del self._results[key]
@@ -0,0 +1,394 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Helpers for working with semantic tokens."""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import typing
+from array import array
+
+from lsprotocol import types
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterable
+    from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+    from pygls.protocol import JsonFragment
+    from pygls.workspace import PositionCodec, TextDocument
+
+    FullResult = Union[types.SemanticTokens, JsonFragment, None]
+    DeltaResult = Union[
+        types.SemanticTokens, types.SemanticTokensDelta, JsonFragment, None
+    ]
+
+logger = logging.getLogger(__name__)
+
+
+def _common_prefix_length(old: Sequence[int], new: Sequence[int]) -> int:
+    """Return the number of leading items shared by ``old`` and ``new``.
+
+    Uses a binary search over slice comparisons so that the element-wise work happens
+    in C rather than in a Python loop.
+    """
+    lo, hi = 0, min(len(old), len(new))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[lo:mid] == new[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+
+    return lo
+
+
+def _common_suffix_length(old: Sequence[int], new: Sequence[int], limit: int) -> int:
+    """Return the number of trailing items shared by ``old`` and ``new``, considering
+    at most ``limit`` items."""
+    len_old, len_new = len(old), len(new)
+
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[len_old - mid : len_old - lo] == new[len_new - mid : len_new - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+
+    return lo
+
+
+def compute_edits(
+    old: Sequence[int], new: Sequence[int]
+) -> List[types.SemanticTokensEdit]:
+    """Compute the edits required to transform the token array ``old`` into ``new``.
+
+    Parameters
+    ----------
+    old
+       The token data previously sent to the client
+
+    new
+       The token data that should be sent to the client
+
+    Returns
+    -------
+    List[SemanticTokensEdit]
+       An empty list if both arrays are the same, otherwise a single edit replacing
+       the region between the common prefix and suffix of both arrays.
+    """
+    if old == new:
+        return []
+
+    prefix = _common_prefix_length(old, new)
+    suffix = _common_suffix_length(old, new, limit=min(len(old), len(new)) - prefix)
+
+    data = list(new[prefix : len(new) - suffix])
+    return [
+        types.SemanticTokensEdit(
+            start=prefix,
+            delete_count=len(old) - prefix - suffix,
+            data=data or None,
+        )
+    ]
+
+
+class SemanticTokensCache:
+    """Remembers the semantic tokens most recently sent for each document.
+
+    This allows pygls to answer ``textDocument/semanticTokens/full/delta`` requests
+    with the minimal set of edits, even when the server's handler returns the full
+    list of tokens.
+
+    Tokens are stored in a compact ``array`` keyed by the document's uri, along with
+    the ``result_id`` they were sent with.
+    """
+
+    def __init__(self) -> None:
+        self._tokens: Dict[str, Tuple[str, array[int]]] = {}
+        self._result_ids = itertools.count(1)
+
+    def get(self, uri: str, result_id: str) -> Optional[array[int]]:
+        """Return the tokens previously sent for ``uri`` with the given ``result_id``,
+        if known."""
+        entry = self._tokens.get(uri)
+        if entry is None or entry[0] != result_id:
+            return None
+
+        return entry[1]
+
+    def remove(self, uri: str) -> None:
+        """Forget any tokens stored for the given document."""
+        self._tokens.pop(uri, None)
+
+    def _store(self, uri: str, tokens: types.SemanticTokens) -> array[int]:
+        """Record the given tokens, assigning a ``result_id`` if necessary."""
+        if tokens.result_id is None:
+            tokens.result_id = str(next(self._result_ids))
+
+        data = array("I", tokens.data)
+        self._tokens[uri] = (tokens.result_id, data)
+        return data
+
+    def full(self, uri: str, tokens: FullResult) -> FullResult:
+        """Record the result of a ``textDocument/semanticTokens/full`` request.
+
+        Parameters
+        ----------
+        uri
+           The uri of the document the tokens belong to
+
+        tokens
+           The result returned by the server's handler, either the tokens, pre-encoded
+           tokens or ``None``
+
+        Returns
+        -------
+        Union[SemanticTokens, JsonFragment, None]
+           The given result. If it is a ``SemanticTokens`` instance, its ``result_id``
+           will be set.
+        """
+        if not isinstance(tokens, types.SemanticTokens):
+            # Nothing to record, or the tokens were pre-encoded.
+            self.remove(uri)
+            return tokens
+
+        self._store(uri, tokens)
+        return tokens
+
+    def delta(
+        self, uri: str, previous_result_id: str, tokens: DeltaResult
+    ) -> DeltaResult:
+        """Convert the result of a ``textDocument/semanticTokens/full/delta`` request
+        into a delta, if possible.
+
+        Parameters
+        ----------
+        uri
+           The uri of the document the tokens belong to
+
+        previous_result_id
+           The ``result_id`` the client has the tokens for
+
+        tokens
+           The result returned by the server's handler
+
+        Returns
+        -------
+        Union[SemanticTokens, SemanticTokensDelta, JsonFragment, None]
+           If ``tokens`` is a full set of tokens and the tokens for
+           ``previous_result_id`` are known, a ``SemanticTokensDelta`` containing the
+           required edits. Otherwise, the given ``tokens``.
+        """
+        if not isinstance(tokens, types.SemanticTokens):
+            # Either there are no tokens, the handler computed the delta itself or
+            # sent pre-encoded tokens. In all cases our copy of the document's tokens
+            # is now out of date.
+            self.remove(uri)
+            return tokens
+
+        previous = self.get(uri, previous_result_id)
+        current = self._store(uri, tokens)
+
+        if previous is None:
+            logger.debug(
+                "Unknown result id '%s' for '%s', sending full tokens",
+                previous_result_id,
+                uri,
+            )
+            return tokens
+
+        return types.SemanticTokensDelta(
+            result_id=tokens.result_id,
+            edits=compute_edits(previous, current),
+        )
+
+
+class SemanticTokensBuilder:
+    """Build the ``data`` array of a semantic tokens response.
+
+    Tokens are pushed using absolute positions in server units (code points) and
+    stored in a compact ``array``. When the response is built, each token's position
+    is converted into the client's position encoding and encoded relative to the
+    previous token in a single pass.
+
+    Example
+    -------
+    ::
+
+       builder = SemanticTokensBuilder(legend)
+       builder.push(0, 0, 2, "keyword")
+       builder.push(0, 3, 4, "function", ["definition"])
+
+       return builder.build(ls.workspace.get_text_document(uri))
+
+    Parameters
+    ----------
+    legend
+       The legend the server registered its semantic tokens capability with, used to
+       resolve token type and modifier names into their encoded values.
+    """
+
+    def __init__(self, legend: types.SemanticTokensLegend):
+        self._token_types = {name: idx for idx, name in enumerate(legend.token_types)}
+        self._token_modifiers = {
+            name: 1 << idx for idx, name in enumerate(legend.token_modifiers)
+        }
+
+        self._data: array[int] = array("I")
+        self._is_sorted = True
+
+    def __len__(self) -> int:
+        return len(self._data) // 5
+
+    def push(
+        self,
+        line: int,
+        character: int,
+        length: int,
+        token_type: Union[int, str],
+        token_modifiers: Union[int, Iterable[str]] = 0,
+    ) -> None:
+        """Add a token.
+
+        Parameters
+        ----------
+        line
+           The line the token is on
+
+        character
+           The offset of the start of the token, in code points
+
+        length
+           The length of the token, in code points
+
+        token_type
+           The type of the token, either as an index into the legend's token types,
+           or the name of the type
+
+        token_modifiers
+           The modifiers to apply to the token, either as a bitmask or the names of
+           the modifiers
+        """
+        if isinstance(token_type, str):
+            token_type = self._token_types[token_type]
+
+        if not isinstance(token_modifiers, int):
+            modifiers = 0
+            for name in token_modifiers:
+                modifiers |= self._token_modifiers[name]
+
+            token_modifiers = modifiers
+
+        data = self._data
+        if self._is_sorted and len(data) > 0:
+            self._is_sorted = (data[-5], data[-4]) <= (line, character)
+
+        data.extend((line, character, length, token_type, token_modifiers))
+
+    def _sorted_data(self) -> array[int]:
+        """Return the pushed tokens, ordered by position."""
+        data = self._data
+        if self._is_sorted:
+            return data
+
+        result = array("I")
+        for idx in sorted(range(0, len(data), 5), key=lambda i: (data[i], data[i + 1])):
+            result.extend(data[idx : idx + 5])
+
+        return result
+
+    def encode(self, lines: Sequence[str], position_codec: PositionCodec) -> array[int]:
+        """Encode the tokens into the format expected by the client.
+
+        Parameters
+        ----------
+        lines
+           The lines of the document the tokens belong to
+
+        position_codec
+           The codec to use when converting positions into client units
+
+        Returns
+        -------
+        array[int]
+           The encoded token data
+        """
+        data = self._sorted_data()
+        result = array("I", bytes(data.itemsize * len(data)))
+        num_units = position_codec.client_num_units
+
+        num_lines = len(lines)
+        text, text_line, is_ascii = "", -1, True
+        prev_line, prev_character = 0, 0
+
+        # The character up to which the current line has been measured, and its
+        # length in client units. Tokens are sorted, so each token only needs to
+        # measure the text since the previous one.
+        measured, measured_units = 0, 0
+
+        for idx in range(0, len(data), 5):
+            line, character, length = data[idx], data[idx + 1], data[idx + 2]
+
+            if line != text_line:
+                text_line = line
+                text = lines[line] if line < num_lines else ""
+                is_ascii = text.isascii()
+                measured, measured_units = 0, 0
+
+            # ASCII text is encoded using a single code unit per character in every
+            # supported encoding so no conversion is necessary.
+            if not is_ascii:
+                length = num_units(text[character : character + length])
+                measured_units += num_units(text[measured:character])
+                measured, character = character, measured_units
+
+            result[idx] = line - prev_line
+            result[idx + 1] = (
+                character - prev_character if line == prev_line else character
+            )
+            result[idx + 2] = length
+            result[idx + 3] = data[idx + 3]
+            result[idx + 4] = data[idx + 4]
+
+            prev_line, prev_character = line, character
+
+        return result
+
+    def build(
+        self, document: TextDocument, result_id: Optional[str] = None
+    ) -> types.SemanticTokens:
+        """Build the semantic tokens for the given document.
+
+        Parameters
+        ----------
+        document
+           The document the tokens belong to
+
+        result_id
+           The result id to include in the response, if any
+
+        Returns
+        -------
+        SemanticTokens
+           The semantic tokens response
+        """
+        return types.SemanticTokens(
+            data=self.encode(document.lines, document.position_codec),
+            result_id=result_id,
+        )
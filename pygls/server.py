@@ -28,14 +28,22 @@ import cattrs
 from pygls import IS_WASM
 from pygls.exceptions import JsonRpcException, PyglsError
 from pygls.io_ import StdinAsyncReader, StdoutWriter, run, run_async, run_websocket
+from pygls.metrics import Metrics
 from pygls.protocol import JsonRPCProtocol
+from pygls.recording import SessionRecorder
+from pygls.watchdog import Watchdog
 
 if typing.TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+    from os import PathLike
     from typing import Any, BinaryIO, Callable, Optional, Type, TypeVar, Union
 
     from websockets.asyncio.server import Server as WSServer
     from websockets.asyncio.server import ServerConnection
 
+    from pygls.tracing import Tracer
+    from pygls.watchdog import Stall
+
     F = TypeVar("F", bound=Callable)
     ServerErrors = Union[type[PyglsError], type[JsonRpcException]]
 
@@ -72,9 +80,134 @@ class JsonRPCServer:
         self._server: asyncio.Server | WSServer | None = None
         self._stop_event: Event | None = None
         self._thread_pool: ThreadPoolExecutor | None = None
+        self._metrics_server: ThreadingHTTPServer | None = None
+        self._recorder: SessionRecorder | None = None
 
         self.protocol = protocol_cls(self, converter_factory())
 
+    @property
+    def metrics(self) -> Metrics | None:
+        """The server's metrics, if enabled."""
+        return self.protocol.metrics
+
+    def enable_metrics(
+        self, port: int | None = None, host: str = "127.0.0.1"
+    ) -> Metrics:
+        """Start recording metrics about the messages handled by the server.
+
+        Parameters
+        ----------
+        port
+           If set, serve the metrics in the Prometheus text format on the given port.
+
+        host
+           The address to serve the metrics on, defaults to the local machine only.
+
+        Returns
+        -------
+        Metrics
+           The metrics registry
+        """
+        if (metrics := self.protocol.metrics) is None:
+            metrics = self.protocol.metrics = Metrics()
+
+        if port is not None and self._metrics_server is None:
+            self._metrics_server = metrics.start_http_server(port, host)
+
+        return metrics
+
+    @property
+    def tracer(self) -> Tracer | None:
+        """The tracer used to trace the messages handled by the server, if any."""
+        return self.protocol.tracer
+
+    def set_tracer(self, tracer: Tracer | None):
+        """Set the tracer used to trace the messages handled by the server.
+
+        See :mod:`pygls.tracing` for details.
+
+        Parameters
+        ----------
+        tracer
+           The tracer to use, e.g. an OpenTelemetry ``Tracer``. If ``None``, tracing
+           is disabled.
+        """
+        self.protocol.tracer = tracer
+
+    def enable_watchdog(
+        self,
+        threshold: float = 1.0,
+        callback: Callable[[Stall], Any] | None = None,
+    ) -> Watchdog:
+        """Report handlers that block the event loop for longer than ``threshold``
+        seconds.
+
+        Each stall is logged along with the stack of the event loop thread and the
+        message being handled at the time. If metrics are enabled, stalls are also
+        counted in :attr:`Metrics.stalls <pygls.metrics.Metrics>`.
+
+        The watchdog starts watching once the server starts processing messages.
+        See :mod:`pygls.watchdog` for details.
+
+        .. note::
+
+           The watchdog runs in a background thread and watches the server's event
+           loop. It is therefore not available on WebAssembly platforms, where
+           :meth:`start_io` processes messages synchronously without an event loop.
+           Servers started with :meth:`start_io` on other platforms, or with
+           :meth:`start_tcp` or :meth:`start_ws`, are watched.
+
+        Parameters
+        ----------
+        threshold
+           How long the event loop may be unresponsive for before it is reported, in
+           seconds.
+
+        callback
+           If set, called from the watchdog's thread with the details of each stall.
+
+        Returns
+        -------
+        Watchdog
+           The watchdog
+        """
+        if (watchdog := self.protocol.watchdog) is None:
+            watchdog = self.protocol.watchdog = Watchdog(self.protocol)
+
+        watchdog.threshold = threshold
+        watchdog.callback = callback
+        return watchdog
+
+    def record_session(self, path: str | PathLike) -> SessionRecorder:
+        """Record every message sent and received by the server to the given file.
+
+        The recording can be replayed using :func:`~pygls.recording.replay_session`.
+        Must be called before the server is started, recording sessions served over
+        WebSockets is not supported.
+
+        Parameters
+        ----------
+        path
+           The file to write the recording to
+
+        Returns
+        -------
+        SessionRecorder
+           The recorder
+        """
+        if self._recorder is not None:
+            self._recorder.close()
+
+        self._recorder = SessionRecorder(path)
+        return self._recorder
+
+    def _wrap_transport(self, reader: Any, writer: Any) -> tuple[Any, Any]:
+        """Wrap the given reader and writer, so that messages can be recorded."""
+        if (recorder := self._recorder) is None:
+            return reader, writer
+
+        return recorder.wrap_reader(reader), recorder.wrap_writer(writer)
+
     def shutdown(self):
         """Shutdown server."""
         logger.info("Shutting down the server")
@@ -88,6 +221,16 @@ class JsonRPCServer:
         if self._server:
             self._server.close()
 
+        if self.protocol.watchdog is not None:
+            self.protocol.watchdog.stop()
+
+        if self._metrics_server:
+            self._metrics_server.shutdown()
+            self._metrics_server.server_close()
+
+        if self._recorder is not None:
+            self._recorder.close()
+
     def _report_server_error(
         self,
         error: Exception,
@@ -120,8 +263,10 @@ class JsonRPCServer:
         logger.info("Starting async IO server")
 
         self._stop_event = Event()
-        reader = StdinAsyncReader(stdin or sys.stdin.buffer, self.thread_pool)
-        writer = StdoutWriter(stdout or sys.stdout.buffer)
+        reader, writer = self._wrap_transport(
+            StdinAsyncReader(stdin or sys.stdin.buffer, self.thread_pool),
+            StdoutWriter(stdout or sys.stdout.buffer),
+        )
         self.protocol.set_writer(writer)
 
         try:
@@ -148,14 +293,16 @@ class JsonRPCServer:
         logger.info("Starting sync IO server")
 
         self._stop_event = Event()
-        writer = StdoutWriter(stdout or sys.stdout.buffer)
+        reader, writer = self._wrap_transport(
+            stdin or sys.stdin.buffer, StdoutWriter(stdout or sys.stdout.buffer)
+        )
         self.protocol.set_writer(writer)
 
         try:
             asyncio.run(
                 run(
                     stop_event=self._stop_event,
-                    reader=stdin or sys.stdin.buffer,
+                    reader=reader,
                     protocol=self.protocol,
                     logger=logger,
                     error_handler=self.report_server_error,
@@ -178,10 +325,11 @@ class JsonRPCServer:
             reader: asyncio.StreamReader, writer: asyncio.StreamWriter
         ):
             logger.debug("Connected to client")
-            self.protocol.set_writer(writer)  # type: ignore
+            transport_reader, transport_writer = self._wrap_transport(reader, writer)
+            self.protocol.set_writer(transport_writer)
             await run_async(
                 stop_event=stop_event,
-                reader=reader,
+                reader=transport_reader,
                 protocol=self.protocol,
                 logger=logger,
                 error_handler=self.report_server_error,
@@ -271,6 +419,17 @@ class JsonRPCServer:
            @ls.feature('textDocument/completion', CompletionOptions(trigger_characters=['.']))
            def completions(ls, params: CompletionParams):
                return CompletionList(is_incomplete=False, items=[CompletionItem("Completion 1")])
+
+        Features returning a list of items that support partial results, such as
+        ``textDocument/references`` or ``workspace/symbol``, can also be written as
+        an ``async`` generator yielding the items in chunks. If the client provided a
+        ``partial_result_token``, each chunk is sent to it as a partial result,
+        otherwise all the chunks are combined into a single response::
+
+           @ls.feature('workspace/symbol')
+           async def workspace_symbols(ls, params: WorkspaceSymbolParams):
+               for uri in ls.workspace.documents:
+                   yield await find_symbols(uri)
         """
         return self.protocol.fm.feature(feature_name, options)
 
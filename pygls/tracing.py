@@ -0,0 +1,153 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Hooks for tracing the lifecycle of messages handled by pygls.
+
+Tracing is disabled by default. To enable it, install a tracer on the server::
+
+   from opentelemetry import trace
+
+   server.set_tracer(trace.get_tracer("my-language-server"))
+
+Any object implementing the subset of OpenTelemetry's ``Tracer`` API described by
+:class:`Tracer` can be used.
+
+A span is started for each request and notification received by the server. Its
+events mark when the message was structured, scheduled, and when its handler
+started and finished executing. The span is ended once the response has been
+written, or when the handler of a notification has finished.
+
+While a handler is executing, including any sub-handlers it yields to and handlers
+running in the thread pool, its span is available from :func:`current_span`.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import typing
+
+from pygls.protocol.json_rpc import wrap_handler
+
+if typing.TYPE_CHECKING:
+    from concurrent.futures import Future
+    from typing import Any, Mapping, Optional, Protocol
+
+    from pygls.protocol.json_rpc import HandlerKind, MessageCallback, MessageHandler
+
+    class Span(Protocol):
+        """The subset of OpenTelemetry's ``Span`` API used by pygls."""
+
+        def set_attribute(self, key: str, value: Any) -> None: ...
+
+        def add_event(
+            self,
+            name: str,
+            attributes: Optional[Mapping[str, Any]] = None,
+            timestamp: Optional[int] = None,
+        ) -> None: ...
+
+        def record_exception(self, exception: BaseException) -> None: ...
+
+        def end(self) -> None: ...
+
+    class Tracer(Protocol):
+        """The subset of OpenTelemetry's ``Tracer`` API used by pygls."""
+
+        def start_span(
+            self,
+            name: str,
+            attributes: Optional[Mapping[str, Any]] = None,
+            start_time: Optional[int] = None,
+        ) -> Span: ...
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "pygls_span", default=None
+)
+
+
+def current_span() -> Optional[Span]:
+    """Return the span of the message currently being handled, if any."""
+    return _current_span.get()
+
+
+def bind_span(span: Span, handler: MessageHandler, kind: HandlerKind) -> MessageHandler:
+    """Wrap the given handler so that ``span`` is the current span while it executes.
+
+    The span is propagated to any sub-handlers yielded by generator handlers,
+    wherever they end up running. The returned handler should be executed the same
+    way as the original.
+    """
+
+    def enter():
+        return _current_span.set(span)
+
+    def exit(token, _):
+        _current_span.reset(token)
+
+    return wrap_handler(handler, kind, enter, exit, each_step=True)
+
+
+def trace_handler(
+    span: Span, handler: MessageHandler, kind: HandlerKind, end: bool = False
+) -> MessageHandler:
+    """Wrap the given handler so that its execution is recorded on ``span``.
+
+    Parameters
+    ----------
+    span
+       The span of the message being handled
+
+    handler
+       The handler to wrap
+
+    kind
+       How the handler will be executed
+
+    end
+       If set, end the span once the handler has finished
+    """
+
+    def started():
+        span.add_event("handler.start")
+
+    def finished(_, error: Optional[BaseException]):
+        if error is not None:
+            span.record_exception(error)
+
+        span.add_event("handler.end")
+        if end:
+            span.end()
+
+    return bind_span(span, wrap_handler(handler, kind, started, finished), kind)
+
+
+def trace_callback(span: Span, callback: MessageCallback) -> MessageCallback:
+    """Wrap the given callback, used to send the result of a request, so that
+    ``span`` is ended once the response has been written."""
+
+    def wrapper(future: Future[Any]):
+        if future.cancelled():
+            span.add_event("cancelled")
+
+        try:
+            result = callback(future)
+            span.add_event("response.sent")
+            return result
+        finally:
+            span.end()
+
+    return wrapper
@@ -21,11 +21,14 @@ A collection of URI utilities with logic built on the VSCode URI library.
 
 https://github.com/Microsoft/vscode-uri/blob/e59cab84f5df6265aed18ae5f43552d3eef13bb9/lib/index.ts
 """
+
 from __future__ import annotations
 
-from typing import Optional, Tuple
+from typing import NamedTuple, Optional, Tuple
 
+import functools
 import re
+import sys
 from urllib import parse
 
 from pygls import IS_WIN
@@ -34,6 +37,44 @@ RE_DRIVE_LETTER_PATH = re.compile(r"^\/[a-zA-Z]:")
 
 URLParts = Tuple[str, str, str, str, str, str]
 
+URI_CACHE_SIZE = 4096
+"""The maximum number of URIs remembered by :func:`normalize_uri`."""
+
+
+class NormalizedUri(NamedTuple):
+    """The parts of a URI used to store and look up documents."""
+
+    key: str
+    """The URI with any percent-encoded characters decoded.
+
+    Used as a dictionary key, so that differently encoded forms of a URI refer to
+    the same document. Keys are interned, so equal keys share the same string."""
+
+    scheme: str
+    """The URI's (decoded) scheme."""
+
+    path: str
+    """The URI's (decoded) path."""
+
+    fs_path: Optional[str]
+    """The filesystem path of the URI, see :func:`to_fs_path`."""
+
+
+@functools.lru_cache(maxsize=URI_CACHE_SIZE)
+def normalize_uri(uri: str) -> NormalizedUri:
+    """Return the normalized form of the given URI.
+
+    Results are cached, since the same few URIs are typically referenced by every
+    message sent to the server.
+    """
+    scheme, netloc, path, *_ = urlparse(uri)
+    return NormalizedUri(
+        key=sys.intern(parse.unquote(uri)),
+        scheme=scheme,
+        path=path,
+        fs_path=_fs_path(scheme, netloc, path),
+    )
+
 
 def _normalize_win_path(path: str):
     netloc = ""
@@ -86,30 +127,34 @@ def to_fs_path(uri: str) -> str | None:
     path for invalid characters and semantics.
     """
     try:
-        # scheme://netloc/path;parameters?query#fragment
-        scheme, netloc, path, _, _, _ = urlparse(uri)
+        return normalize_uri(uri).fs_path
+    except TypeError:
+        return None
 
-        if scheme != "file":
-            return None
 
-        if netloc and path:
-            # unc path: file://shares/c$/far/boo
-            value = f"//{netloc}{path}"
+def _fs_path(scheme: str, netloc: str, path: str) -> str | None:
+    """Return the filesystem path corresponding with the given (decoded) parts of a
+    URI."""
+    # scheme://netloc/path;parameters?query#fragment
+    if scheme != "file":
+        return None
 
-        elif RE_DRIVE_LETTER_PATH.match(path):
-            # windows drive letter: file:///C:/far/boo
-            value = path[1].lower() + path[2:]
+    if netloc and path:
+        # unc path: file://shares/c$/far/boo
+        value = f"//{netloc}{path}"
 
-        else:
-            # Other path
-            value = path
+    elif RE_DRIVE_LETTER_PATH.match(path):
+        # windows drive letter: file:///C:/far/boo
+        value = path[1].lower() + path[2:]
 
-        if IS_WIN:
-            value = value.replace("/", "\\")
+    else:
+        # Other path
+        value = path
 
-        return value
-    except TypeError:
-        return None
+    if IS_WIN:
+        value = value.replace("/", "\\")
+
+    return value
 
 
 def uri_scheme(uri: str):
@@ -0,0 +1,232 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Detect handlers that block the server's event loop.
+
+A synchronous handler that performs slow work (such as I/O) on the event loop
+prevents every other message from being processed until it finishes. The watchdog
+runs in a background thread and regularly checks that the event loop is still
+responsive. When it is not, it captures a snapshot of the event loop thread's stack
+along with the message being handled and reports it.
+
+The watchdog is disabled by default, enable it using
+:meth:`~pygls.server.JsonRPCServer.enable_watchdog`::
+
+   server.enable_watchdog(threshold=0.5)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import typing
+
+import attrs
+
+from pygls.protocol.json_rpc import wrap_handler
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Callable, Optional, Tuple
+
+    from pygls.protocol import JsonRPCProtocol
+    from pygls.protocol.json_rpc import HandlerKind, MessageHandler, MsgId
+
+logger = logging.getLogger(__name__)
+
+
+@attrs.frozen
+class Stall:
+    """Details of a period where the event loop was unresponsive."""
+
+    duration: float
+    """How long the event loop had been unresponsive for when the stall was
+    detected, in seconds."""
+
+    method: Optional[str]
+    """The method of the message being handled, if known."""
+
+    msg_id: Optional[MsgId]
+    """The id of the request being handled, if any."""
+
+    stack: str
+    """The stack of the event loop thread at the time the stall was detected."""
+
+
+class Watchdog:
+    """Report periods where the event loop fails to respond within ``threshold``
+    seconds.
+
+    Each stall is logged as a warning and counted in the server's metrics, if
+    enabled.
+
+    Parameters
+    ----------
+    protocol
+       The protocol whose event loop should be watched
+
+    threshold
+       How long the event loop may be unresponsive for before it is reported, in
+       seconds.
+
+    callback
+       If set, called from the watchdog's thread with the :class:`Stall` each time
+       one is detected.
+    """
+
+    def __init__(
+        self,
+        protocol: JsonRPCProtocol,
+        threshold: float = 1.0,
+        callback: Optional[Callable[[Stall], Any]] = None,
+    ):
+        self.protocol = protocol
+        self.threshold = threshold
+        self.callback = callback
+
+        # The message whose handler is currently running on the event loop.
+        self._active: Optional[Tuple[str, Optional[MsgId]]] = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        # Heartbeat state
+        self._pending = False
+        self._sent_at = 0.0
+        self._stalled = False
+
+    @property
+    def interval(self) -> float:
+        """How often the event loop is checked, in seconds."""
+        return min(self.threshold / 4, 0.25)
+
+    @property
+    def is_running(self) -> bool:
+        """Indicates if the watchdog is currently watching an event loop."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start watching the event loop running in the current thread."""
+        if self.is_running:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop_event = threading.Event()
+        self._pending = False
+        self._stalled = False
+
+        self._thread = threading.Thread(
+            target=self._watch, name="pygls-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching the event loop."""
+        self._stop_event.set()
+
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _watch(self):
+        loop = self._loop
+        assert loop is not None
+
+        while not self._stop_event.wait(self.interval):
+            now = time.monotonic()
+
+            if not self._pending:
+                self._pending = True
+                self._sent_at = now
+
+                try:
+                    loop.call_soon_threadsafe(self._heartbeat)
+                except RuntimeError:
+                    # The loop has been closed
+                    return
+
+            elif not self._stalled and now - self._sent_at >= self.threshold:
+                self._stalled = True
+                self._report(now - self._sent_at)
+
+    def _heartbeat(self):
+        """Called on the event loop, indicating that it is responsive."""
+        if self._stalled:
+            logger.warning(
+                "Event loop recovered after %.2fs", time.monotonic() - self._sent_at
+            )
+
+        self._pending = False
+        self._stalled = False
+
+    def _report(self, duration: float):
+        """Report that the event loop has been unresponsive for ``duration``
+        seconds."""
+        frame = sys._current_frames().get(self._loop_thread_id)  # type: ignore[arg-type]
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        del frame
+
+        method, msg_id = self._active or (None, None)
+        stall = Stall(duration=duration, method=method, msg_id=msg_id, stack=stack)
+
+        logger.warning(
+            "Event loop unresponsive for %.2fs while handling %r (id: %s)\n%s",
+            duration,
+            method,
+            msg_id,
+            stack,
+        )
+
+        if (metrics := self.protocol.metrics) is not None:
+            metrics.record_stall()
+
+        if self.callback is not None:
+            try:
+                self.callback(stall)
+            except Exception:
+                logger.exception("Error in watchdog callback")
+
+    def instrument_handler(
+        self,
+        method: str,
+        msg_id: Optional[MsgId],
+        handler: MessageHandler,
+        kind: HandlerKind,
+    ) -> MessageHandler:
+        """Wrap the given handler so that the watchdog knows which message is being
+        handled while it runs on the event loop.
+
+        The returned handler should be executed the same way as the original.
+        """
+        message = (method, msg_id)
+
+        def enter():
+            previous, self._active = self._active, message
+            return previous
+
+        def exit(previous, _):
+            self._active = previous
+
+        # Handlers running in the thread pool cannot block the event loop
+        return wrap_handler(
+            handler, kind, enter, exit, each_step=True, wrap_threads=False
+        )
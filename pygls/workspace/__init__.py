@@ -1,10 +1,14 @@
 from .workspace import Workspace
-from .text_document import TextDocument
+from .notebook_document import ConcatenatedNotebookDocument
+from .text_document import DocumentEdit, TextDocument, TextDocumentSnapshot
 from .position_codec import PositionCodec, ServerTextPosition, ServerTextRange
 
 __all__ = (
     "Workspace",
+    "ConcatenatedNotebookDocument",
+    "DocumentEdit",
     "TextDocument",
+    "TextDocumentSnapshot",
     "PositionCodec",
     "ServerTextPosition",
     "ServerTextRange",
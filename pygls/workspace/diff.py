@@ -0,0 +1,372 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Compute the differences between two versions of a document.
+
+Lines are first hashed, so that they can be compared as integers. The sequences are
+then split on lines that appear exactly once in both versions (as in "patience
+diff"), and any remaining differences are found using Myers' linear space diff
+algorithm.
+
+:func:`compute_text_edits` can be used to return a minimal set of edits from a
+formatting request, rather than replacing the whole document::
+
+   @server.feature(types.TEXT_DOCUMENT_FORMATTING)
+   def format_document(ls: LanguageServer, params: types.DocumentFormattingParams):
+       document = ls.workspace.get_text_document(params.text_document.uri)
+       return compute_text_edits(document, format_source(document.source))
+"""
+
+from __future__ import annotations
+
+import bisect
+import typing
+
+from lsprotocol import types
+
+from .position_codec import ServerTextPosition
+
+if typing.TYPE_CHECKING:
+    from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+    from .position_codec import PositionCodec
+    from .text_document import TextDocument
+
+    Hunk = Tuple[int, int, int, int]
+    """A range of items ``a[i1:i2]`` that should be replaced by ``b[j1:j2]``."""
+
+
+# If finding the differences between two sequences would require more than this
+# many comparisons, they are reported as a single change instead.
+COST_LIMIT = 4_000_000
+
+# Sequences shorter than this are compared directly, without first looking for
+# unique items to split them on.
+ANCHOR_THRESHOLD = 64
+
+# Changed lines are only compared character by character if they contain fewer than
+# this many characters in total.
+REFINE_LIMIT = 20_000
+
+
+def compute_text_edits(document: TextDocument, new_source: str) -> List[types.TextEdit]:
+    """Return the edits that transform the given document's source into
+    ``new_source``.
+
+    The lines that differ are found first, then the characters that differ within
+    each group of changed lines, so that the edits are as small as possible.
+
+    Parameters
+    ----------
+    document
+       The document to edit
+
+    new_source
+       The desired contents of the document
+
+    Returns
+    -------
+    List[types.TextEdit]
+       The edits, in document order, with positions in the client's position
+       encoding.
+    """
+    lines = document.lines
+    new_lines = new_source.splitlines(True)
+    codec = document.position_codec
+
+    edits = []
+    for i1, i2, j1, j2 in diff_lines(lines, new_lines):
+        if i2 - i1 == j2 - j1:
+            # Most likely each line has been modified in place e.g. by a formatter,
+            # so compare the lines individually.
+            for offset in range(i2 - i1):
+                edits.extend(
+                    _refine(
+                        lines,
+                        i1 + offset,
+                        i1 + offset + 1,
+                        new_lines[j1 + offset],
+                        codec,
+                    )
+                )
+        else:
+            edits.extend(_refine(lines, i1, i2, "".join(new_lines[j1:j2]), codec))
+
+    return edits
+
+
+def _refine(
+    lines: Sequence[str], start: int, end: int, new_text: str, codec: PositionCodec
+) -> List[types.TextEdit]:
+    """Return the edits that replace ``lines[start:end]`` with ``new_text``, comparing
+    the text character by character if it is small enough."""
+    old_text = "".join(lines[start:end])
+
+    if len(old_text) + len(new_text) <= REFINE_LIMIT:
+        changes = diff_sequences(old_text, new_text)
+    else:
+        changes = [(0, len(old_text), 0, len(new_text))]
+
+    # Offsets into old_text of the start of each line
+    line_starts = [0]
+    for line in lines[start:end]:
+        line_starts.append(line_starts[-1] + len(line))
+
+    def position(offset: int) -> types.Position:
+        idx = bisect.bisect_right(line_starts, offset) - 1
+        line, character = start + idx, offset - line_starts[idx]
+
+        if line >= len(lines):
+            # The end of a document without a trailing newline
+            last = lines[-1] if len(lines) > 0 else "\n"
+            if len(last.splitlines()[0]) != len(last):
+                return types.Position(line=line, character=0)
+
+            line, character = len(lines) - 1, len(last)
+
+        if lines[line].isascii():
+            return types.Position(line=line, character=character)
+
+        return codec.position_to_client_units(
+            lines, ServerTextPosition(line, character)
+        )
+
+    return [
+        types.TextEdit(
+            range=types.Range(start=position(c1), end=position(c2)),
+            new_text=new_text[d1:d2],
+        )
+        for c1, c2, d1, d2 in changes
+    ]
+
+
+def diff_lines(old: Sequence[str], new: Sequence[str]) -> List[Hunk]:
+    """Return the ranges of lines that differ between ``old`` and ``new``.
+
+    Parameters
+    ----------
+    old
+       The lines of the original text
+
+    new
+       The lines of the new text
+
+    Returns
+    -------
+    List[Tuple[int, int, int, int]]
+       A list of ``(i1, i2, j1, j2)`` tuples in ascending order, each indicating that
+       ``old[i1:i2]`` should be replaced with ``new[j1:j2]``. The lines between
+       hunks are the same in both versions.
+    """
+    # Skip the common prefix and suffix before hashing the remaining lines, in the
+    # common case of a small change this is all that's required.
+    start = 0
+    end = min(len(old), len(new))
+    while start < end and old[start] == new[start]:
+        start += 1
+
+    old_end, new_end = len(old), len(new)
+    while old_end > start and new_end > start and old[old_end - 1] == new[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+
+    ids: Dict[str, int] = {}
+    a = [ids.setdefault(line, len(ids)) for line in old[start:old_end]]
+    b = [ids.setdefault(line, len(ids)) for line in new[start:new_end]]
+
+    return [
+        (i1 + start, i2 + start, j1 + start, j2 + start)
+        for i1, i2, j1, j2 in diff_sequences(a, b)
+    ]
+
+
+def diff_sequences(a: Sequence[Hashable], b: Sequence[Hashable]) -> List[Hunk]:
+    """Return the ranges of items that differ between sequences ``a`` and ``b``.
+
+    See :func:`diff_lines` for a description of the result.
+    """
+    hunks: List[Hunk] = []
+    stack = [(0, len(a), 0, len(b))]
+
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+
+        # Skip the common prefix and suffix
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+
+        if alo == ahi or blo == bhi:
+            if alo != ahi or blo != bhi:
+                hunks.append((alo, ahi, blo, bhi))
+            continue
+
+        if (ahi - alo) + (bhi - blo) > ANCHOR_THRESHOLD and (
+            anchors := _unique_anchors(a, alo, ahi, b, blo, bhi)
+        ):
+            for i, j in anchors:
+                stack.append((alo, i, blo, j))
+                alo, blo = i + 1, j + 1
+
+            stack.append((alo, ahi, blo, bhi))
+            continue
+
+        snake = _middle_snake(a, alo, ahi, b, blo, bhi)
+        if snake is None or snake == (alo, blo, ahi, bhi):
+            hunks.append((alo, ahi, blo, bhi))
+            continue
+
+        x, y, u, v = snake
+        stack.append((alo, x, blo, y))
+        stack.append((u, ahi, v, bhi))
+
+    return _merge(hunks)
+
+
+def _merge(hunks: List[Hunk]) -> List[Hunk]:
+    """Sort the given hunks, merging any that are adjacent."""
+    merged: List[Hunk] = []
+
+    for hunk in sorted(hunks):
+        if merged and merged[-1][1] == hunk[0] and merged[-1][3] == hunk[2]:
+            i1, _, j1, _ = merged[-1]
+            merged[-1] = (i1, hunk[1], j1, hunk[3])
+        else:
+            merged.append(hunk)
+
+    return merged
+
+
+def _unique_anchors(
+    a: Sequence[Hashable],
+    alo: int,
+    ahi: int,
+    b: Sequence[Hashable],
+    blo: int,
+    bhi: int,
+) -> List[Tuple[int, int]]:
+    """Return the longest increasing sequence of items that occur exactly once in
+    both ``a[alo:ahi]`` and ``b[blo:bhi]``, as pairs of indices."""
+
+    counts: Dict[Hashable, List[int]] = {}
+    for i in range(alo, ahi):
+        entry = counts.setdefault(a[i], [0, i, 0, 0])
+        entry[0] += 1
+
+    for j in range(blo, bhi):
+        if (found := counts.get(b[j])) is not None:
+            found[2] += 1
+            found[3] = j
+
+    pairs = sorted(
+        (i, j) for count, i, count_b, j in counts.values() if count == count_b == 1
+    )
+    if len(pairs) == 0:
+        return []
+
+    # Patience sort, to find the longest sequence of pairs increasing in b.
+    tails: List[int] = []
+    tail_indices: List[int] = []
+    previous: List[Optional[int]] = []
+
+    for idx, (_, j) in enumerate(pairs):
+        pos = bisect.bisect_left(tails, j)
+        previous.append(tail_indices[pos - 1] if pos > 0 else None)
+
+        if pos == len(tails):
+            tails.append(j)
+            tail_indices.append(idx)
+        else:
+            tails[pos] = j
+            tail_indices[pos] = idx
+
+    anchors = []
+    current: Optional[int] = tail_indices[-1]
+    while current is not None:
+        anchors.append(pairs[current])
+        current = previous[current]
+
+    anchors.reverse()
+    return anchors
+
+
+def _middle_snake(
+    a: Sequence[Hashable],
+    alo: int,
+    ahi: int,
+    b: Sequence[Hashable],
+    blo: int,
+    bhi: int,
+) -> Optional[Tuple[int, int, int, int]]:
+    """Find the middle snake of the shortest edit script between ``a[alo:ahi]`` and
+    ``b[blo:bhi]``.
+
+    Returns the start and end of the snake ``(x, y, u, v)``, or ``None`` if finding
+    it would be too expensive.
+    """
+    n = ahi - alo
+    m = bhi - blo
+    delta = n - m
+    odd = delta % 2 == 1
+    max_d = (n + m + 1) // 2
+
+    # Negative diagonals wrap around to the end of the list.
+    forward = [0] * (2 * max_d + 3)
+    backward = [0] * (2 * max_d + 3)
+
+    for d in range(max_d + 1):
+        if d * (n + m) > COST_LIMIT:
+            return None
+
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[k - 1] < forward[k + 1]):
+                x = forward[k + 1]
+            else:
+                x = forward[k - 1] + 1
+
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+
+            forward[k] = x
+            if odd and delta - (d - 1) <= k <= delta + (d - 1):
+                if x + backward[delta - k] >= n:
+                    return (alo + x0, blo + y0, alo + x, blo + y)
+
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[k - 1] < backward[k + 1]):
+                x = backward[k + 1]
+            else:
+                x = backward[k - 1] + 1
+
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[ahi - 1 - x] == b[bhi - 1 - y]:
+                x += 1
+                y += 1
+
+            backward[k] = x
+            if not odd and -d <= delta - k <= d:
+                if x + forward[delta - k] >= n:
+                    return (ahi - x, bhi - y, ahi - x0, bhi - y0)
+
+    return None
@@ -0,0 +1,256 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""A view of all the cells in a notebook as a single document."""
+
+import bisect
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from lsprotocol import types
+
+from pygls.uris import normalize_uri
+
+from .position_codec import PositionCodec
+from .text_document import TextDocument, _TextDocumentView
+
+
+def _cell_lines(document: TextDocument) -> Sequence[str]:
+    """Return the lines a cell contributes to the concatenated document.
+
+    Every cell contributes at least one line, and its last line is always terminated,
+    so that the next cell starts on a new line.
+    """
+    lines = document.lines
+    if len(lines) == 0:
+        return ("\n",)
+
+    if lines[-1].endswith(("\n", "\r")):
+        return lines
+
+    return (*lines[:-1], lines[-1] + "\n")
+
+
+class ConcatenatedNotebookDocument(_TextDocumentView):
+    """The cells of a notebook, concatenated in order into a single document.
+
+    This allows tools that analyze whole programs to be run over all the cells in a
+    notebook at once. The concatenated document is kept up to date by the
+    :class:`~pygls.workspace.Workspace` as cells are edited, added, removed or
+    reordered, and positions can be mapped between it and the individual cells.
+
+    Each cell begins on a new line, a line break is appended to any cell that does
+    not end with one. Since lines are not otherwise modified, the characters of a
+    position do not change when it is mapped.
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        cells: Sequence[TextDocument],
+        cell_index: Dict[str, int],
+        version: Optional[int] = None,
+        position_codec: Optional[PositionCodec] = None,
+    ):
+        self.uri = uri
+        self.version = version
+        self._position_codec = position_codec if position_codec else PositionCodec()
+
+        # The cell documents in order, and the position of each in the list by
+        # normalized uri. The index is maintained by the workspace.
+        self._cells = list(cells)
+        self._cell_index = cell_index
+
+        # The number of lines contributed by each cell, and the first line of each
+        # cell in the concatenated document. Only the first ``_valid_starts``
+        # entries of ``_line_starts`` are up to date.
+        self._line_counts = [len(_cell_lines(cell)) for cell in self._cells]
+        self._line_starts = [0] * (len(self._cells) + 1)
+        self._valid_starts = 1
+
+        self._lines: Optional[List[str]] = None
+        self._lines_view: Optional[Tuple[str, ...]] = None
+        self._source: Optional[str] = None
+
+    def __repr__(self):
+        return f"<ConcatenatedNotebookDocument {self.uri!r} ({len(self._cells)} cells)>"
+
+    @property
+    def cells(self) -> Sequence[TextDocument]:
+        """The documents of the notebook's cells, in order."""
+        return tuple(self._cells)
+
+    @property
+    def lines(self) -> Sequence[str]:
+        if self._lines_view is None:
+            if self._lines is None:
+                self._lines = [
+                    line for cell in self._cells for line in _cell_lines(cell)
+                ]
+
+            # The list of lines is updated in place as cells change, so it must not
+            # be shared.
+            self._lines_view = tuple(self._lines)
+
+        return self._lines_view
+
+    @property
+    def source(self) -> str:
+        if self._source is None:
+            self._source = "".join(self.lines)
+
+        return self._source
+
+    def _line_start(self, idx: int) -> int:
+        """Return the first line of the cell at the given index, which may be equal
+        to the number of cells."""
+        starts = self._line_starts
+        for i in range(self._valid_starts, idx + 1):
+            starts[i] = starts[i - 1] + self._line_counts[i - 1]
+
+        self._valid_starts = max(self._valid_starts, idx + 1)
+        return starts[idx]
+
+    def _replace_lines(self, start: int, end: int, new_lines: Sequence[str]):
+        """Replace the lines of the cells ``start:end`` with ``new_lines``."""
+        if self._lines is not None:
+            first = self._line_start(start)
+            self._lines[first : first + sum(self._line_counts[start:end])] = new_lines
+
+        self._lines_view = None
+        self._source = None
+        self._valid_starts = min(self._valid_starts, start + 1)
+
+    def update_cell(self, cell_uri: str):
+        """Update the concatenated document after a change to the given cell."""
+        if (idx := self._cell_index.get(normalize_uri(cell_uri).key)) is None:
+            return
+
+        new_lines = _cell_lines(self._cells[idx])
+        self._replace_lines(idx, idx + 1, new_lines)
+        self._line_counts[idx] = len(new_lines)
+
+    def replace_cell(self, document: TextDocument):
+        """Replace the document of one of the notebook's cells, such as when a cell
+        that was not open when the concatenated document was created is opened."""
+        if (idx := self._cell_index.get(normalize_uri(document.uri).key)) is None:
+            return
+
+        self.splice_cells(idx, 1, [document])
+
+    def splice_cells(
+        self, start: int, delete_count: int, cells: Sequence[TextDocument]
+    ):
+        """Replace ``delete_count`` cells from ``start`` onwards with the given cells.
+
+        The workspace's cell index must already reflect the change.
+        """
+        end = start + delete_count
+        cell_lines = [_cell_lines(cell) for cell in cells]
+
+        self._replace_lines(
+            start, end, [line for lines in cell_lines for line in lines]
+        )
+        self._cells[start:end] = cells
+        self._line_counts[start:end] = [len(lines) for lines in cell_lines]
+        self._line_starts = self._line_starts[: self._valid_starts] + [0] * (
+            len(self._cells) + 1 - self._valid_starts
+        )
+
+    def position_to_cell(
+        self, position: types.Position
+    ) -> Optional[Tuple[str, types.Position]]:
+        """Map a position in the concatenated document to the cell containing it.
+
+        Parameters
+        ----------
+        position
+           The position, in client units, in the concatenated document
+
+        Returns
+        -------
+        Optional[Tuple[str, types.Position]]
+           The uri of the cell containing the position and the corresponding
+           position within it, or ``None`` if the position is outside the document.
+        """
+        total = self._line_start(len(self._cells))
+        if len(self._cells) == 0 or not (0 <= position.line < total):
+            return None
+
+        idx = bisect.bisect_right(self._line_starts, position.line) - 1
+        cell = self._cells[idx]
+        return cell.uri, types.Position(
+            line=position.line - self._line_starts[idx], character=position.character
+        )
+
+    def position_from_cell(
+        self, cell_uri: str, position: types.Position
+    ) -> Optional[types.Position]:
+        """Map a position in one of the notebook's cells to the concatenated document.
+
+        Parameters
+        ----------
+        cell_uri
+           The uri of the cell
+
+        position
+           The position, in client units, within the cell
+
+        Returns
+        -------
+        Optional[types.Position]
+           The corresponding position in the concatenated document, or ``None`` if the
+           cell is not part of the notebook.
+        """
+        if (idx := self._cell_index.get(normalize_uri(cell_uri).key)) is None:
+            return None
+
+        return types.Position(
+            line=self._line_start(idx) + position.line, character=position.character
+        )
+
+    def range_to_cell(self, range: types.Range) -> Optional[Tuple[str, types.Range]]:
+        """Map a range in the concatenated document to the cell containing it.
+
+        Returns ``None`` if the range is outside the document, or spans more than one
+        cell. See :meth:`position_to_cell` for details.
+        """
+        if (start := self.position_to_cell(range.start)) is None:
+            return None
+
+        if (end := self.position_to_cell(range.end)) is None or end[0] != start[0]:
+            return None
+
+        return start[0], types.Range(start=start[1], end=end[1])
+
+    def range_from_cell(
+        self, cell_uri: str, range: types.Range
+    ) -> Optional[types.Range]:
+        """Map a range in one of the notebook's cells to the concatenated document.
+
+        See :meth:`position_from_cell` for details.
+        """
+        if (idx := self._cell_index.get(normalize_uri(cell_uri).key)) is None:
+            return None
+
+        first = self._line_start(idx)
+        return types.Range(
+            start=types.Position(
+                line=first + range.start.line, character=range.start.character
+            ),
+            end=types.Position(
+                line=first + range.end.line, character=range.end.character
+            ),
+        )
@@ -79,7 +79,7 @@ class UnitCounter:
         """
         Convert the codepoint index `column` into code units.
         """
-        return sum(self.code_units_for_char(c) for c in line[:column])
+        return self.num_units(line[:column])
 
 
 class Utf32(UnitCounter):
@@ -104,6 +104,11 @@ class Utf16(UnitCounter):
             return 2
         return 1
 
+    def num_units(self, chars: str) -> int:
+        if chars.isascii():
+            return len(chars)
+        return len(chars.encode("utf-16-le", errors="surrogatepass")) // 2
+
 
 class Utf8(UnitCounter):
     def code_units_for_char(self, char: str) -> int:
@@ -116,6 +121,11 @@ class Utf8(UnitCounter):
             return 3
         return 4
 
+    def num_units(self, chars: str) -> int:
+        if chars.isascii():
+            return len(chars)
+        return len(chars.encode("utf-8", errors="surrogatepass"))
+
 
 impls: dict["str | types.PositionEncodingKind | None", UnitCounter] = {
     types.PositionEncodingKind.Utf8: Utf8(),
@@ -16,16 +16,31 @@
 # See the License for the specific language governing permissions and      #
 # limitations under the License.                                           #
 ############################################################################
+import abc
 import io
+import itertools
 import logging
 import os
 import pathlib
 import re
-from typing import Optional, Pattern, Sequence
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Deque,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+)
 
 from lsprotocol import types
 
-from pygls.uris import urlparse, to_fs_path
+from pygls.uris import normalize_uri
+from .diff import diff_lines
 from .position_codec import PositionCodec, ServerTextPosition, ServerTextRange
 
 # TODO: this is not the best e.g. we capture numbers
@@ -35,136 +50,265 @@ RE_START_WORD = re.compile("[A-Za-z_0-9]*$")
 logger = logging.getLogger(__name__)
 
 
-class TextDocument(object):
-    def __init__(
-        self,
-        uri: str,
-        source: Optional[str] = None,
-        version: Optional[int] = None,
-        language_id: Optional[str] = None,
-        local: bool = True,
-        sync_kind: types.TextDocumentSyncKind = types.TextDocumentSyncKind.Incremental,
-        position_codec: Optional[PositionCodec] = None,
-    ):
-        self.uri = uri
-        self.version = version
+class _JournalEntry(NamedTuple):
+    """An incremental edit made to a document, with positions in client units."""
 
-        if (path := to_fs_path(uri)) is None:
-            _, _, path, *_ = urlparse(uri)
+    version: int
+    """The version of the document produced by the edit."""
 
-        self.path = path
-        self.language_id = language_id
-        self.filename: Optional[str] = os.path.basename(self.path)
+    start: Tuple[int, int]
+    """The start of the replaced range."""
 
-        self._local = local
-        self._source = source
+    old_end: Tuple[int, int]
+    """The end of the replaced range, before the edit."""
 
-        self._is_sync_kind_full = sync_kind == types.TextDocumentSyncKind.Full
-        self._is_sync_kind_incremental = (
-            sync_kind == types.TextDocumentSyncKind.Incremental
-        )
-        self._is_sync_kind_none = sync_kind == types.TextDocumentSyncKind.None_
+    new_end: Tuple[int, int]
+    """The end of the inserted text, after the edit."""
 
-        self._position_codec = position_codec if position_codec else PositionCodec()
 
-    def __str__(self):
-        return str(self.uri)
+def _end_of_text(
+    start: Tuple[int, int], text: str, num_units: Callable[[str], int]
+) -> Tuple[int, int]:
+    """Return the position of the end of ``text``, if it were inserted at ``start``.
+
+    Columns are measured using the given ``num_units`` function.
+    """
+    parts = text.splitlines(True)
+    if len(parts) == 0:
+        return start
+
+    last = parts[-1]
+    if len(last.splitlines()[0]) != len(last):
+        return (start[0] + len(parts), 0)
+
+    character = start[1] if len(parts) == 1 else 0
+    return (start[0] + len(parts) - 1, character + num_units(last))
+
+
+def _utf8_len(text: str) -> int:
+    if text.isascii():
+        return len(text)
+
+    return len(text.encode("utf-8"))
+
+
+@dataclass(frozen=True)
+class DocumentEdit:
+    """Describes a change made to a document.
+
+    Positions and offsets are given both in code points, suitable for indexing into
+    the document's ``source`` and ``lines``, and in UTF-8 bytes, as expected by
+    incremental parsers such as `tree-sitter <https://tree-sitter.github.io>`__::
+
+       for edit in document.edits:
+           tree.edit(
+               start_byte=edit.start_byte,
+               old_end_byte=edit.old_end_byte,
+               new_end_byte=edit.new_end_byte,
+               start_point=edit.start_point,
+               old_end_point=edit.old_end_point,
+               new_end_point=edit.new_end_point,
+           )
+    """
+
+    start: ServerTextPosition
+    """The start of the replaced text, in code points."""
+
+    old_end: ServerTextPosition
+    """The end of the replaced text, before the edit, in code points."""
+
+    new_end: ServerTextPosition
+    """The end of the inserted text, after the edit, in code points."""
+
+    start_offset: int
+    """The offset of the start of the replaced text into the document's source."""
+
+    old_end_offset: int
+    """The offset of the end of the replaced text, before the edit."""
+
+    new_end_offset: int
+    """The offset of the end of the inserted text, after the edit."""
+
+    start_byte: int
+    """The offset of the start of the replaced text, in UTF-8 bytes."""
+
+    old_end_byte: int
+    """The offset of the end of the replaced text before the edit, in UTF-8 bytes."""
+
+    new_end_byte: int
+    """The offset of the end of the inserted text after the edit, in UTF-8 bytes."""
+
+    start_point: Tuple[int, int]
+    """The line and UTF-8 byte column of the start of the replaced text."""
+
+    old_end_point: Tuple[int, int]
+    """The line and UTF-8 byte column of the end of the replaced text, before the
+    edit."""
+
+    new_end_point: Tuple[int, int]
+    """The line and UTF-8 byte column of the end of the inserted text, after the
+    edit."""
+
+    text: str
+    """The inserted text."""
 
     @property
-    def position_codec(self) -> PositionCodec:
-        return self._position_codec
+    def old_range(self) -> ServerTextRange:
+        """The range of the replaced text, before the edit."""
+        return ServerTextRange(start=self.start, end=self.old_end)
 
-    def _apply_incremental_change(
-        self, change: types.TextDocumentContentChangePartial
-    ) -> None:
-        """Apply an ``Incremental`` text change to the document"""
-        lines = self.lines
-        text = change.text
-        change_range = change.range
+    @property
+    def new_range(self) -> ServerTextRange:
+        """The range of the inserted text, after the edit."""
+        return ServerTextRange(start=self.start, end=self.new_end)
+
+
+def _line_offsets(
+    source: str, lines: Sequence[str]
+) -> Tuple[Sequence[int], Sequence[int]]:
+    """Return the offset of the start of each line of the document, and of its end,
+    both in code points and in UTF-8 bytes."""
+    offsets = list(itertools.accumulate(map(len, lines), initial=0))
+    if source.isascii():
+        return offsets, offsets
+
+    return offsets, list(itertools.accumulate(map(_utf8_len, lines), initial=0))
+
+
+def _describe_edit(
+    lines: Sequence[str],
+    offsets: Tuple[Sequence[int], Sequence[int]],
+    range: ServerTextRange,
+    text: str,
+) -> DocumentEdit:
+    """Describe replacing the given range of the document with ``text``.
+
+    ``offsets`` are the line offsets of the document, as returned by
+    :func:`_line_offsets`, and must cover at least the lines up to the end of the
+    range.
+    """
+    start_line, start_col = range.start.line, range.start.character
+    end_line, end_col = range.end.line, range.end.character
+    line_offsets, line_bytes = offsets
+
+    def point(line: int, character: int) -> Tuple[int, int]:
+        if line >= len(lines):
+            return (line, 0)
 
-        range = self._position_codec.range_from_client_units(lines, change_range)
-        start_line = range.start.line
-        start_col = range.start.character
-        end_line = range.end.line
-        end_col = range.end.character
+        return (line, _utf8_len(lines[line][:character]))
 
-        # Check for an edit occurring at the very end of the file
-        if start_line == len(lines):
-            self._source = self.source + text
-            return
+    def offset(line: int, character: int) -> int:
+        return line_offsets[min(line, len(lines))] + character
 
-        new = io.StringIO()
+    def byte(point: Tuple[int, int]) -> int:
+        line, column = point
+        return line_bytes[min(line, len(lines))] + column
 
-        # Iterate over the existing document until we hit the edit range,
-        # at which point we write the new text, then loop until we hit
-        # the end of the range and continue writing.
-        for i, line in enumerate(lines):
-            if i < start_line:
-                new.write(line)
-                continue
+    start_offset = offset(start_line, start_col)
+    start_point = point(start_line, start_col)
+    start_byte = byte(start_point)
+    old_end_point = point(end_line, end_col)
+    new_end = _end_of_text((start_line, start_col), text, len)
 
-            if i > end_line:
-                new.write(line)
-                continue
+    return DocumentEdit(
+        start=ServerTextPosition(start_line, start_col),
+        old_end=ServerTextPosition(end_line, end_col),
+        new_end=ServerTextPosition(*new_end),
+        start_offset=start_offset,
+        old_end_offset=offset(end_line, end_col),
+        new_end_offset=start_offset + len(text),
+        start_byte=start_byte,
+        old_end_byte=byte(old_end_point),
+        new_end_byte=start_byte + _utf8_len(text),
+        start_point=start_point,
+        old_end_point=old_end_point,
+        new_end_point=_end_of_text(start_point, text, _utf8_len),
+        text=text,
+    )
 
-            if i == start_line:
-                new.write(line[:start_col])
-                new.write(text)
 
-            if i == end_line:
-                new.write(line[end_col:])
+def _line_start(lines: Sequence[str], line: int) -> ServerTextPosition:
+    """Return the position of the start of the given line.
 
-        self._source = new.getvalue()
+    If ``line`` is just beyond the end of a document not ending in a newline, the
+    end of the document is returned instead.
+    """
+    if line < len(lines) or line == 0:
+        return ServerTextPosition(line, 0)
 
-    def _apply_full_change(self, change: types.TextDocumentContentChangeEvent) -> None:
-        """Apply a ``Full`` text change to the document."""
-        self._source = change.text
+    last = lines[-1]
+    if len(last.splitlines()[0]) != len(last):
+        return ServerTextPosition(line, 0)
 
-    def _apply_none_change(self, _: types.TextDocumentContentChangeEvent) -> None:
-        """Apply a ``None`` text change to the document
+    return ServerTextPosition(line - 1, len(last))
 
-        Currently does nothing, provided for consistency.
-        """
-        pass
 
-    def apply_change(self, change: types.TextDocumentContentChangeEvent) -> None:
-        """Apply a text change to a document, considering TextDocumentSyncKind
+def _normalize_position(
+    lines: Sequence[str], position: ServerTextPosition
+) -> ServerTextPosition:
+    """Return the canonical form of the given position.
 
-        Performs either
-        :attr:`~lsprotocol.types.TextDocumentSyncKind.Incremental`,
-        :attr:`~lsprotocol.types.TextDocumentSyncKind.Full`, or no synchronization
-        based on both the client request and server capabilities.
+    Positions at the end of a line terminated by a newline are moved to the start of
+    the next line, and positions beyond the last line to the end of the document.
+    """
+    line = position.line
+    if line >= len(lines):
+        return _line_start(lines, len(lines))
 
-        .. admonition:: ``Incremental`` versus ``Full`` synchronization
+    text = lines[line]
+    if position.character < len(text) or len(text.splitlines()[0]) == len(text):
+        return position
 
-           Even if a server accepts ``Incremantal`` SyncKinds, clients may request
-           a ``Full`` SyncKind. In LSP 3.x, clients make this request by omitting
-           both Range and RangeLength from their request. Consequently, the
-           attributes "range" and "rangeLength" will be missing from ``Full``
-           content update client requests in the pygls Python library.
+    return ServerTextPosition(line + 1, 0)
 
-        """
-        if isinstance(change, types.TextDocumentContentChangePartial):
-            if self._is_sync_kind_incremental:
-                self._apply_incremental_change(change)
-                return
-            # Log an error, but still perform full update to preserve existing
-            # assumptions in test_document/test_document_full_edit. Test breaks
-            # otherwise, and fixing the tests would require a broader fix to
-            # protocol.py.
-            logger.error(
-                "Unsupported client-provided TextDocumentContentChangeEvent. "
-                "Please update / submit a Pull Request to your LSP client."
-            )
 
-        if self._is_sync_kind_none:
-            self._apply_none_change(change)
-        else:
-            self._apply_full_change(change)
+def _map_position(
+    position: Tuple[int, int], edit: _JournalEntry, to_end: bool
+) -> Tuple[int, int]:
+    """Map a position from before the given edit, to after it.
+
+    Positions inside the replaced range are moved to either the start or end of the
+    inserted text, depending on ``to_end``.
+    """
+    if position < edit.start:
+        return position
+
+    if position < edit.old_end:
+        return edit.new_end if to_end else edit.start
+
+    line, character = position
+    if line == edit.old_end[0]:
+        return (edit.new_end[0], edit.new_end[1] + character - edit.old_end[1])
+
+    return (line + edit.new_end[0] - edit.old_end[0], character)
+
+
+class _TextDocumentView(abc.ABC):
+    """The read-only methods shared by :class:`TextDocument` and
+    :class:`TextDocumentSnapshot`."""
+
+    __slots__ = ()
+
+    uri: str
+    version: Optional[int]
+    _position_codec: PositionCodec
+
+    def __str__(self):
+        return str(self.uri)
+
+    @property
+    def position_codec(self) -> PositionCodec:
+        return self._position_codec
+
+    @property
+    @abc.abstractmethod
+    def source(self) -> str:
+        """The contents of the document."""
 
     @property
+    @abc.abstractmethod
     def lines(self) -> Sequence[str]:
-        return tuple(self.source.splitlines(True))
+        """The lines of the document, including any line endings."""
 
     def offset_at_server_position(self, server_position: ServerTextPosition) -> int:
         """
@@ -252,13 +396,6 @@ class TextDocument(object):
             ) : self.offset_at_server_position(range.end)
         ]
 
-    @property
-    def source(self) -> str:
-        if self._source is None and self.path is not None:
-            return pathlib.Path(self.path).read_text(encoding="utf-8")
-
-        return self._source or ""
-
     def word_at_position(
         self,
         client_position: types.Position,
@@ -313,3 +450,470 @@ class TextDocument(object):
         m_end = re_end_word.findall(end)
 
         return m_start[0] + m_end[-1]
+
+
+class TextDocument(_TextDocumentView):
+    JOURNAL_SIZE = 256
+    """The maximum number of incremental edits remembered by the document, used to
+    map positions from previous versions of the document."""
+
+    def __init__(
+        self,
+        uri: str,
+        source: Optional[str] = None,
+        version: Optional[int] = None,
+        language_id: Optional[str] = None,
+        local: bool = True,
+        sync_kind: types.TextDocumentSyncKind = types.TextDocumentSyncKind.Incremental,
+        position_codec: Optional[PositionCodec] = None,
+    ):
+        self.uri = uri
+        self.version = version
+
+        normalized = normalize_uri(uri)
+        if (path := normalized.fs_path) is None:
+            path = normalized.path
+
+        self.path = path
+        self.language_id = language_id
+        self.filename: Optional[str] = os.path.basename(self.path)
+
+        self._local = local
+        self._source = source
+
+        # The contents of the file on disk, along with the (st_mtime_ns, st_size) of
+        # the file when it was read
+        self._disk_source: Optional[Tuple[Tuple[int, int], str]] = None
+
+        # The document's lines, along with the source they were computed from
+        self._line_index: Optional[Tuple[str, Tuple[str, ...]]] = None
+
+        # Held while the document's contents and version are updated, so that
+        # snapshots taken from other threads are consistent.
+        self._lock = threading.Lock()
+
+        # The most recent incremental edits made to the document, and the version
+        # of the document from which positions can be mapped using them.
+        self._journal: Deque[_JournalEntry] = deque()
+        self._journal_version: Optional[int] = version
+
+        # The edits that produced the current version of the document
+        self._edits: List[DocumentEdit] = []
+
+        self._is_sync_kind_full = sync_kind == types.TextDocumentSyncKind.Full
+        self._is_sync_kind_incremental = (
+            sync_kind == types.TextDocumentSyncKind.Incremental
+        )
+        self._is_sync_kind_none = sync_kind == types.TextDocumentSyncKind.None_
+
+        self._position_codec = position_codec if position_codec else PositionCodec()
+
+    def _apply_incremental_change(
+        self,
+        change: types.TextDocumentContentChangePartial,
+        version: Optional[int] = None,
+    ) -> DocumentEdit:
+        """Apply an ``Incremental`` text change to the document"""
+        source = self.source
+        lines = self.lines
+        text = change.text
+        change_range = change.range
+
+        range = self._position_codec.range_from_client_units(lines, change_range)
+        range = ServerTextRange(
+            _normalize_position(lines, range.start),
+            _normalize_position(lines, range.end),
+        )
+        start_line = range.start.line
+        start_col = range.start.character
+        end_line = range.end.line
+        end_col = range.end.character
+
+        self._record_edit(lines, range, text, version)
+        offsets = _line_offsets(source, lines[: end_line + 1])
+        edit = _describe_edit(lines, offsets, range, text)
+
+        # Check for an edit occurring at the very end of the file
+        if start_line == len(lines):
+            self._source = source + text
+            return edit
+
+        new = io.StringIO()
+
+        # Iterate over the existing document until we hit the edit range,
+        # at which point we write the new text, then loop until we hit
+        # the end of the range and continue writing.
+        for i, line in enumerate(lines):
+            if i < start_line:
+                new.write(line)
+                continue
+
+            if i > end_line:
+                new.write(line)
+                continue
+
+            if i == start_line:
+                new.write(line[:start_col])
+                new.write(text)
+
+            if i == end_line:
+                new.write(line[end_col:])
+
+        self._source = new.getvalue()
+        return edit
+
+    def _record_edit(
+        self,
+        lines: Sequence[str],
+        range: ServerTextRange,
+        text: str,
+        version: Optional[int],
+    ):
+        """Record the given edit in the document's journal."""
+        if version is None:
+            # Without a version, positions cannot be mapped across this edit.
+            self._reset_journal(None)
+            return
+
+        start = self._position_codec.position_to_client_units(lines, range.start)
+        old_end = self._position_codec.position_to_client_units(lines, range.end)
+        start_ = (start.line, start.character)
+
+        self._journal.append(
+            _JournalEntry(
+                version=version,
+                start=start_,
+                old_end=(old_end.line, old_end.character),
+                new_end=_end_of_text(
+                    start_, text, self._position_codec.client_num_units
+                ),
+            )
+        )
+
+        while len(self._journal) > self.JOURNAL_SIZE:
+            self._journal_version = self._journal.popleft().version
+
+    def _reset_journal(self, version: Optional[int]):
+        """Forget all previous edits, positions can only be mapped from the given
+        version onwards."""
+        self._journal.clear()
+        self._journal_version = version
+
+    def _apply_full_change(
+        self,
+        change: types.TextDocumentContentChangeEvent,
+        version: Optional[int] = None,
+    ) -> List[DocumentEdit]:
+        """Apply a ``Full`` text change to the document.
+
+        The lines that have changed are found by comparing the new text with the
+        current text, and described as if they were incremental changes.
+        """
+        source = self.source
+        lines = self.lines
+        new_source = change.text
+        new_lines = tuple(new_source.splitlines(True))
+
+        # Describe the changes from the bottom of the document up, so that the
+        # positions of each change are unaffected by the ones before it.
+        edits = []
+        offsets = _line_offsets(source, lines)
+        for i1, i2, j1, j2 in reversed(diff_lines(lines, new_lines)):
+            range = ServerTextRange(_line_start(lines, i1), _line_start(lines, i2))
+            text = "".join(new_lines[j1:j2])
+
+            self._record_edit(lines, range, text, version)
+            edits.append(_describe_edit(lines, offsets, range, text))
+
+        self._source = new_source
+        self._line_index = (new_source, new_lines)
+        return edits
+
+    def _apply_none_change(self, _: types.TextDocumentContentChangeEvent) -> None:
+        """Apply a ``None`` text change to the document
+
+        Currently does nothing, provided for consistency.
+        """
+        pass
+
+    def apply_change(
+        self,
+        change: types.TextDocumentContentChangeEvent,
+        version: Optional[int] = None,
+    ) -> List[DocumentEdit]:
+        """Apply a text change to a document, considering TextDocumentSyncKind
+
+        Performs either
+        :attr:`~lsprotocol.types.TextDocumentSyncKind.Incremental`,
+        :attr:`~lsprotocol.types.TextDocumentSyncKind.Full`, or no synchronization
+        based on both the client request and server capabilities.
+
+        .. admonition:: ``Incremental`` versus ``Full`` synchronization
+
+           Even if a server accepts ``Incremantal`` SyncKinds, clients may request
+           a ``Full`` SyncKind. In LSP 3.x, clients make this request by omitting
+           both Range and RangeLength from their request. Consequently, the
+           attributes "range" and "rangeLength" will be missing from ``Full``
+           content update client requests in the pygls Python library.
+
+        Parameters
+        ----------
+        change
+           The change to apply
+
+        version
+           If set, the document's version is updated along with its contents.
+
+        Returns
+        -------
+        List[DocumentEdit]
+           A description of the changes made to the document. Even for ``Full``
+           changes, only the lines that differ are included. The edits that
+           produced the document's current version are also available from
+           :attr:`edits`.
+        """
+        with self._lock:
+            edits = self._apply_change(change, version)
+
+            if version is None or version != self.version:
+                self._edits = []
+
+            self._edits.extend(edits)
+
+            if version is not None:
+                self.version = version
+
+        return edits
+
+    def _apply_change(
+        self, change: types.TextDocumentContentChangeEvent, version: Optional[int]
+    ) -> List[DocumentEdit]:
+        if isinstance(change, types.TextDocumentContentChangePartial):
+            if self._is_sync_kind_incremental:
+                return [self._apply_incremental_change(change, version)]
+            # Log an error, but still perform full update to preserve existing
+            # assumptions in test_document/test_document_full_edit. Test breaks
+            # otherwise, and fixing the tests would require a broader fix to
+            # protocol.py.
+            logger.error(
+                "Unsupported client-provided TextDocumentContentChangeEvent. "
+                "Please update / submit a Pull Request to your LSP client."
+            )
+
+        if self._is_sync_kind_none:
+            self._apply_none_change(change)
+            return []
+
+        return self._apply_full_change(change, version)
+
+    @property
+    def edits(self) -> Sequence[DocumentEdit]:
+        """The edits that produced the current version of the document, in the order
+        they were applied.
+
+        If the changes were applied without a version, only the most recent edit is
+        available.
+        """
+        return tuple(self._edits)
+
+    def _edits_since(self, version: int) -> Optional[List[_JournalEntry]]:
+        """Return the edits made to the document since the given version, or
+        ``None`` if they are not known."""
+        with self._lock:
+            journal_version = self._journal_version
+            journal = list(self._journal)
+            current_version = self.version
+
+        if journal_version is None or current_version is None:
+            return None
+
+        if not (journal_version <= version <= current_version):
+            return None
+
+        return [edit for edit in journal if edit.version > version]
+
+    def map_position(
+        self, position: types.Position, version: int
+    ) -> Optional[types.Position]:
+        """Map a position from a previous version of the document to the current
+        version.
+
+        This can be used to adjust results computed for an older version of the
+        document, rather than recomputing them. A position inside text that has
+        since been replaced is moved to the start of the replacement.
+
+        Parameters
+        ----------
+        position
+           The position, in client units, in the given version of the document.
+
+        version
+           The version of the document the position refers to e.g. the version of
+           the :meth:`snapshot` the result was computed from.
+
+        Returns
+        -------
+        Optional[types.Position]
+           The corresponding position in the current version of the document, or
+           ``None`` if the position cannot be mapped, e.g. if the edits made since
+           ``version`` are no longer remembered.
+        """
+        if (edits := self._edits_since(version)) is None:
+            return None
+
+        result = (position.line, position.character)
+        for edit in edits:
+            result = _map_position(result, edit, to_end=False)
+
+        return types.Position(line=result[0], character=result[1])
+
+    def map_range(self, range: types.Range, version: int) -> Optional[types.Range]:
+        """Map a range from a previous version of the document to the current
+        version.
+
+        The range grows or shrinks to cover any text inserted or deleted inside it.
+        See :meth:`map_position` for details.
+
+        Parameters
+        ----------
+        range
+           The range, in client units, in the given version of the document.
+
+        version
+           The version of the document the range refers to.
+
+        Returns
+        -------
+        Optional[types.Range]
+           The corresponding range in the current version of the document, or
+           ``None`` if the range cannot be mapped.
+        """
+        if (edits := self._edits_since(version)) is None:
+            return None
+
+        start = (range.start.line, range.start.character)
+        end = (range.end.line, range.end.character)
+        for edit in edits:
+            start = _map_position(start, edit, to_end=False)
+            end = max(start, _map_position(end, edit, to_end=True))
+
+        return types.Range(
+            start=types.Position(line=start[0], character=start[1]),
+            end=types.Position(line=end[0], character=end[1]),
+        )
+
+    @property
+    def lines(self) -> Sequence[str]:
+        source = self.source
+        if (index := self._line_index) is None or index[0] is not source:
+            index = self._line_index = (source, tuple(source.splitlines(True)))
+
+        return index[1]
+
+    @property
+    def source(self) -> str:
+        if self._source is None and self.path is not None:
+            return self._read_disk_source(self.path)
+
+        return self._source or ""
+
+    def _read_disk_source(self, path: str) -> str:
+        """Read the document's contents from disk.
+
+        The contents are only read again if the file's modification time or size has
+        changed since it was last read.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._disk_source = None
+            return pathlib.Path(path).read_text(encoding="utf-8")
+
+        key = (stat.st_mtime_ns, stat.st_size)
+        if (cached := self._disk_source) is not None and cached[0] == key:
+            return cached[1]
+
+        source = pathlib.Path(path).read_text(encoding="utf-8")
+        self._disk_source = (key, source)
+        return source
+
+    def snapshot(self) -> "TextDocumentSnapshot":
+        """Return an immutable view of the document's current version.
+
+        Snapshots share the document's text and line index, so taking one is cheap.
+        Unlike the document itself, a snapshot is not affected by any changes made
+        after it was taken, so it can be safely read from another thread e.g. by a
+        handler decorated with ``@server.thread()``.
+
+        Returns
+        -------
+        TextDocumentSnapshot
+           The snapshot
+        """
+        with self._lock:
+            source = self.source
+            lines = self.lines
+            version = self.version
+
+        return TextDocumentSnapshot(
+            uri=self.uri,
+            version=version,
+            language_id=self.language_id,
+            source=source,
+            lines=lines,
+            position_codec=self._position_codec,
+        )
+
+
+class TextDocumentSnapshot(_TextDocumentView):
+    """An immutable view of a :class:`TextDocument` at a specific version.
+
+    Provides the same methods for reading the document's contents as
+    :class:`TextDocument`. Use :meth:`TextDocument.snapshot` to create one.
+    """
+
+    __slots__ = (
+        "uri",
+        "version",
+        "language_id",
+        "_source",
+        "_lines",
+        "_position_codec",
+    )
+
+    language_id: Optional[str]
+    _source: str
+    _lines: Tuple[str, ...]
+
+    def __init__(
+        self,
+        uri: str,
+        version: Optional[int],
+        language_id: Optional[str],
+        source: str,
+        lines: Sequence[str],
+        position_codec: PositionCodec,
+    ):
+        object.__setattr__(self, "uri", uri)
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "language_id", language_id)
+        object.__setattr__(self, "_source", source)
+        object.__setattr__(self, "_lines", tuple(lines))
+        object.__setattr__(self, "_position_codec", position_codec)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__!r} object is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__!r} object is immutable")
+
+    def __repr__(self):
+        return f"<TextDocumentSnapshot uri={self.uri!r} version={self.version!r}>"
+
+    @property
+    def source(self) -> str:
+        return self._source
+
+    @property
+    def lines(self) -> Sequence[str]:
+        return self._lines
@@ -16,26 +16,49 @@
 # See the License for the specific language governing permissions and      #
 # limitations under the License.                                           #
 ############################################################################
-import copy
+import asyncio
 import logging
 import os
-from typing import Dict, Optional, Sequence, Union
-from urllib.parse import unquote
+import threading
+import typing
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Union
 
+import attrs
 from lsprotocol import types
 from lsprotocol.types import (
     PositionEncodingKind,
     TextDocumentSyncKind,
     WorkspaceFolder,
 )
-from pygls.uris import to_fs_path, uri_scheme
-from pygls.workspace.text_document import TextDocument
+from pygls.uris import normalize_uri, to_fs_path, uri_scheme
+from pygls.workspace.notebook_document import ConcatenatedNotebookDocument
+from pygls.workspace.text_document import DocumentEdit, TextDocument
 from pygls.workspace.position_codec import PositionCodec
 
 logger = logging.getLogger(__name__)
 
 
+class _FolderNode:
+    """A node in the tree of workspace folders, indexed by uri path segment."""
+
+    __slots__ = ("children", "folder")
+
+    def __init__(self):
+        self.children: Dict[str, _FolderNode] = {}
+        self.folder: Optional[WorkspaceFolder] = None
+
+
+def _uri_segments(key: str) -> List[str]:
+    """Split a normalized uri into its path segments."""
+    return key.rstrip("/").split("/")
+
+
 class Workspace(object):
+    DISK_CACHE_SIZE = 128
+    """The maximum number of documents not opened by the client whose contents are
+    kept in memory."""
+
     def __init__(
         self,
         root_uri: Optional[str],
@@ -57,8 +80,20 @@ class Workspace(object):
 
         # Used to lookup notebooks which contain a given cell.
         self._cell_in_notebook: Dict[str, str] = {}
+
+        # The index of each cell within its notebook, by notebook uri.
+        self._cell_index: Dict[str, Dict[str, int]] = {}
+
+        # The concatenated form of each notebook, created on first request.
+        self._concatenated_notebooks: Dict[str, ConcatenatedNotebookDocument] = {}
         self._folders: Dict[str, WorkspaceFolder] = {}
+        self._folder_tree = _FolderNode()
         self._docs: Dict[str, TextDocument] = {}
+
+        # Documents read from disk, in least recently used order.
+        self._disk_documents: OrderedDict[str, TextDocument] = OrderedDict()
+        self._disk_lock = threading.Lock()
+
         self._position_encoding = position_encoding
         self._position_codec = PositionCodec(encoding=position_encoding)
 
@@ -91,7 +126,42 @@ class Workspace(object):
         )
 
     def add_folder(self, folder: WorkspaceFolder):
-        self._folders[unquote(folder.uri)] = folder
+        key = normalize_uri(folder.uri).key
+        self._folders[key] = folder
+
+        node = self._folder_tree
+        for segment in _uri_segments(key):
+            node = node.children.setdefault(segment, _FolderNode())
+
+        node.folder = folder
+
+    def folder_for(self, uri: str) -> Optional[WorkspaceFolder]:
+        """Return the workspace folder containing the given uri.
+
+        If workspace folders are nested, the innermost folder is returned.
+
+        Parameters
+        ----------
+        uri
+           The uri of a document, or folder
+
+        Returns
+        -------
+        Optional[WorkspaceFolder]
+           The folder containing the uri, or ``None`` if it is not in any of the
+           workspace's folders.
+        """
+        folder = None
+        node = self._folder_tree
+
+        for segment in _uri_segments(normalize_uri(uri).key):
+            if (child := node.children.get(segment)) is None:
+                break
+
+            node = child
+            folder = node.folder or folder
+
+        return folder
 
     @property
     def notebook_documents(self):
@@ -128,10 +198,10 @@ class Workspace(object):
            The requested notebook document if found, ``None`` otherwise.
         """
         if notebook_uri is not None:
-            return self._notebook_documents.get(unquote(notebook_uri))
+            return self._notebook_documents.get(normalize_uri(notebook_uri).key)
 
         if cell_uri is not None:
-            notebook_uri = self._cell_in_notebook.get(unquote(cell_uri))
+            notebook_uri = self._cell_in_notebook.get(normalize_uri(cell_uri).key)
             if notebook_uri is None:
                 return None
 
@@ -139,16 +209,137 @@ class Workspace(object):
 
         return None
 
+    def get_notebook_cell(self, cell_uri: str) -> Optional[types.NotebookCell]:
+        """Return the notebook cell with the given uri.
+
+        Parameters
+        ----------
+        cell_uri
+           The uri of the cell's text document
+
+        Returns
+        -------
+        Optional[NotebookCell]
+           The cell if found, ``None`` otherwise.
+        """
+        if (index := self.get_notebook_cell_index(cell_uri)) is None:
+            return None
+
+        notebook_uri = self._cell_in_notebook[normalize_uri(cell_uri).key]
+        return self._notebook_documents[notebook_uri].cells[index]
+
+    def get_notebook_cell_index(self, cell_uri: str) -> Optional[int]:
+        """Return the position of the given cell within its notebook.
+
+        Parameters
+        ----------
+        cell_uri
+           The uri of the cell's text document
+
+        Returns
+        -------
+        Optional[int]
+           The index of the cell in its notebook's list of cells if found, ``None``
+           otherwise.
+        """
+        uri = normalize_uri(cell_uri).key
+        if (notebook_uri := self._cell_in_notebook.get(uri)) is None:
+            return None
+
+        return self._cell_index.get(notebook_uri, {}).get(uri)
+
+    def get_concatenated_notebook_document(
+        self, *, notebook_uri: Optional[str] = None, cell_uri: Optional[str] = None
+    ) -> Optional[ConcatenatedNotebookDocument]:
+        """Return the cells of the given notebook, concatenated into a single
+        document.
+
+        The concatenated document is created on first request, then kept up to date
+        as the notebook changes. See :meth:`get_notebook_document` for a description
+        of the parameters.
+
+        Returns
+        -------
+        Optional[ConcatenatedNotebookDocument]
+           The requested document if the notebook was found, ``None`` otherwise.
+        """
+        notebook = self.get_notebook_document(
+            notebook_uri=notebook_uri, cell_uri=cell_uri
+        )
+        if notebook is None:
+            return None
+
+        uri = normalize_uri(notebook.uri).key
+        if (document := self._concatenated_notebooks.get(uri)) is None:
+            document = ConcatenatedNotebookDocument(
+                notebook.uri,
+                [self._get_cell_document(cell.document) for cell in notebook.cells],
+                cell_index=self._cell_index[uri],
+                version=notebook.version,
+                position_codec=self._position_codec,
+            )
+            self._concatenated_notebooks[uri] = document
+
+        return document
+
+    def _get_cell_document(self, cell_uri: str) -> TextDocument:
+        """Return the document for the given cell, which is empty if the client has
+        not opened it."""
+        if (document := self._text_documents.get(normalize_uri(cell_uri).key)) is None:
+            document = self._create_text_document(cell_uri, source="")
+
+        return document
+
     def get_text_document(self, doc_uri: str) -> TextDocument:
         """
         Return a managed document if-present,
         else create one pointing at disk.
 
+        The contents of documents read from disk are cached, and only read again if
+        the file's modification time or size changes, or the document is invalidated
+        with :meth:`invalidate_text_document`.
+
         See https://github.com/Microsoft/language-server-protocol/issues/177
         """
-        return self._text_documents.get(unquote(doc_uri)) or self._create_text_document(
-            doc_uri
-        )
+        uri = normalize_uri(doc_uri).key
+        if (document := self._text_documents.get(uri)) is not None:
+            return document
+
+        with self._disk_lock:
+            if (document := self._disk_documents.get(uri)) is not None:
+                self._disk_documents.move_to_end(uri)
+                return document
+
+            document = self._create_text_document(doc_uri)
+            self._disk_documents[uri] = document
+
+            while len(self._disk_documents) > self.DISK_CACHE_SIZE:
+                self._disk_documents.popitem(last=False)
+
+        return document
+
+    async def get_text_document_async(self, doc_uri: str) -> TextDocument:
+        """Return the document with the given uri, like :meth:`get_text_document`.
+
+        If the document has not been opened by the client, its contents are read from
+        disk in a separate thread, so that the event loop is not blocked.
+        """
+        document = self.get_text_document(doc_uri)
+
+        if normalize_uri(doc_uri).key not in self._text_documents:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, lambda: document.source)
+
+        return document
+
+    def invalidate_text_document(self, doc_uri: str):
+        """Discard the cached contents of a document read from disk.
+
+        Called when the client notifies the server that a file has changed via
+        ``workspace/didChangeWatchedFiles``.
+        """
+        with self._disk_lock:
+            self._disk_documents.pop(normalize_uri(doc_uri).key, None)
 
     def is_local(self):
 
@@ -162,9 +353,16 @@ class Workspace(object):
 
     def put_notebook_document(self, params: types.DidOpenNotebookDocumentParams):
         notebook = params.notebook_document
+        notebook_uri = normalize_uri(notebook.uri).key
 
-        # Create a fresh instance to ensure our copy cannot be accidentally modified.
-        self._notebook_documents[unquote(notebook.uri)] = copy.deepcopy(notebook)
+        # Create fresh instances of the notebook and its cells, to ensure that its
+        # structure cannot be accidentally modified.
+        cells = [attrs.evolve(cell) for cell in notebook.cells]
+        self._notebook_documents[notebook_uri] = attrs.evolve(notebook, cells=cells)
+        self._cell_index[notebook_uri] = {
+            normalize_uri(cell.document).key: idx for idx, cell in enumerate(cells)
+        }
+        self._concatenated_notebooks.pop(notebook_uri, None)
 
         for cell_document in params.cell_text_documents:
             self.put_text_document(cell_document, notebook_uri=notebook.uri)
@@ -186,34 +384,68 @@ class Workspace(object):
            document
         """
         doc_uri = text_document.uri
+        key = normalize_uri(doc_uri).key
+        self.invalidate_text_document(doc_uri)
 
-        self._text_documents[unquote(doc_uri)] = self._create_text_document(
+        document = self._create_text_document(
             doc_uri,
             source=text_document.text,
             version=text_document.version,
             language_id=text_document.language_id,
         )
+        self._text_documents[key] = document
 
         if notebook_uri:
-            self._cell_in_notebook[unquote(doc_uri)] = unquote(notebook_uri)
+            self._cell_in_notebook[key] = normalize_uri(notebook_uri).key
+
+        # Replace the placeholder used for the cell if it was not previously open.
+        if (concatenated := self._get_concatenated_notebook_of(key)) is not None:
+            concatenated.replace_cell(document)
+
+    def _get_concatenated_notebook_of(
+        self, cell_key: str
+    ) -> Optional[ConcatenatedNotebookDocument]:
+        """Return the concatenated document of the notebook containing the given
+        cell, if it has been created."""
+        if (notebook_key := self._cell_in_notebook.get(cell_key)) is None:
+            return None
+
+        return self._concatenated_notebooks.get(notebook_key)
 
     def remove_notebook_document(self, params: types.DidCloseNotebookDocumentParams):
-        notebook_uri = params.notebook_document.uri
-        self._notebook_documents.pop(unquote(notebook_uri), None)
+        key = normalize_uri(params.notebook_document.uri).key
+        self._notebook_documents.pop(key, None)
+        self._cell_index.pop(key, None)
+        self._concatenated_notebooks.pop(key, None)
 
         for cell_document in params.cell_text_documents:
             self.remove_text_document(cell_document.uri)
 
     def remove_text_document(self, doc_uri: str):
-        self._text_documents.pop(unquote(doc_uri), None)
-        self._cell_in_notebook.pop(unquote(doc_uri), None)
+        key = normalize_uri(doc_uri).key
+        self._text_documents.pop(key, None)
+        self._cell_in_notebook.pop(key, None)
 
     def remove_folder(self, folder_uri: str):
-        self._folders.pop(unquote(folder_uri), None)
-        try:
-            del self._folders[unquote(folder_uri)]
-        except KeyError:
-            pass
+        key = normalize_uri(folder_uri).key
+        self._folders.pop(key, None)
+
+        # Remove the folder from the tree, along with any nodes left empty.
+        path = [self._folder_tree]
+        segments = _uri_segments(key)
+        for segment in segments:
+            if (node := path[-1].children.get(segment)) is None:
+                return
+
+            path.append(node)
+
+        path[-1].folder = None
+        for parent, segment in zip(reversed(path[:-1]), reversed(segments)):
+            child = parent.children[segment]
+            if child.folder is not None or len(child.children) > 0:
+                break
+
+            del parent.children[segment]
 
     @property
     def root_path(self):
@@ -225,9 +457,15 @@ class Workspace(object):
 
     def update_notebook_document(self, params: types.DidChangeNotebookDocumentParams):
         uri = params.notebook_document.uri
-        notebook = self._notebook_documents[unquote(uri)]
+        key = normalize_uri(uri).key
+        notebook = self._notebook_documents[key]
+        cell_index = self._cell_index[key]
         notebook.version = params.notebook_document.version
 
+        concatenated = self._concatenated_notebooks.get(key)
+        if concatenated is not None:
+            concatenated.version = notebook.version
+
         if params.change.metadata:
             notebook.metadata = params.change.metadata
 
@@ -236,15 +474,16 @@ class Workspace(object):
             return
 
         # Process changes to any cell metadata.
-        nb_cells = {cell.document: cell for cell in notebook.cells}
         for new_data in cell_changes.data or []:
-            nb_cell = nb_cells.get(new_data.document)
-            if nb_cell is None:
+            idx = cell_index.get(normalize_uri(new_data.document).key)
+            if idx is None:
                 logger.warning(
                     "Ignoring metadata for '%s': not in notebook.", new_data.document
                 )
                 continue
 
+            nb_cell = notebook.cells[idx]
+
             nb_cell.kind = new_data.kind
             nb_cell.metadata = new_data.metadata
             nb_cell.execution_summary = new_data.execution_summary
@@ -252,20 +491,40 @@ class Workspace(object):
         # Process changes to the notebook's structure
         structure = cell_changes.structure
         if structure:
-            cells = notebook.cells
-            new_cells = structure.array.cells or []
-
-            # Re-order the cells
-            before = cells[: structure.array.start]
-            after = cells[(structure.array.start + structure.array.delete_count) :]
-            notebook.cells = [*before, *new_cells, *after]
-
+            # The list of cells is owned by the workspace, see put_notebook_document
+            cells = typing.cast(List[types.NotebookCell], notebook.cells)
+            start = structure.array.start
+            end = start + structure.array.delete_count
+            new_cells = [attrs.evolve(cell) for cell in structure.array.cells or []]
+
+            # Open any new cells while the cell index still matches the concatenated
+            # document, which is updated once the structure has changed.
             for new_cell in structure.did_open or []:
                 self.put_text_document(new_cell, notebook_uri=uri)
 
+            for cell in cells[start:end]:
+                cell_index.pop(normalize_uri(cell.document).key, None)
+
+            cells[start:end] = new_cells
+
+            # Unless the number of cells has changed, only the new cells need to be
+            # indexed, otherwise every cell after them has moved too.
+            if len(new_cells) != end - start:
+                end = len(cells)
+
+            for idx in range(start, end):
+                cell_index[normalize_uri(cells[idx].document).key] = idx
+
             for removed_cell in structure.did_close or []:
                 self.remove_text_document(removed_cell.uri)
 
+            if concatenated is not None:
+                concatenated.splice_cells(
+                    start,
+                    structure.array.delete_count,
+                    [self._get_cell_document(cell.document) for cell in new_cells],
+                )
+
         # Process changes to the text content of existing cells.
         for text in cell_changes.text_content or []:
             for change in text.changes:
@@ -275,7 +534,27 @@ class Workspace(object):
         self,
         text_doc: types.VersionedTextDocumentIdentifier,
         change: types.TextDocumentContentChangeEvent,
-    ):
-        doc_uri = text_doc.uri
-        self._text_documents[unquote(doc_uri)].apply_change(change)
-        self._text_documents[unquote(doc_uri)].version = text_doc.version
+    ) -> List[DocumentEdit]:
+        """Apply a change to a text document.
+
+        Parameters
+        ----------
+        text_doc
+           The document to update, and its new version
+
+        change
+           The change to apply
+
+        Returns
+        -------
+        List[DocumentEdit]
+           A description of the changes, in code points and UTF-8 bytes, suitable
+           for updating incremental parsers.
+        """
+        key = normalize_uri(text_doc.uri).key
+        edits = self._text_documents[key].apply_change(change, version=text_doc.version)
+
+        if (concatenated := self._get_concatenated_notebook_of(key)) is not None:
+            concatenated.update_cell(text_doc.uri)
+
+        return edits
@@ -0,0 +1,95 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import time
+
+import pytest
+from lsprotocol import types
+
+from pygls.exceptions import JsonRpcInternalError
+
+from ..conftest import ClientServer
+
+
+class ConfiguredLS(ClientServer):
+    def __init__(self):
+        super().__init__()
+        self.server.enable_metrics()
+
+        @self.server.feature(types.TEXT_DOCUMENT_HOVER)
+        def hover(params: types.HoverParams):
+            if params.position.line > 0:
+                raise ValueError("Hover not supported")
+
+            return types.Hover(contents="hello")
+
+        @self.server.thread()
+        @self.server.feature(types.TEXT_DOCUMENT_DID_SAVE)
+        def did_save(params: types.DidSaveTextDocumentParams):
+            pass
+
+
+def hover(client, line: int):
+    return client.protocol.send_request(
+        types.TEXT_DOCUMENT_HOVER,
+        types.HoverParams(
+            text_document=types.TextDocumentIdentifier(uri="file:///example.txt"),
+            position=types.Position(line=line, character=0),
+        ),
+    ).result()
+
+
+@ConfiguredLS.decorate()
+def test_request_metrics(client_server):
+    """Ensure that metrics are recorded for requests."""
+    client, server = client_server
+
+    hover(client, 0)
+    with pytest.raises(JsonRpcInternalError):
+        hover(client, 1)
+
+    # The response may be received before the metrics have been recorded.
+    time.sleep(0.1)
+    stats = server.metrics.method(types.TEXT_DOCUMENT_HOVER)
+
+    assert stats.decode_time.count == 2
+    assert stats.request_bytes.count == 2
+    assert stats.queue_time.count == 2
+    assert stats.handler_time.count == 2
+    assert stats.encode_time.count == 2
+    assert stats.response_bytes.count == 2
+    assert stats.errors == 1
+    assert stats.cancelled == 0
+
+
+@ConfiguredLS.decorate()
+def test_notification_metrics(client_server):
+    """Ensure that metrics are recorded for notifications."""
+    client, server = client_server
+
+    client.protocol.notify(
+        types.TEXT_DOCUMENT_DID_SAVE,
+        types.DidSaveTextDocumentParams(
+            text_document=types.TextDocumentIdentifier(uri="file:///example.txt"),
+        ),
+    )
+
+    time.sleep(0.1)
+    stats = server.metrics.method(types.TEXT_DOCUMENT_DID_SAVE)
+
+    assert stats.decode_time.count == 1
+    assert stats.handler_time.count == 1
+    assert stats.encode_time.count == 0
@@ -0,0 +1,193 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+from typing import List
+
+import pytest
+from lsprotocol import types
+
+from pygls.exceptions import ValidationError
+from pygls.lsp.server import LanguageServer
+
+from ..conftest import ClientServer
+
+RANGE = types.Range(
+    start=types.Position(line=0, character=0),
+    end=types.Position(line=0, character=1),
+)
+
+
+class ConfiguredLS(ClientServer):
+    def __init__(self):
+        super().__init__()
+        self.client.notifications: List[types.ProgressParams] = []
+
+        @self.server.feature(types.WORKSPACE_SYMBOL)
+        async def workspace_symbol(ls, params: types.WorkspaceSymbolParams):
+            for name in ["one", "two"]:
+                yield [
+                    types.WorkspaceSymbol(
+                        name=f"{name}-{idx}",
+                        kind=types.SymbolKind.Function,
+                        location=types.Location(uri=f"file:///{name}.txt", range=RANGE),
+                    )
+                    for idx in range(2)
+                ]
+
+        @self.server.feature(types.TEXT_DOCUMENT_DOCUMENT_SYMBOL)
+        async def document_symbol(params: types.DocumentSymbolParams):
+            for name in ["one", "two"]:
+                yield [
+                    types.DocumentSymbol(
+                        name=name,
+                        kind=types.SymbolKind.Function,
+                        range=RANGE,
+                        selection_range=RANGE,
+                    )
+                ]
+
+        @self.server.feature(
+            types.TEXT_DOCUMENT_DIAGNOSTIC,
+            types.DiagnosticOptions(
+                inter_file_dependencies=False, workspace_diagnostics=True
+            ),
+        )
+        def document_diagnostic(params):
+            return None
+
+        @self.server.feature(types.WORKSPACE_DIAGNOSTIC)
+        async def workspace_diagnostic(params: types.WorkspaceDiagnosticParams):
+            for name in ["one", "two"]:
+                yield [
+                    types.WorkspaceFullDocumentDiagnosticReport(
+                        uri=f"file:///{name}.txt", version=None, items=[]
+                    )
+                ]
+
+        @self.client.feature(types.PROGRESS)
+        def progress(params):
+            self.client.notifications.append(params)
+
+
+@ConfiguredLS.decorate()
+def test_gathered_results(client_server):
+    """Ensure that chunks are gathered into a single result when the client does not
+    request partial results."""
+    client, _ = client_server
+
+    response = client.protocol.send_request(
+        types.WORKSPACE_SYMBOL, types.WorkspaceSymbolParams(query="")
+    ).result()
+
+    assert [symbol.name for symbol in response] == ["one-0", "one-1", "two-0", "two-1"]
+    assert client.notifications == []
+
+
+@ConfiguredLS.decorate()
+def test_partial_results(client_server):
+    """Ensure that chunks are streamed to the client when partial results are
+    requested."""
+    client, _ = client_server
+
+    response = client.protocol.send_request(
+        types.WORKSPACE_SYMBOL,
+        types.WorkspaceSymbolParams(query="", partial_result_token="token"),
+    ).result()
+
+    assert len(response) == 0
+    assert {notif.token for notif in client.notifications} == {"token"}
+    assert [[s["name"] for s in notif.value] for notif in client.notifications] == [
+        ["one-0", "one-1"],
+        ["two-0", "two-1"],
+    ]
+
+
+@ConfiguredLS.decorate()
+def test_gathered_workspace_diagnostics(client_server):
+    """Ensure that workspace diagnostic chunks are gathered into a report."""
+    client, _ = client_server
+
+    response = client.protocol.send_request(
+        types.WORKSPACE_DIAGNOSTIC,
+        types.WorkspaceDiagnosticParams(previous_result_ids=[]),
+    ).result()
+
+    assert [report.uri for report in response.items] == [
+        "file:///one.txt",
+        "file:///two.txt",
+    ]
+
+
+@ConfiguredLS.decorate()
+def test_partial_workspace_diagnostics(client_server):
+    """Ensure that workspace diagnostic chunks are streamed as partial reports."""
+    client, _ = client_server
+
+    response = client.protocol.send_request(
+        types.WORKSPACE_DIAGNOSTIC,
+        types.WorkspaceDiagnosticParams(
+            previous_result_ids=[], partial_result_token="token"
+        ),
+    ).result()
+
+    assert len(response.items) == 0
+    assert [
+        [report["uri"] for report in notif.value["items"]]
+        for notif in client.notifications
+    ] == [["file:///one.txt"], ["file:///two.txt"]]
+
+
+@ConfiguredLS.decorate()
+def test_partial_document_symbols(client_server):
+    """Ensure that document symbol chunks are streamed as lists of symbols."""
+    client, _ = client_server
+
+    response = client.protocol.send_request(
+        types.TEXT_DOCUMENT_DOCUMENT_SYMBOL,
+        types.DocumentSymbolParams(
+            text_document=types.TextDocumentIdentifier(uri="file:///one.txt"),
+            partial_result_token="token",
+        ),
+    ).result()
+
+    assert len(response) == 0
+    assert [[s["name"] for s in notif.value] for notif in client.notifications] == [
+        ["one"],
+        ["two"],
+    ]
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL,
+        types.TEXT_DOCUMENT_DIAGNOSTIC,
+        types.TEXT_DOCUMENT_HOVER,
+        "example/custom",
+    ],
+)
+def test_partial_results_not_supported(method: str):
+    """Ensure that async generator handlers are rejected for methods whose results
+    cannot be streamed as lists of items."""
+    server = LanguageServer("test-server", "v1")
+
+    with pytest.raises(ValidationError, match="does not support partial results"):
+
+        @server.feature(method)
+        async def handler(params):
+            yield []
+
+    assert method not in server.protocol.fm.features
@@ -0,0 +1,71 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import pathlib
+
+from lsprotocol import types
+
+from ..conftest import ClientServer
+
+
+class ConfiguredLS(ClientServer):
+    def __init__(self):
+        super().__init__()
+        self.server.enable_profiler()
+
+        @self.server.feature(types.TEXT_DOCUMENT_HOVER)
+        def hover(params: types.HoverParams):
+            return types.Hover(contents="hello")
+
+
+def profile(client, *arguments):
+    return client.protocol.send_request(
+        types.WORKSPACE_EXECUTE_COMMAND,
+        types.ExecuteCommandParams(command="pygls.profile", arguments=list(arguments)),
+    ).result()
+
+
+@ConfiguredLS.decorate()
+def test_command_registered(client_server):
+    """Ensure that the profiler command is advertised to the client."""
+    _, server = client_server
+
+    options = server.server_capabilities.execute_command_provider
+    assert "pygls.profile" in options.commands
+
+
+@ConfiguredLS.decorate()
+def test_profile(client_server, tmp_path):
+    """Ensure that the client can capture a profile of the server."""
+    client, _ = client_server
+
+    response = profile(client, "start", {"mode": "cprofile"})
+    assert response == {"running": True, "mode": "cprofile"}
+
+    for _ in range(5):
+        client.protocol.send_request(
+            types.TEXT_DOCUMENT_HOVER,
+            types.HoverParams(
+                text_document=types.TextDocumentIdentifier(uri="file:///example.txt"),
+                position=types.Position(line=0, character=0),
+            ),
+        ).result()
+
+    path = tmp_path / "server.prof"
+    response = profile(client, "stop", {"path": str(path)})
+
+    assert response == {"running": False, "path": str(path)}
+    assert pathlib.Path(response["path"]).stat().st_size > 0
@@ -0,0 +1,104 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+from time import sleep
+
+from lsprotocol import types
+
+from pygls import uris
+
+from ..conftest import ClientServer
+
+URI = "file:///example.txt"
+
+
+class ConfiguredLS(ClientServer):
+    def __init__(self):
+        super().__init__()
+        self.server.calls = 0
+
+        @self.server.cache()
+        @self.server.feature(types.TEXT_DOCUMENT_FOLDING_RANGE)
+        def f(ls, params: types.FoldingRangeParams):
+            ls.calls += 1
+            doc = ls.workspace.get_text_document(params.text_document.uri)
+
+            return [
+                types.FoldingRange(start_line=0, end_line=len(doc.lines) - 1),
+            ]
+
+
+def folding_ranges(client, uri=URI):
+    return client.protocol.send_request(
+        types.TEXT_DOCUMENT_FOLDING_RANGE,
+        types.FoldingRangeParams(
+            text_document=types.TextDocumentIdentifier(uri=uri),
+        ),
+    ).result()
+
+
+@ConfiguredLS.decorate()
+def test_results_are_cached(client_server):
+    """Ensure that repeat requests for an unchanged document are served from the
+    cache."""
+    client, server = client_server
+
+    client.protocol.notify(
+        types.TEXT_DOCUMENT_DID_OPEN,
+        types.DidOpenTextDocumentParams(
+            text_document=types.TextDocumentItem(
+                uri=URI, language_id="plaintext", version=1, text="a\nb\n"
+            )
+        ),
+    )
+    sleep(0.1)
+
+    assert folding_ranges(client)[0].end_line == 1
+    assert folding_ranges(client)[0].end_line == 1
+    assert server.calls == 1
+
+    client.protocol.notify(
+        types.TEXT_DOCUMENT_DID_CHANGE,
+        types.DidChangeTextDocumentParams(
+            text_document=types.VersionedTextDocumentIdentifier(uri=URI, version=2),
+            content_changes=[
+                types.TextDocumentContentChangePartial(
+                    range=types.Range(
+                        start=types.Position(line=2, character=0),
+                        end=types.Position(line=2, character=0),
+                    ),
+                    text="c\n",
+                )
+            ],
+        ),
+    )
+    sleep(0.1)
+
+    assert folding_ranges(client)[0].end_line == 2
+    assert server.calls == 2
+
+
+@ConfiguredLS.decorate()
+def test_results_for_unopened_documents_are_not_cached(client_server):
+    """Ensure that we do not cache results for documents not managed by the
+    client."""
+    client, server = client_server
+
+    uri = uris.from_fs_path(__file__)
+    folding_ranges(client, uri=uri)
+    folding_ranges(client, uri=uri)
+
+    assert server.calls == 2
@@ -0,0 +1,133 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import pytest
+from lsprotocol import types
+
+from pygls.exceptions import JsonRpcMethodNotFound
+
+from ..conftest import ClientServer
+
+LEGEND = types.SemanticTokensLegend(token_types=["keyword"], token_modifiers=[])
+TOKENS = {
+    "file://one.txt": [0, 0, 2, 0, 0],
+    "file://two.txt": [0, 0, 2, 0, 0, 1, 0, 4, 0, 0],
+}
+
+
+class ConfiguredLS(ClientServer):
+    def __init__(self):
+        super().__init__()
+
+        @self.server.feature(types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL, LEGEND)
+        @self.server.feature(types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL_DELTA, LEGEND)
+        def f(params):
+            return types.SemanticTokens(data=TOKENS[params.text_document.uri])
+
+
+@ConfiguredLS.decorate()
+def test_capabilities(client_server):
+    _, server = client_server
+    capabilities = server.server_capabilities
+
+    provider = capabilities.semantic_tokens_provider
+    assert provider.full == types.SemanticTokensFullDelta(delta=True)
+
+
+@ConfiguredLS.decorate()
+def test_semantic_tokens_full_delta(client_server):
+    """Ensure that pygls converts full tokens into a delta."""
+    client, _ = client_server
+    uri = "file://two.txt"
+
+    full = client.protocol.send_request(
+        types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL,
+        types.SemanticTokensParams(text_document=types.TextDocumentIdentifier(uri=uri)),
+    ).result()
+
+    assert full.result_id is not None
+    assert list(full.data) == TOKENS[uri]
+
+    TOKENS[uri] = [0, 0, 2, 0, 0, 1, 0, 5, 0, 0]
+    delta = client.protocol.send_request(
+        types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL_DELTA,
+        types.SemanticTokensDeltaParams(
+            text_document=types.TextDocumentIdentifier(uri=uri),
+            previous_result_id=full.result_id,
+        ),
+    ).result()
+
+    assert isinstance(delta, types.SemanticTokensDelta)
+    assert delta.result_id != full.result_id
+    assert len(delta.edits) == 1
+
+    edit = delta.edits[0]
+    assert edit.start == 7
+    assert edit.delete_count == 1
+    assert list(edit.data) == [5]
+
+
+@ConfiguredLS.decorate()
+def test_semantic_tokens_full_delta_unknown_result_id(client_server):
+    """Ensure that the full tokens are sent if the previous result is not known."""
+    client, _ = client_server
+    uri = "file://one.txt"
+
+    result = client.protocol.send_request(
+        types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL_DELTA,
+        types.SemanticTokensDeltaParams(
+            text_document=types.TextDocumentIdentifier(uri=uri),
+            previous_result_id="unknown",
+        ),
+    ).result()
+
+    assert isinstance(result, types.SemanticTokens)
+    assert result.result_id is not None
+    assert list(result.data) == TOKENS[uri]
+
+
+class DeltaOnlyLS(ClientServer):
+    def __init__(self):
+        super().__init__()
+
+        @self.server.feature(types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL_DELTA, LEGEND)
+        def f(params):
+            return types.SemanticTokens(data=TOKENS[params.text_document.uri])
+
+
+@DeltaOnlyLS.decorate()
+def test_semantic_tokens_full_not_registered(client_server):
+    """Ensure that requests for features the server has not registered are reported
+    as unknown methods."""
+    client, _ = client_server
+    uri = "file://one.txt"
+
+    with pytest.raises(JsonRpcMethodNotFound):
+        client.protocol.send_request(
+            types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL,
+            types.SemanticTokensParams(
+                text_document=types.TextDocumentIdentifier(uri=uri)
+            ),
+        ).result()
+
+    result = client.protocol.send_request(
+        types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL_DELTA,
+        types.SemanticTokensDeltaParams(
+            text_document=types.TextDocumentIdentifier(uri=uri),
+            previous_result_id="unknown",
+        ),
+    ).result()
+    assert list(result.data) == TOKENS[uri]
@@ -0,0 +1,176 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import pytest
+from lsprotocol import types
+
+from pygls.exceptions import JsonRpcMethodNotFound
+from pygls.tracing import current_span
+
+from ..conftest import ClientServer
+
+
+class Span:
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.attributes = attributes
+        self.events: List[str] = []
+        self.exceptions: List[BaseException] = []
+        self.ended = threading.Event()
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, attributes=None, timestamp=None):
+        self.events.append(name)
+
+    def record_exception(self, exception: BaseException):
+        self.exceptions.append(exception)
+
+    def end(self):
+        assert not self.ended.is_set(), "Span ended twice"
+        self.ended.set()
+
+
+class Tracer:
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def start_span(self, name: str, attributes=None, start_time=None):
+        span = Span(name, dict(attributes or {}))
+        self.spans.append(span)
+        return span
+
+    def find(self, name: str) -> Span:
+        """Wait for the span with the given name to end."""
+        for _ in range(100):
+            if spans := [s for s in self.spans if s.name == name]:
+                (span,) = spans
+                assert span.ended.wait(timeout=1)
+                return span
+
+            time.sleep(0.01)
+
+        raise AssertionError(f"No span for {name!r}")
+
+
+class ConfiguredLS(ClientServer):
+    def __init__(self):
+        super().__init__()
+        self.server.set_tracer(Tracer())
+        self.server.spans: Dict[str, Optional[Span]] = {}
+
+        @self.server.thread()
+        @self.server.feature(types.TEXT_DOCUMENT_HOVER)
+        def hover(ls, params: types.HoverParams):
+            ls.spans["hover"] = current_span()
+            return types.Hover(contents="hello")
+
+        @self.server.feature(types.TEXT_DOCUMENT_DID_OPEN)
+        async def did_open(ls, params: types.DidOpenTextDocumentParams):
+            ls.spans["didOpen"] = current_span()
+
+        @self.server.feature(types.TEXT_DOCUMENT_DEFINITION)
+        def definition(ls, params: types.DefinitionParams):
+            raise ValueError("Unable to find definition")
+
+
+def text_document():
+    return types.TextDocumentIdentifier(uri="file:///example.txt")
+
+
+@ConfiguredLS.decorate()
+def test_request_span(client_server):
+    """Ensure that requests are traced, including into the thread pool."""
+    client, server = client_server
+
+    client.protocol.send_request(
+        types.TEXT_DOCUMENT_HOVER,
+        types.HoverParams(
+            text_document=text_document(),
+            position=types.Position(line=0, character=0),
+        ),
+    ).result()
+
+    span = server.tracer.find(types.TEXT_DOCUMENT_HOVER)
+
+    assert server.spans["hover"] is span
+    assert span.attributes["rpc.method"] == types.TEXT_DOCUMENT_HOVER
+    assert "rpc.jsonrpc.request_id" in span.attributes
+    assert span.events == [
+        "message.structured",
+        "scheduled",
+        "handler.start",
+        "handler.end",
+        "response.sent",
+    ]
+
+
+@ConfiguredLS.decorate()
+def test_request_error_span(client_server):
+    """Ensure that errors raised by a handler are recorded."""
+    client, server = client_server
+
+    with pytest.raises(Exception):
+        client.protocol.send_request(
+            types.TEXT_DOCUMENT_DEFINITION,
+            types.DefinitionParams(
+                text_document=text_document(),
+                position=types.Position(line=0, character=0),
+            ),
+        ).result()
+
+    span = server.tracer.find(types.TEXT_DOCUMENT_DEFINITION)
+    (error,) = span.exceptions
+    assert isinstance(error, ValueError)
+
+
+@ConfiguredLS.decorate()
+def test_unknown_method_span(client_server):
+    """Ensure that spans are ended for requests to unknown methods."""
+    client, server = client_server
+
+    with pytest.raises(JsonRpcMethodNotFound):
+        client.protocol.send_request("example/unknown", {}).result()
+
+    span = server.tracer.find("example/unknown")
+    (error,) = span.exceptions
+    assert isinstance(error, JsonRpcMethodNotFound)
+
+
+@ConfiguredLS.decorate()
+def test_notification_span(client_server):
+    """Ensure that spans are propagated to the sub-handlers of builtin features."""
+    client, server = client_server
+
+    client.protocol.notify(
+        types.TEXT_DOCUMENT_DID_OPEN,
+        types.DidOpenTextDocumentParams(
+            text_document=types.TextDocumentItem(
+                uri="file:///example.txt", language_id="plaintext", version=1, text=""
+            )
+        ),
+    )
+
+    span = server.tracer.find(types.TEXT_DOCUMENT_DID_OPEN)
+
+    assert server.spans["didOpen"] is span
+    assert "rpc.jsonrpc.request_id" not in span.attributes
+    assert span.events[-1] == "handler.end"
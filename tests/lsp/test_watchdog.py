@@ -0,0 +1,182 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import asyncio
+import io
+import logging
+import threading
+import time
+from typing import List
+
+from lsprotocol import types
+
+from pygls.io_ import run
+from pygls.protocol import JsonRPCProtocol, default_converter
+from pygls.watchdog import Stall, Watchdog
+
+from ..conftest import ClientServer
+
+URI = "file:///example.txt"
+
+
+class StallRecorder:
+    def __init__(self):
+        self.stalls: List[Stall] = []
+
+    def __call__(self, stall: Stall):
+        self.stalls.append(stall)
+
+
+class ConfiguredLS(ClientServer):
+    def __init__(self):
+        super().__init__()
+        self.server.enable_metrics()
+        self.server.enable_watchdog(threshold=0.1, callback=StallRecorder())
+
+        @self.server.feature(types.TEXT_DOCUMENT_HOVER)
+        def blocking_hover(params: types.HoverParams):
+            time.sleep(0.5)
+            return types.Hover(contents="hello")
+
+        @self.server.feature(types.TEXT_DOCUMENT_DEFINITION)
+        async def blocking_definition(params: types.DefinitionParams):
+            await asyncio.sleep(0)
+            time.sleep(0.5)
+            return []
+
+        @self.server.thread()
+        @self.server.feature(types.TEXT_DOCUMENT_REFERENCES)
+        def threaded_references(params: types.ReferenceParams):
+            time.sleep(0.5)
+            return []
+
+        @self.server.feature(types.TEXT_DOCUMENT_DID_SAVE)
+        def blocking_did_save(params: types.DidSaveTextDocumentParams):
+            time.sleep(0.5)
+
+
+DOCUMENT = types.TextDocumentIdentifier(uri=URI)
+POSITION = types.Position(line=0, character=0)
+
+
+def send_request(client, method: str, params):
+    return client.protocol.send_request(method, params).result()
+
+
+def wait_for_stalls(server) -> List[Stall]:
+    stalls = server.protocol.watchdog.callback.stalls
+
+    # The stall is reported from another thread
+    for _ in range(50):
+        if len(stalls) > 0:
+            break
+
+        time.sleep(0.1)
+
+    return stalls
+
+
+@ConfiguredLS.decorate()
+def test_sync_handler_stall(client_server):
+    """Ensure that a synchronous handler blocking the event loop is reported."""
+    client, server = client_server
+
+    send_request(
+        client,
+        types.TEXT_DOCUMENT_HOVER,
+        types.HoverParams(text_document=DOCUMENT, position=POSITION),
+    )
+    stalls = wait_for_stalls(server)
+
+    assert len(stalls) == 1
+    stall = stalls[0]
+
+    assert stall.method == types.TEXT_DOCUMENT_HOVER
+    assert stall.msg_id is not None
+    assert stall.duration >= 0.1
+    assert "blocking_hover" in stall.stack
+    assert "time.sleep(0.5)" in stall.stack
+
+    assert server.metrics.stalls == 1
+    assert server.protocol.watchdog.is_running
+
+
+@ConfiguredLS.decorate()
+def test_async_handler_stall(client_server):
+    """Ensure that the message is known when a coroutine blocks the event loop."""
+    client, server = client_server
+
+    send_request(
+        client,
+        types.TEXT_DOCUMENT_DEFINITION,
+        types.DefinitionParams(text_document=DOCUMENT, position=POSITION),
+    )
+    stalls = wait_for_stalls(server)
+
+    assert len(stalls) == 1
+    assert stalls[0].method == types.TEXT_DOCUMENT_DEFINITION
+    assert stalls[0].msg_id is not None
+    assert "blocking_definition" in stalls[0].stack
+
+
+@ConfiguredLS.decorate()
+def test_notification_stall(client_server):
+    """Ensure that notification handlers blocking the event loop are reported."""
+    client, server = client_server
+
+    client.protocol.notify(
+        types.TEXT_DOCUMENT_DID_SAVE,
+        types.DidSaveTextDocumentParams(text_document=DOCUMENT),
+    )
+    stalls = wait_for_stalls(server)
+
+    assert len(stalls) == 1
+    assert stalls[0].method == types.TEXT_DOCUMENT_DID_SAVE
+    assert stalls[0].msg_id is None
+    assert "blocking_did_save" in stalls[0].stack
+
+
+@ConfiguredLS.decorate()
+def test_threaded_handler(client_server):
+    """Ensure that handlers running in the thread pool are not reported."""
+    client, server = client_server
+
+    send_request(
+        client,
+        types.TEXT_DOCUMENT_REFERENCES,
+        types.ReferenceParams(
+            text_document=DOCUMENT,
+            position=POSITION,
+            context=types.ReferenceContext(include_declaration=False),
+        ),
+    )
+    time.sleep(0.2)
+
+    assert server.protocol.watchdog.callback.stalls == []
+    assert server.metrics.stalls == 0
+
+
+def test_synchronous_main_loop(caplog):
+    """Ensure that a warning is logged when the watchdog is enabled for a server
+    using the synchronous main loop."""
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.watchdog = Watchdog(protocol)
+
+    with caplog.at_level(logging.WARNING):
+        run(threading.Event(), io.BytesIO(b""), protocol)
+
+    assert "watchdog is not supported" in caplog.text
+    assert not protocol.watchdog.is_running
@@ -0,0 +1,31 @@
+"""A server that can record its session with the client."""
+
+import sys
+
+from pygls.server import JsonRPCServer
+from pygls.protocol import JsonRPCProtocol, default_converter
+
+server = JsonRPCServer(JsonRPCProtocol, default_converter)
+
+
+@server.feature("echo")
+def echo(params):
+    return params._asdict()
+
+
+@server.feature("ask")
+async def ask(params):
+    response = await server.protocol.send_request_async("client/value", {})
+    return dict(value=response.value)
+
+
+@server.feature("exit")
+def exit(*args):
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        server.record_session(sys.argv[1])
+
+    server.start_io()
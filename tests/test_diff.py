@@ -0,0 +1,179 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import random
+
+import pytest
+from lsprotocol import types
+
+from pygls.workspace import PositionCodec, TextDocument
+from pygls.workspace.diff import compute_text_edits, diff_lines, diff_sequences
+
+
+def apply_hunks(a, b, hunks):
+    """Apply the given hunks to ``a``."""
+    result = []
+    idx = 0
+    for i1, i2, j1, j2 in hunks:
+        assert i1 >= idx
+        result.extend(a[idx:i1])
+        result.extend(b[j1:j2])
+        idx = i2
+
+    result.extend(a[idx:])
+    return result
+
+
+@pytest.mark.parametrize(
+    "old, new, expected",
+    [
+        ([], [], []),
+        (["a\n"], ["a\n"], []),
+        ([], ["a\n"], [(0, 0, 0, 1)]),
+        (["a\n"], [], [(0, 1, 0, 0)]),
+        (["a\n", "b\n", "c\n"], ["a\n", "x\n", "c\n"], [(1, 2, 1, 2)]),
+        (["a\n", "b\n", "c\n"], ["a\n", "c\n"], [(1, 2, 1, 1)]),
+        (
+            ["a\n", "b\n", "c\n", "d\n", "e\n"],
+            ["x\n", "b\n", "c\n", "d\n", "y\n"],
+            [(0, 1, 0, 1), (4, 5, 4, 5)],
+        ),
+        (
+            ["a\n", "}\n", "b\n", "}\n"],
+            ["a\n", "}\n", "c\n", "}\n", "b\n", "}\n"],
+            [(2, 2, 2, 4)],
+        ),
+    ],
+)
+def test_diff_lines(old, new, expected):
+    assert diff_lines(old, new) == expected
+
+
+def test_diff_sequences_random():
+    """Ensure that applying the hunks to the old sequence produces the new one."""
+    rng = random.Random(1234)
+
+    for _ in range(500):
+        a = [rng.randint(0, 4) for _ in range(rng.randint(0, 30))]
+        b = list(a)
+        for _ in range(rng.randint(0, 6)):
+            op = rng.random()
+            if op < 0.3 and b:
+                del b[rng.randrange(len(b))]
+            elif op < 0.6:
+                b.insert(rng.randint(0, len(b)), rng.randint(0, 6))
+            elif b:
+                b[rng.randrange(len(b))] = rng.randint(0, 6)
+
+        hunks = diff_sequences(a, b)
+        assert apply_hunks(a, b, hunks) == b
+
+        # Hunks are separated by at least one unchanged item
+        for (_, i2, _, j2), (i1, _, j1, _) in zip(hunks, hunks[1:]):
+            assert i1 > i2 and j1 > j2
+
+
+def test_diff_lines_large():
+    """Ensure that large inputs with many differences are still handled."""
+    old = [f"{i}\n" for i in range(20_000)]
+    new = list(reversed(old))
+
+    assert apply_hunks(old, new, diff_lines(old, new)) == new
+
+
+def apply_text_edits(lines, edits, encoding):
+    """Apply the given text edits, with positions in the given encoding."""
+    text = "".join(lines)
+    unit_size = {"utf-8": 1, "utf-16-le": 2, "utf-32-le": 4}[encoding]
+
+    def offset(position):
+        if position.line >= len(lines):
+            return len(text)
+
+        line = lines[position.line]
+        character = 0
+        units = 0
+        while units < position.character:
+            units += len(line[character].encode(encoding)) // unit_size
+            character += 1
+
+        return sum(len(line) for line in lines[: position.line]) + character
+
+    result = []
+    idx = 0
+    for edit in edits:
+        start, end = offset(edit.range.start), offset(edit.range.end)
+        assert start >= idx
+        result.append(text[idx:start])
+        result.append(edit.new_text)
+        idx = end
+
+    result.append(text[idx:])
+    return "".join(result)
+
+
+@pytest.mark.parametrize(
+    "encoding, codec",
+    [
+        (types.PositionEncodingKind.Utf8, "utf-8"),
+        (types.PositionEncodingKind.Utf16, "utf-16-le"),
+        (types.PositionEncodingKind.Utf32, "utf-32-le"),
+    ],
+)
+def test_compute_text_edits_random(encoding, codec):
+    """Ensure that the computed edits transform the document into the new text."""
+    rng = random.Random(5678)
+    words = ["a", "b", " ", "\n", "ü", "😋", "foo", "\r\n"]
+
+    for _ in range(300):
+        old = "".join(rng.choice(words) for _ in range(rng.randint(0, 40)))
+        new = list(old)
+        for _ in range(rng.randint(0, 5)):
+            idx = rng.randint(0, len(new))
+            if rng.random() < 0.5 and idx < len(new):
+                del new[idx]
+            else:
+                new.insert(idx, rng.choice(words))
+
+        document = TextDocument(
+            "file:///test.txt", old, position_codec=PositionCodec(encoding)
+        )
+        edits = compute_text_edits(document, "".join(new))
+        assert apply_text_edits(document.lines, edits, codec) == "".join(new)
+
+
+def test_compute_text_edits():
+    document = TextDocument(
+        "file:///test.txt", "def hello():\n    print('hi')\n\nhello()\n"
+    )
+    edits = compute_text_edits(
+        document, "def hello():\n    print('hello')\n\nhello()\n"
+    )
+
+    assert edits == [
+        types.TextEdit(
+            range=types.Range(
+                start=types.Position(line=1, character=12),
+                end=types.Position(line=1, character=13),
+            ),
+            new_text="ello",
+        )
+    ]
+
+
+def test_compute_text_edits_unchanged():
+    document = TextDocument("file:///test.txt", "abc\n")
+    assert compute_text_edits(document, "abc\n") == []
@@ -20,6 +20,7 @@ import re
 
 from lsprotocol import types
 from pygls.workspace import (
+    DocumentEdit,
     TextDocument,
     PositionCodec,
     ServerTextPosition,
@@ -116,6 +117,339 @@ def test_document_lines():
     assert doc.lines[0] == "document\n"
 
 
+def test_document_lines_cached():
+    doc = TextDocument(DOC_URI, DOC)
+    assert doc.lines is doc.lines
+
+    doc.apply_change(types.TextDocumentContentChangeWholeDocument(text="new\n"))
+    assert doc.lines == ("new\n",)
+
+
+def test_document_snapshot():
+    doc = TextDocument(DOC_URI, "hello world\n", version=1, language_id="plaintext")
+    snapshot = doc.snapshot()
+
+    assert snapshot.uri == DOC_URI
+    assert snapshot.version == 1
+    assert snapshot.language_id == "plaintext"
+    assert snapshot.source is doc.source
+    assert snapshot.lines is doc.lines
+
+    change = types.TextDocumentContentChangePartial(
+        range=types.Range(
+            start=types.Position(line=0, character=0),
+            end=types.Position(line=0, character=5),
+        ),
+        text="goodbye",
+    )
+    doc.apply_change(change, version=2)
+
+    assert doc.version == 2
+    assert doc.source == "goodbye world\n"
+
+    # The snapshot is unaffected by the change
+    assert snapshot.version == 1
+    assert snapshot.source == "hello world\n"
+    assert snapshot.word_at_position(types.Position(line=0, character=2)) == "hello"
+    assert snapshot.offset_at_position(types.Position(line=0, character=6)) == 6
+    assert doc.snapshot().version == 2
+
+
+def test_document_snapshot_immutable():
+    snapshot = TextDocument(DOC_URI, DOC).snapshot()
+
+    with pytest.raises(AttributeError):
+        snapshot.version = 2  # type: ignore[misc]
+
+    with pytest.raises(AttributeError):
+        snapshot._source = ""  # type: ignore[misc]
+
+
+def _edit(start_line, start_char, end_line, end_char, text):
+    return types.TextDocumentContentChangePartial(
+        range=types.Range(
+            start=types.Position(line=start_line, character=start_char),
+            end=types.Position(line=end_line, character=end_char),
+        ),
+        text=text,
+    )
+
+
+def test_document_map_position():
+    doc = TextDocument(DOC_URI, "abc\ndef\nghi\n", version=1)
+    position = types.Position(line=1, character=2)
+
+    # Insert a line before the position
+    doc.apply_change(_edit(0, 0, 0, 0, "new line\n"), version=2)
+    assert doc.map_position(position, 1) == types.Position(line=2, character=2)
+
+    # Insert text on the same line, before the position
+    doc.apply_change(_edit(2, 0, 2, 0, "xx"), version=3)
+    assert doc.map_position(position, 1) == types.Position(line=2, character=4)
+    assert doc.map_position(types.Position(line=2, character=2), 2) == (
+        types.Position(line=2, character=4)
+    )
+
+    # Changes after the position have no effect
+    doc.apply_change(_edit(3, 0, 3, 3, ""), version=4)
+    assert doc.map_position(position, 1) == types.Position(line=2, character=4)
+
+    # Join the line with the previous one
+    doc.apply_change(_edit(1, 3, 2, 0, " "), version=5)
+    assert doc.map_position(position, 1) == types.Position(line=1, character=8)
+    assert doc.lines[1][8] == "f"
+
+    # The current version maps to itself
+    assert doc.map_position(position, 5) == position
+
+
+def test_document_map_position_in_replaced_text():
+    doc = TextDocument(DOC_URI, "hello world\n", version=1)
+    doc.apply_change(_edit(0, 0, 0, 5, "goodbye"), version=2)
+
+    assert doc.map_position(types.Position(line=0, character=2), 1) == (
+        types.Position(line=0, character=0)
+    )
+
+
+def test_document_map_position_multiple_changes():
+    """Ensure that all the changes in a single notification are considered part
+    of the same version."""
+    doc = TextDocument(DOC_URI, "abc\n", version=1)
+    doc.apply_change(_edit(0, 0, 0, 0, "1"), version=2)
+    doc.apply_change(_edit(0, 0, 0, 0, "2"), version=2)
+
+    assert doc.source == "21abc\n"
+    position = types.Position(line=0, character=1)
+    assert doc.map_position(position, 1) == types.Position(line=0, character=3)
+    assert doc.map_position(position, 2) == position
+
+
+def test_document_map_position_utf16():
+    doc = TextDocument(DOC_URI, "x = 1\n", version=1)
+    doc.apply_change(_edit(0, 0, 0, 0, "😋"), version=2)
+
+    assert doc.map_position(types.Position(line=0, character=4), 1) == (
+        types.Position(line=0, character=6)
+    )
+
+
+def test_document_map_position_unknown():
+    doc = TextDocument(DOC_URI, "abc\n", version=1)
+    doc.JOURNAL_SIZE = 2
+
+    position = types.Position(line=0, character=1)
+    for version in range(2, 5):
+        doc.apply_change(_edit(0, 0, 0, 0, "x"), version=version)
+
+    assert doc.map_position(position, 1) is None
+    assert doc.map_position(position, 2) == types.Position(line=0, character=3)
+    assert doc.map_position(position, 5) is None
+
+    # Positions cannot be mapped across a change without a version.
+    doc.apply_change(_edit(0, 0, 0, 0, "x"))
+    assert doc.map_position(position, 4) is None
+
+
+def test_document_full_change_diff():
+    """Ensure that only the lines that differ are included in the edits for a
+    ``Full`` change."""
+    old = "".join(f"line {i}\n" for i in range(100))
+    new = old.replace("line 10\n", "").replace("line 50\n", "line fifty\nextra\n")
+
+    doc = TextDocument(DOC_URI, old, version=1)
+    edits = doc.apply_change(
+        types.TextDocumentContentChangeWholeDocument(text=new), version=2
+    )
+
+    assert doc.source == new
+    assert doc.lines == tuple(new.splitlines(True))
+    assert [(e.old_range, e.new_range) for e in edits] == [
+        (
+            ServerTextRange(ServerTextPosition(50, 0), ServerTextPosition(51, 0)),
+            ServerTextRange(ServerTextPosition(50, 0), ServerTextPosition(52, 0)),
+        ),
+        (
+            ServerTextRange(ServerTextPosition(10, 0), ServerTextPosition(11, 0)),
+            ServerTextRange(ServerTextPosition(10, 0), ServerTextPosition(10, 0)),
+        ),
+    ]
+
+    # Applied in order, the edits transform the old text into the new
+    text = old
+    for edit in edits:
+        text = text[: edit.start_offset] + edit.text + text[edit.old_end_offset :]
+
+    assert text == new
+
+    # Positions can be mapped across the change
+    position = types.Position(line=70, character=5)
+    assert doc.map_position(position, 1) == types.Position(line=70, character=5)
+    assert doc.map_position(types.Position(line=20, character=0), 1) == (
+        types.Position(line=19, character=0)
+    )
+
+
+def test_document_full_change_no_trailing_newline():
+    doc = TextDocument(DOC_URI, "a\nb", version=1)
+    [edit] = doc.apply_change(
+        types.TextDocumentContentChangeWholeDocument(text="a\nc"), version=2
+    )
+
+    assert edit.old_range == ServerTextRange(
+        ServerTextPosition(1, 0), ServerTextPosition(1, 1)
+    )
+    assert edit.new_end_point == (1, 1)
+    _check_edit("a\nb", "a\nc", edit)
+
+
+def test_document_full_change_unchanged():
+    doc = TextDocument(DOC_URI, "abc\n", version=1)
+    edits = doc.apply_change(
+        types.TextDocumentContentChangeWholeDocument(text="abc\n"), version=2
+    )
+
+    assert edits == []
+    assert doc.version == 2
+
+
+def test_document_map_range():
+    doc = TextDocument(DOC_URI, "def hello():\n    pass\n", version=1)
+    hello = types.Range(
+        start=types.Position(line=0, character=4),
+        end=types.Position(line=0, character=9),
+    )
+
+    # Rename the function
+    doc.apply_change(_edit(0, 4, 0, 9, "goodbye"), version=2)
+    assert doc.map_range(hello, 1) == types.Range(
+        start=types.Position(line=0, character=4),
+        end=types.Position(line=0, character=11),
+    )
+
+    # Delete the entire line
+    doc.apply_change(_edit(0, 0, 1, 0, ""), version=3)
+    assert doc.map_range(hello, 1) == types.Range(
+        start=types.Position(line=0, character=0),
+        end=types.Position(line=0, character=0),
+    )
+
+
+def _check_edit(old: str, new: str, edit: DocumentEdit):
+    """Check that the given edit is consistent with the old and new text."""
+    old_bytes, new_bytes = old.encode("utf-8"), new.encode("utf-8")
+
+    assert old[: edit.start_offset] == new[: edit.start_offset]
+    assert old[edit.old_end_offset :] == new[edit.new_end_offset :]
+    assert old_bytes[: edit.start_byte] == new_bytes[: edit.start_byte]
+    assert old_bytes[edit.old_end_byte :] == new_bytes[edit.new_end_byte :]
+
+    for text, data, position, offset, point, byte in [
+        (
+            old,
+            old_bytes,
+            edit.start,
+            edit.start_offset,
+            edit.start_point,
+            edit.start_byte,
+        ),
+        (
+            old,
+            old_bytes,
+            edit.old_end,
+            edit.old_end_offset,
+            edit.old_end_point,
+            edit.old_end_byte,
+        ),
+        (
+            new,
+            new_bytes,
+            edit.new_end,
+            edit.new_end_offset,
+            edit.new_end_point,
+            edit.new_end_byte,
+        ),
+    ]:
+        lines = text.splitlines(True)
+        assert (
+            sum(len(line) for line in lines[: position.line]) + position.character
+            == offset
+        )
+        assert (
+            sum(len(line.encode("utf-8")) for line in lines[: point[0]]) + point[1]
+            == byte
+        )
+
+
+@pytest.mark.parametrize(
+    "old, edit, new",
+    [
+        ("hello world\n", (0, 0, 0, 5, "goodbye"), "goodbye world\n"),
+        ("a\nb\nc\n", (0, 1, 2, 0, ""), "ac\n"),
+        ("a\nb\n", (1, 0, 1, 0, "x\ny\n"), "a\nx\ny\nb\n"),
+        ("x = '😋'\ny = 1\n", (1, 0, 1, 1, "ü"), "x = '😋'\nü = 1\n"),
+        ("x = '😋'\ny = 1\n", (0, 8, 1, 0, "é\n"), "x = '😋'é\ny = 1\n"),
+        ("", (0, 0, 0, 0, "abc"), "abc"),
+    ],
+)
+def test_document_edit_record(old, edit, new):
+    doc = TextDocument(DOC_URI, old, version=1)
+    [record] = doc.apply_change(_edit(*edit), version=2)
+
+    assert doc.source == new
+    assert doc.edits == (record,)
+    _check_edit(old, new, record)
+
+
+@pytest.mark.parametrize(
+    "old, edit, new, expected",
+    [
+        # Insert at the end of a document ending in a newline
+        ("ab\n", (1, 0, 1, 0, "cd\n"), "ab\ncd\n", ((1, 0), (1, 0), (2, 0))),
+        # Delete the last line of a document ending in a newline
+        ("ab\ncd\n", (1, 0, 2, 0, ""), "ab\n", ((1, 0), (2, 0), (1, 0))),
+        # Insert at the end of a document not ending in a newline
+        ("ab", (1, 0, 1, 0, "cd"), "abcd", ((0, 2), (0, 2), (0, 4))),
+    ],
+)
+def test_document_edit_record_end_of_document(old, edit, new, expected):
+    doc = TextDocument(DOC_URI, old, version=1)
+    [record] = doc.apply_change(_edit(*edit), version=2)
+
+    assert doc.source == new
+    assert (record.start_point, record.old_end_point, record.new_end_point) == expected
+    assert (
+        (record.start.line, record.start.character),
+        (record.old_end.line, record.old_end.character),
+        (record.new_end.line, record.new_end.character),
+    ) == expected
+    _check_edit(old, new, record)
+
+
+def test_document_edit_record_full():
+    doc = TextDocument(DOC_URI, "x = '😋'\ny = 1\n", version=1)
+    [record] = doc.apply_change(
+        types.TextDocumentContentChangeWholeDocument(text="z = 2"), version=2
+    )
+
+    assert (record.start_byte, record.old_end_byte, record.new_end_byte) == (0, 17, 5)
+    assert record.old_end_point == (2, 0)
+    assert record.new_end_point == (0, 5)
+    _check_edit("x = '😋'\ny = 1\n", "z = 2", record)
+
+
+def test_document_edits():
+    """Ensure that only the edits that produced the current version are
+    available."""
+    doc = TextDocument(DOC_URI, "abc\n", version=1)
+    [first] = doc.apply_change(_edit(0, 0, 0, 0, "1"), version=2)
+    [second] = doc.apply_change(_edit(0, 0, 0, 0, "2"), version=2)
+    assert doc.edits == (first, second)
+
+    [third] = doc.apply_change(_edit(0, 0, 0, 0, "3"), version=3)
+    assert doc.edits == (third,)
+
+
 def test_document_multiline_edit():
     old = ["def hello(a, b):\n", "    print a\n", "    print b\n"]
     doc = TextDocument(
@@ -517,3 +851,15 @@ def test_position_at_offset_utf8():
     )
     assert doc.client_position_at_offset(8) == types.Position(line=0, character=8)
     assert doc.client_position_at_offset(41) == types.Position(line=4, character=0)
+
+
+def test_document_view_is_abstract():
+    from pygls.workspace.text_document import _TextDocumentView
+
+    class SourceOnly(_TextDocumentView):
+        @property
+        def source(self) -> str:
+            return ""
+
+    with pytest.raises(TypeError):
+        SourceOnly()
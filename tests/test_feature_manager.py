@@ -29,6 +29,7 @@ from pygls.exceptions import (
 from pygls.feature_manager import (
     FeatureManager,
     has_ls_param_or_annotation,
+    is_cached_function,
     wrap_with_server,
 )
 from pygls.lsp.client import BaseLanguageClient, LanguageClient
@@ -210,6 +211,36 @@ def test_wrap_with_server_thread():
     assert wrapped.execute_in_thread is True
 
 
+def test_wrap_with_server_cache():
+    class Server:
+        pass
+
+    async def f(ls):
+        assert isinstance(ls, Server)
+
+    f.cache_result = True
+
+    wrapped = wrap_with_server(f, Server())
+    assert wrapped.cache_result is True
+
+
+def test_cache_decorator_order(feature_manager):
+    @feature_manager.cache()
+    @feature_manager.feature(lsp.TEXT_DOCUMENT_FOLDING_RANGE)
+    def folding_range(params):
+        pass
+
+    @feature_manager.feature(lsp.TEXT_DOCUMENT_DOCUMENT_SYMBOL)
+    @feature_manager.cache()
+    def document_symbol(params):
+        pass
+
+    assert is_cached_function(feature_manager.features[lsp.TEXT_DOCUMENT_FOLDING_RANGE])
+    assert is_cached_function(
+        feature_manager.features[lsp.TEXT_DOCUMENT_DOCUMENT_SYMBOL]
+    )
+
+
 def server_capabilities(**kwargs):
     """Helper to reduce the amount of boilerplate required to specify the expected
     server capabilities by filling in some fields - unless they are explicitly
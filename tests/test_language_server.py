@@ -23,11 +23,15 @@ from pygls import IS_PYODIDE
 from lsprotocol.types import (
     INITIALIZE,
     TEXT_DOCUMENT_DID_OPEN,
+    WORKSPACE_DID_CHANGE_WATCHED_FILES,
     WORKSPACE_EXECUTE_COMMAND,
 )
 from lsprotocol.types import (
     ClientCapabilities,
+    DidChangeWatchedFilesParams,
     DidOpenTextDocumentParams,
+    FileChangeType,
+    FileEvent,
     ExecuteCommandParams,
     InitializeParams,
     TextDocumentItem,
@@ -91,6 +95,27 @@ def test_bf_text_document_did_open(client_server):
     assert document.language_id == "python"
 
 
+def test_bf_workspace_did_change_watched_files(client_server):
+    client, server = client_server
+
+    _initialize_server(server)
+
+    uri = pathlib.Path(__file__).as_uri()
+    document = server.workspace.get_text_document(uri)
+    assert server.workspace.get_text_document(uri) is document
+
+    client.protocol.notify(
+        WORKSPACE_DID_CHANGE_WATCHED_FILES,
+        DidChangeWatchedFilesParams(
+            changes=[FileEvent(uri=uri, type=FileChangeType.Changed)]
+        ),
+    )
+
+    sleep(1)
+
+    assert server.workspace.get_text_document(uri) is not document
+
+
 @pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
 def test_command_async(client_server):
     client, server = client_server
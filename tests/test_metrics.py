@@ -0,0 +1,161 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import asyncio
+import urllib.request
+
+import pytest
+
+from pygls.metrics import Histogram, Metrics
+from pygls.protocol.json_rpc import HandlerKind, handler_kind
+
+
+def test_histogram_empty():
+    """Ensure that an empty histogram reports sensible values."""
+    histogram = Histogram()
+
+    assert histogram.count == 0
+    assert histogram.percentile(99) == 0
+    assert list(histogram.buckets()) == []
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 129, 1_000, 123_456, 10**12])
+def test_histogram_precision(value: int):
+    """Ensure that recorded values can be recovered to within the histogram's
+    precision."""
+    histogram = Histogram()
+    histogram.record(value)
+
+    ((low, high, count),) = histogram.buckets()
+    assert count == 1
+    assert low <= value <= high
+    assert high - low <= max(1, value // 64)
+
+
+def test_histogram_percentiles():
+    """Ensure that percentiles are computed correctly."""
+    histogram = Histogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+
+    assert histogram.count == 1000
+    assert histogram.total == sum(range(1, 1001))
+    assert (histogram.min, histogram.max) == (1, 1000)
+
+    assert histogram.percentile(50) == pytest.approx(500, rel=0.02)
+    assert histogram.percentile(99) == pytest.approx(990, rel=0.02)
+    assert histogram.percentile(100) == 1000
+
+
+def test_instrument_sync_handler():
+    """Ensure that the execution of a sync handler is recorded."""
+    metrics = Metrics()
+
+    def handler(params):
+        if params is None:
+            raise ValueError("missing params")
+
+        return params
+
+    wrapped = metrics.instrument_handler("example", handler, HandlerKind.Sync)
+    assert handler_kind(wrapped) is HandlerKind.Sync
+    assert wrapped(1) == 1
+
+    with pytest.raises(ValueError):
+        wrapped(None)
+
+    stats = metrics.method("example")
+    assert stats.handler_time.count == 2
+    assert stats.queue_time.count == 2
+    assert stats.errors == 1
+
+
+def test_instrument_generator_handler():
+    """Ensure that generator handlers keep working after being instrumented."""
+    metrics = Metrics()
+
+    def handler(params):
+        result = yield "sub-handler"
+        return result + params
+
+    wrapped = metrics.instrument_handler("example", handler, HandlerKind.Generator)
+    assert handler_kind(wrapped) is HandlerKind.Generator
+
+    gen = wrapped(1)
+    assert gen.send(None) == "sub-handler"
+
+    with pytest.raises(StopIteration) as result:
+        gen.send(2)
+
+    assert result.value.value == 3
+    assert metrics.method("example").handler_time.count == 1
+
+
+def test_instrument_coroutine_handler():
+    """Ensure that the execution of a coroutine handler is recorded."""
+    metrics = Metrics()
+
+    async def handler(params):
+        await asyncio.sleep(0.01)
+        return params
+
+    wrapped = metrics.instrument_handler("example", handler, HandlerKind.Coroutine)
+    assert handler_kind(wrapped) is HandlerKind.Coroutine
+    assert asyncio.run(wrapped(1)) == 1
+
+    assert metrics.method("example").handler_time.min >= 10_000
+
+
+def test_to_prometheus():
+    """Ensure that metrics can be exported in the Prometheus text format."""
+    metrics = Metrics()
+    metrics.record("textDocument/hover", "handler_time", 2_000)
+    metrics.record("textDocument/hover", "response_bytes", 100)
+    metrics.increment("textDocument/hover", "errors")
+    metrics.record_stall()
+
+    lines = metrics.to_prometheus().splitlines()
+
+    assert "# TYPE pygls_handler_seconds summary" in lines
+    assert (
+        'pygls_handler_seconds{method="textDocument/hover",quantile="0.99"} 0.002'
+        in lines
+    )
+    assert 'pygls_handler_seconds_count{method="textDocument/hover"} 1' in lines
+    assert 'pygls_response_bytes_sum{method="textDocument/hover"} 100' in lines
+    assert 'pygls_errors_total{method="textDocument/hover"} 1' in lines
+    assert 'pygls_cancelled_total{method="textDocument/hover"} 0' in lines
+    assert "pygls_event_loop_stalls_total 1" in lines
+
+    # Histograms without any values should be omitted
+    assert not any(line.startswith("pygls_queue_seconds{") for line in lines)
+
+
+def test_http_server():
+    """Ensure that metrics can be served over http."""
+    metrics = Metrics()
+    metrics.record("initialize", "handler_time", 1)
+
+    server = metrics.start_http_server(0)
+    try:
+        host, port = server.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            body = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert body == metrics.to_prometheus()
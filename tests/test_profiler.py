@@ -0,0 +1,141 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import pathlib
+import pstats
+import sys
+import time
+
+import pytest
+
+from pygls.profiler import Profiler, collapse_stack
+
+
+def busy_loop(duration: float):
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        pass
+
+
+def test_collapse_stack():
+    """Ensure that stacks are collapsed outermost frame first."""
+    frame = sys._getframe()
+    frames = collapse_stack(frame).split(";")
+
+    lineno = frame.f_code.co_firstlineno
+    assert frames[-1] == f"{__name__}.test_collapse_stack:{lineno}"
+    assert len(frames) > 1
+    assert collapse_stack(None) == ""
+
+
+def test_sample(tmp_path):
+    """Ensure that the sampling profiler writes a collapsed stack file."""
+    profiler = Profiler(tmp_path)
+
+    profiler.start(interval=0.001)
+    assert profiler.is_running
+
+    busy_loop(0.1)
+    path = profiler.stop()
+
+    assert not profiler.is_running
+    assert path.parent == tmp_path
+    assert path.suffix == ".collapsed"
+
+    lines = path.read_text().splitlines()
+    assert len(lines) > 0
+
+    samples = 0
+    for line in lines:
+        stack, count = line.rsplit(" ", maxsplit=1)
+        samples += int(count)
+
+        if "busy_loop" in stack:
+            assert stack.split(";")[-2].startswith(f"{__name__}.test_sample")
+
+    assert samples > 0
+    assert any("busy_loop" in line for line in lines)
+
+
+def test_cprofile(tmp_path):
+    """Ensure that the cProfile mode writes a pstats dump."""
+    profiler = Profiler(tmp_path)
+
+    profiler.start(mode="cprofile")
+    busy_loop(0.01)
+    path = profiler.stop(tmp_path / "out.prof")
+
+    assert path == tmp_path / "out.prof"
+
+    stats = pstats.Stats(str(path))
+    functions = {name for (_, _, name) in stats.stats}  # type: ignore[attr-defined]
+    assert "busy_loop" in functions
+
+
+def test_invalid_usage(tmp_path):
+    """Ensure that the profiler rejects invalid requests."""
+    profiler = Profiler(tmp_path)
+
+    with pytest.raises(RuntimeError, match="No profiling session"):
+        profiler.stop()
+
+    with pytest.raises(ValueError, match="Unknown profiler mode"):
+        profiler.start(mode="perf")
+
+    profiler.start()
+    with pytest.raises(RuntimeError, match="already in progress"):
+        profiler.start()
+
+    profiler.stop()
+
+    with pytest.raises(ValueError, match="Unknown profiler action"):
+        profiler.execute_command("pause")
+
+
+def test_execute_command(tmp_path):
+    """Ensure that the profiler can be controlled using command arguments."""
+    profiler = Profiler(tmp_path)
+
+    assert profiler.execute_command() == {"running": False, "mode": None}
+    assert profiler.execute_command("start", {"mode": "cprofile"}) == {
+        "running": True,
+        "mode": "cprofile",
+    }
+    assert profiler.execute_command("status") == {"running": True, "mode": "cprofile"}
+
+    path = str((tmp_path / "out.prof").resolve())
+    assert profiler.execute_command("stop", {"path": "out.prof"}) == {
+        "running": False,
+        "path": path,
+    }
+
+
+@pytest.mark.parametrize("path", ["../out.prof", "/tmp/elsewhere/out.prof"])
+def test_execute_command_path_outside_directory(tmp_path, path):
+    """Ensure that clients cannot write profiles outside of the profile directory."""
+    directory = tmp_path / "profiles"
+    directory.mkdir()
+    profiler = Profiler(directory)
+
+    profiler.execute_command("start", {"mode": "cprofile"})
+    with pytest.raises(ValueError, match="outside"):
+        profiler.execute_command("stop", {"path": path})
+
+    # The session is still running, and can be stopped with a valid path.
+    assert profiler.is_running
+    result = profiler.execute_command("stop")
+    assert pathlib.Path(result["path"]).parent == directory
+    assert not (tmp_path / "out.prof").exists()
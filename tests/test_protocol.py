@@ -14,9 +14,12 @@
 # See the License for the specific language governing permissions and      #
 # limitations under the License.                                           #
 ############################################################################
+import asyncio
 import io
 import json
+import logging
 from typing import Optional
+from unittest.mock import Mock
 
 import attrs
 import pytest
@@ -29,19 +32,34 @@ from lsprotocol.types import (
     CompletionResponse,
     Position,
     ProgressParams,
+    ResponseError,
+    ResponseErrorMessage,
     ShutdownResponse,
     TextDocumentIdentifier,
     WorkDoneProgressBegin,
 )
 
-from pygls.exceptions import JsonRpcInvalidParams
+from pygls.exceptions import (
+    FeatureNotificationError,
+    JsonRpcInvalidParams,
+    JsonRpcMethodNotFound,
+)
+from pygls.feature_manager import assign_thread_attr
 from pygls.protocol import (
+    JsonFragment,
     JsonRPCNotification,
     JsonRPCProtocol,
     JsonRPCRequestMessage,
     JsonRPCResponseMessage,
     default_converter,
 )
+from pygls.protocol.json_rpc import (
+    HandlerKind,
+    MessageKind,
+    handler_kind,
+    message_kind,
+    wrap_handler,
+)
 
 EXAMPLE_NOTIFICATION = "example/notification"
 EXAMPLE_REQUEST = "example/request"
@@ -202,6 +220,26 @@ def test_deserialize_response_message_custom_converter():
     assert result.tluser == "1"
 
 
+def test_send_data_log(caplog):
+    """Ensure that messages are logged as text."""
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.set_writer(io.BytesIO())
+
+    with caplog.at_level(logging.INFO, logger="pygls.protocol.json_rpc"):
+        protocol._send_response(1, result="😋")
+
+    # Messages are only logged when debugging
+    assert caplog.records == []
+
+    with caplog.at_level(logging.DEBUG, logger="pygls.protocol.json_rpc"):
+        protocol._send_response(1, result="😋")
+
+    (message,) = [r.getMessage() for r in caplog.records]
+    prefix, body = message.split(": ", 1)
+    assert prefix == "Sending data"
+    assert json.loads(body) == {"jsonrpc": "2.0", "id": 1, "result": "😋"}
+
+
 @pytest.mark.parametrize(
     "method, params, expected",
     [
@@ -451,6 +489,93 @@ def test_serialize_response_message(msg_type, result, expected):
     assert actual == expected
 
 
+def test_serialize_pre_encoded_response_message():
+    """Ensure that pre-encoded results are sent as-is."""
+
+    buffer = io.BytesIO()
+
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.set_writer(buffer, include_headers=False)
+
+    result = protocol.encode_result([CompletionItem(label="example-one")])
+    assert isinstance(result, JsonFragment)
+    assert protocol.encode_result(result) is result
+
+    protocol._send_response("1", result=result)
+    actual = json.loads(buffer.getvalue())
+
+    assert actual == {
+        "jsonrpc": "2.0",
+        "id": "1",
+        "result": [{"label": "example-one"}],
+    }
+
+
+def test_serialize_message_content_length():
+    """Ensure that the ``Content-Length`` header counts bytes, not characters."""
+
+    buffer = io.BytesIO()
+
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.set_writer(buffer)
+
+    protocol._send_response(1, result=JsonFragment('"😋"'.encode("utf-8")))
+    header, body = buffer.getvalue().split(b"\r\n\r\n")
+
+    assert header.startswith(f"Content-Length: {len(body)}\r\n".encode())
+    assert json.loads(body) == {"jsonrpc": "2.0", "id": 1, "result": "😋"}
+
+
+@pytest.mark.parametrize("count", [0, 3, 4, 5, 9])
+def test_serialize_large_response_message(count: int):
+    """Ensure that large result lists are encoded in batches."""
+
+    buffer = io.BytesIO()
+
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.ENCODE_BATCH_SIZE = 4
+    protocol.set_writer(buffer)
+
+    result = [CompletionItem(label=f"item-{idx}") for idx in range(count)]
+    protocol._result_types["1"] = JsonRPCResponseMessage
+
+    protocol._send_response("1", result=result)
+    header, body = buffer.getvalue().split(b"\r\n\r\n")
+
+    assert header.startswith(f"Content-Length: {len(body)}\r\n".encode())
+    assert json.loads(body) == {
+        "jsonrpc": "2.0",
+        "id": "1",
+        "result": [{"label": f"item-{idx}"} for idx in range(count)],
+    }
+
+
+def test_send_data_without_writelines():
+    """Ensure that messages can be sent to writers that only implement ``write``."""
+
+    class Writer:
+        def __init__(self):
+            self.data = []
+
+        def write(self, data: bytes):
+            self.data.append(data)
+
+    writer = Writer()
+
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.ENCODE_BATCH_SIZE = 1
+    protocol.set_writer(writer, include_headers=False)
+
+    protocol._send_response(1, result=[1, 2, 3])
+
+    assert len(writer.data) == 1
+    assert json.loads(writer.data[0]) == {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "result": [1, 2, 3],
+    }
+
+
 @pytest.mark.parametrize(
     "method, params, expected",
     [
@@ -516,3 +641,293 @@ def test_serialize_request_message(method, params, expected):
     actual = json.loads(buffer.getvalue())
 
     assert actual == expected
+
+
+def test_request_message_ids():
+    """Ensure that requests are sent with unique, prefixed ids."""
+
+    buffer = io.BytesIO()
+
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.set_writer(buffer)
+
+    protocol.send_request("example/one")
+    protocol.send_request("example/two")
+
+    assert list(protocol._request_futures) == ["pygls:1", "pygls:2"]
+    assert b'"id": "pygls:1"' in buffer.getvalue()
+    assert b'"id": "pygls:2"' in buffer.getvalue()
+
+
+def test_notification_futures_are_not_tracked():
+    """Ensure that handling a notification does not leave a future behind."""
+
+    protocol = JsonRPCProtocol(None, default_converter())
+    calls = []
+
+    @protocol.fm.feature(EXAMPLE_NOTIFICATION)
+    def handler(params):
+        calls.append(params)
+
+    protocol._handle_notification(EXAMPLE_NOTIFICATION, "params")
+
+    assert calls == ["params"]
+    assert protocol._request_futures == {}
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        (
+            JsonRPCRequestMessage(id=1, method="example", jsonrpc="2.0", params=None),
+            MessageKind.Request,
+        ),
+        (
+            JsonRPCNotification(method="example", jsonrpc="2.0", params=None),
+            MessageKind.Notification,
+        ),
+        (
+            JsonRPCResponseMessage(id=1, jsonrpc="2.0", result=None),
+            MessageKind.Response,
+        ),
+        (
+            ResponseErrorMessage(id=1, error=ResponseError(code=-1, message="error")),
+            MessageKind.Error,
+        ),
+    ],
+)
+def test_message_kind(message, expected: MessageKind):
+    """Ensure that messages are classified correctly."""
+    assert message_kind(message) is expected
+
+    # Classifications are cached, the second lookup should give the same answer.
+    assert message_kind(message) is expected
+
+
+def test_dispatch_table():
+    """Ensure that the dispatch table reflects changes to the registered features."""
+
+    protocol = JsonRPCProtocol(None, default_converter())
+
+    with pytest.raises(JsonRpcMethodNotFound):
+        protocol._lookup_handler(EXAMPLE_REQUEST)
+
+    @protocol.fm.feature(EXAMPLE_REQUEST)
+    def handler(params): ...
+
+    assert protocol._lookup_handler(EXAMPLE_REQUEST) == (handler, HandlerKind.Sync)
+
+    protocol.fm.thread()(handler)
+    assert protocol._lookup_handler(EXAMPLE_REQUEST) == (handler, HandlerKind.Thread)
+
+
+def test_message_context_is_reset():
+    """Ensure that the context set while handling one message is not seen by the
+    handlers of later messages."""
+
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.set_writer(io.BytesIO())
+    seen = []
+
+    @protocol.fm.feature(EXAMPLE_REQUEST)
+    def request(params):
+        seen.append(protocol.msg_id)
+
+    @protocol.fm.feature(EXAMPLE_NOTIFICATION)
+    def notification(params):
+        seen.append(protocol.msg_id)
+
+    protocol.handle_message(
+        JsonRPCRequestMessage(id=1, method=EXAMPLE_REQUEST, jsonrpc="2.0", params=None)
+    )
+    protocol.handle_message(
+        JsonRPCNotification(method=EXAMPLE_NOTIFICATION, jsonrpc="2.0", params=None)
+    )
+
+    assert seen == [1, None]
+    assert protocol.msg_id is None
+
+
+def _sync_handler(params):
+    if params == "error":
+        raise ValueError(params)
+    return params
+
+
+def _generator_handler(params):
+    result = yield _sync_handler, (params,), None
+    return result
+
+
+async def _coroutine_handler(params):
+    return _sync_handler(params)
+
+
+async def _async_generator_handler(params):
+    yield _sync_handler(params)
+
+
+async def _run_handler(handler, kind, params):
+    """Run the given handler to completion, the way the protocol would."""
+    if kind is HandlerKind.Coroutine:
+        return await handler(params)
+
+    if kind is HandlerKind.AsyncGenerator:
+        return [chunk async for chunk in handler(params)]
+
+    if kind is HandlerKind.Generator:
+        gen = handler(params)
+        sub_handler, args, kwargs = next(gen)
+        try:
+            try:
+                value = sub_handler(*args)
+            except Exception as exc:
+                gen.throw(exc)
+            else:
+                gen.send(value)
+        except StopIteration as result:
+            return result.value
+
+    return handler(params)
+
+
+@pytest.mark.parametrize(
+    "handler, expected",
+    [
+        (_sync_handler, "params"),
+        (_generator_handler, "params"),
+        (_coroutine_handler, "params"),
+        (_async_generator_handler, ["params"]),
+    ],
+)
+async def test_wrap_handler(handler, expected):
+    """Ensure that wrapped handlers call the given hooks, without changing how they
+    are executed."""
+    kind = handler_kind(handler)
+    calls = []
+
+    def enter():
+        calls.append("enter")
+        return len(calls)
+
+    def exit(state, error):
+        calls.append(("exit", state, type(error)))
+
+    wrapped = wrap_handler(handler, kind, enter, exit)
+    assert handler_kind(wrapped) is kind
+    assert wrapped.__name__ == handler.__name__
+
+    assert await _run_handler(wrapped, kind, "params") == expected
+    assert calls == ["enter", ("exit", 1, type(None))]
+
+    calls.clear()
+    with pytest.raises(ValueError):
+        await _run_handler(wrapped, kind, "error")
+
+    assert calls == ["enter", ("exit", 1, ValueError)]
+
+
+async def test_wrap_handler_each_step():
+    """Ensure that the hooks can be called around each step of a handler's
+    execution."""
+    active = []
+    steps = []
+
+    def enter():
+        active.append(True)
+
+    def exit(state, error):
+        active.pop()
+
+    async def handler(params):
+        for _ in range(2):
+            steps.append(list(active))
+            await asyncio.sleep(0)
+            assert active == [True]
+
+        return params
+
+    wrapped = wrap_handler(handler, HandlerKind.Coroutine, enter, exit, each_step=True)
+    task = asyncio.ensure_future(wrapped("params"))
+
+    # The hooks are not active while the handler is suspended
+    await asyncio.sleep(0)
+    assert steps == [[True]] and active == []
+
+    assert await task == "params"
+    assert active == []
+
+    # Sub-handlers yielded by generators are wrapped too.
+    wrapped = wrap_handler(
+        _generator_handler, HandlerKind.Generator, enter, exit, each_step=True
+    )
+    sub_handler, args, _ = next(wrapped("params"))
+    assert handler_kind(sub_handler) is HandlerKind.Sync
+    assert sub_handler is not _sync_handler
+    assert sub_handler(*args) == "params"
+
+
+def test_wrap_handler_threads():
+    """Ensure that thread handlers can be left unwrapped."""
+
+    def thread_handler(params):
+        return params
+
+    assign_thread_attr(thread_handler)
+
+    def generator_handler(params):
+        return (yield thread_handler, (params,), None)
+
+    def hook(*args):
+        raise AssertionError("hooks should not be called")
+
+    assert (
+        wrap_handler(thread_handler, HandlerKind.Thread, hook, hook, wrap_threads=False)
+        is thread_handler
+    )
+
+    wrapped = wrap_handler(
+        generator_handler, HandlerKind.Generator, list, lambda *_: None, True, False
+    )
+    sub_handler, _, _ = next(wrapped("params"))
+    assert sub_handler is thread_handler
+
+
+def test_notification_generator_fast_path():
+    """Ensure that generator handlers yielding to synchronous handlers are run to
+    completion immediately."""
+
+    protocol = JsonRPCProtocol(None, default_converter())
+    calls = []
+
+    def sub_handler(params):
+        calls.append(params)
+        return 1
+
+    @protocol.fm.feature(EXAMPLE_NOTIFICATION)
+    def handler(params):
+        result = yield sub_handler, (params,), None
+        calls.append(result)
+
+    protocol._handle_notification(EXAMPLE_NOTIFICATION, "params")
+    assert calls == ["params", 1]
+
+
+def test_notification_generator_fast_path_error():
+    """Ensure that errors raised in the notification fast path are reported."""
+
+    server = Mock()
+    protocol = JsonRPCProtocol(server, default_converter())
+
+    def sub_handler(params):
+        raise ValueError("bad params")
+
+    @protocol.fm.feature(EXAMPLE_NOTIFICATION)
+    def handler(params):
+        yield sub_handler, (params,), None
+
+    protocol._handle_notification(EXAMPLE_NOTIFICATION, "params")
+
+    error, source = server._report_server_error.call_args.args
+    assert "bad params" in str(error)
+    assert source is FeatureNotificationError
@@ -0,0 +1,171 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import asyncio
+import io
+import pathlib
+import sys
+
+import pytest
+
+from pygls import IS_PYODIDE
+from pygls.client import JsonRPCClient
+from pygls.io_ import StdoutWriter
+from pygls.recording import (
+    RecordedMessage,
+    SessionRecorder,
+    load_recording,
+    replay_session,
+)
+
+SERVER = pathlib.Path(__file__).parent / "servers" / "recorded.py"
+
+
+def test_recorder(tmp_path):
+    """Ensure that the recorder captures message bodies without their headers."""
+    recorder = SessionRecorder(tmp_path / "session.jsonl")
+
+    stdout = io.BytesIO()
+    writer = recorder.wrap_writer(StdoutWriter(stdout))
+    reader = recorder.wrap_reader(io.BytesIO(b'{"jsonrpc":"2.0","method":"a"}'))
+
+    reader.read(30)
+    writer.write(b'Content-Length: 14\r\n\r\n{"message": 1}')
+    writer.writelines([b"Content-Length: 14\r\n\r\n", b'{"message": ', b"2}"])
+    recorder.close()
+
+    # Messages should still be written to the underlying stream
+    assert stdout.getvalue().count(b"Content-Length: 14\r\n\r\n") == 2
+
+    messages = load_recording(tmp_path / "session.jsonl")
+    assert [(m.direction, m.message) for m in messages] == [
+        ("recv", {"jsonrpc": "2.0", "method": "a"}),
+        ("send", {"message": 1}),
+        ("send", {"message": 2}),
+    ]
+    assert messages[0].time <= messages[1].time <= messages[2].time
+
+
+def test_recorder_multiline_body(tmp_path):
+    """Ensure that messages spanning multiple lines are recorded on a single line."""
+    recorder = SessionRecorder(tmp_path / "session.jsonl")
+    recorder.record("recv", b'{\r\n  "method": "a\\nb",\n  "params": [\n1,\n2]\n}\n')
+    recorder.record("send", b'{"message": 1}')
+    recorder.close()
+
+    assert len((tmp_path / "session.jsonl").read_bytes().splitlines()) == 2
+
+    messages = load_recording(tmp_path / "session.jsonl")
+    assert [(m.direction, m.message) for m in messages] == [
+        ("recv", {"method": "a\nb", "params": [1, 2]}),
+        ("send", {"message": 1}),
+    ]
+
+
+async def record_session(path: pathlib.Path):
+    client = JsonRPCClient()
+
+    @client.feature("client/value")
+    def client_value(params):
+        return dict(value=42)
+
+    await client.start_io(sys.executable, str(SERVER), str(path))
+
+    for n in range(3):
+        await client.protocol.send_request_async("echo", dict(n=n))
+
+    result = await client.protocol.send_request_async("ask", {})
+    assert result.value == 42
+
+    client.protocol.notify("exit", {})
+    await asyncio.wait_for(client.stop(), timeout=5.0)
+
+
+async def replay(recording, speed=None):
+    client = JsonRPCClient()
+    await client.start_io(sys.executable, str(SERVER))
+
+    report = await replay_session(client, recording, speed=speed)
+    await asyncio.wait_for(client.stop(), timeout=5.0)
+
+    return report
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(IS_PYODIDE, reason="Subprocesses are not available on pyodide.")
+async def test_record_and_replay(tmp_path):
+    """Ensure that a recorded session can be replayed against a server."""
+    path = tmp_path / "session.jsonl"
+    await record_session(path)
+
+    messages = load_recording(path)
+    received = [m.message.get("method") for m in messages if m.direction == "recv"]
+    assert received == ["echo", "echo", "echo", "ask", None, "exit"]
+
+    sent = [m.message for m in messages if m.direction == "send"]
+    assert sent[0]["result"] == {"n": 0}
+    assert sent[3]["method"] == "client/value"
+
+    report = await replay(path)
+
+    assert report.messages == 5
+    assert report.diffs == []
+    assert report.latencies["echo"].count == 3
+    assert report.latencies["ask"].count == 1
+    assert report.throughput > 0
+    assert "echo" in report.summary()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(IS_PYODIDE, reason="Subprocesses are not available on pyodide.")
+async def test_replay_diffs(tmp_path):
+    """Ensure that responses differing from the recording are reported."""
+    path = tmp_path / "session.jsonl"
+    await record_session(path)
+
+    messages = load_recording(path)
+    for message in messages:
+        if message.message.get("result") == {"n": 1}:
+            message.message["result"] = {"n": 100}
+
+    report = await replay(messages)
+
+    assert len(report.diffs) == 1
+    assert report.diffs[0].method == "echo"
+    assert report.diffs[0].expected == {"result": {"n": 100}}
+    assert report.diffs[0].actual == {"result": {"n": 1}}
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(IS_PYODIDE, reason="Subprocesses are not available on pyodide.")
+async def test_replay_speed():
+    """Ensure that sessions can be replayed at their original speed."""
+
+    def request(time: float, msg_id: int):
+        message = dict(jsonrpc="2.0", id=msg_id, method="echo", params=dict(n=msg_id))
+        return RecordedMessage(time, "recv", message)
+
+    recording = [
+        request(10.0, 1),
+        request(10.2, 2),
+        request(10.4, 3),
+        RecordedMessage(10.4, "recv", dict(jsonrpc="2.0", method="exit")),
+    ]
+
+    report = await replay(recording, speed=2.0)
+
+    assert report.messages == 4
+    assert report.duration >= 0.2
@@ -0,0 +1,60 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import pytest
+
+from pygls.result_cache import ResultCache
+
+
+def test_get_missing_result():
+    """Ensure that a ``KeyError`` is raised for unknown results."""
+    cache = ResultCache()
+
+    with pytest.raises(KeyError):
+        cache[("file:///a.txt", 1, "method", "{}")]
+
+
+def test_least_recently_used_results_are_evicted():
+    """Ensure that the cache does not grow beyond its maximum size."""
+    cache = ResultCache(max_size=2)
+
+    cache[("file:///a.txt", 1, "method", "{}")] = 1
+    cache[("file:///b.txt", 1, "method", "{}")] = 2
+
+    # Access the first result, so that the second one is evicted instead.
+    assert cache[("file:///a.txt", 1, "method", "{}")] == 1
+    cache[("file:///c.txt", 1, "method", "{}")] = 3
+
+    assert len(cache) == 2
+    assert cache[("file:///a.txt", 1, "method", "{}")] == 1
+    assert cache[("file:///c.txt", 1, "method", "{}")] == 3
+
+    with pytest.raises(KeyError):
+        cache[("file:///b.txt", 1, "method", "{}")]
+
+
+def test_invalidate():
+    """Ensure that all results for a document can be removed."""
+    cache = ResultCache()
+
+    cache[("file:///a.txt", 1, "method/one", "{}")] = 1
+    cache[("file:///a.txt", 1, "method/two", "{}")] = 2
+    cache[("file:///b.txt", 1, "method/one", "{}")] = 3
+
+    cache.invalidate("file:///a.txt")
+
+    assert len(cache) == 1
+    assert cache[("file:///b.txt", 1, "method/one", "{}")] == 3
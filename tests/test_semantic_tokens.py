@@ -0,0 +1,270 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+from array import array
+
+import pytest
+from lsprotocol import types
+
+from pygls.semantic_tokens import (
+    SemanticTokensBuilder,
+    SemanticTokensCache,
+    compute_edits,
+)
+from pygls.workspace import PositionCodec, TextDocument
+
+LEGEND = types.SemanticTokensLegend(
+    token_types=["keyword", "variable", "function"],
+    token_modifiers=["readonly", "definition"],
+)
+
+
+def apply_edits(data, edits):
+    """Apply the given edits to the token data, as a client would."""
+    result = list(data)
+    for edit in sorted(edits, key=lambda e: e.start, reverse=True):
+        result[edit.start : edit.start + edit.delete_count] = edit.data or []
+
+    return result
+
+
+@pytest.mark.parametrize(
+    "old, new, expected",
+    [
+        ([], [], []),
+        ([0, 0, 2, 0, 0], [0, 0, 2, 0, 0], []),
+        (
+            [],
+            [0, 0, 2, 0, 0],
+            [types.SemanticTokensEdit(start=0, delete_count=0, data=[0, 0, 2, 0, 0])],
+        ),
+        (
+            [0, 0, 2, 0, 0],
+            [],
+            [types.SemanticTokensEdit(start=0, delete_count=5, data=None)],
+        ),
+        (
+            # Change in the middle
+            [0, 0, 2, 0, 0, 0, 3, 4, 2, 8, 1, 0, 2, 0, 0],
+            [0, 0, 2, 0, 0, 0, 3, 5, 2, 8, 1, 0, 2, 0, 0],
+            [types.SemanticTokensEdit(start=7, delete_count=1, data=[5])],
+        ),
+        (
+            # Token inserted at the end
+            [0, 0, 2, 0, 0],
+            [0, 0, 2, 0, 0, 1, 0, 4, 1, 0],
+            [types.SemanticTokensEdit(start=5, delete_count=0, data=[1, 0, 4, 1, 0])],
+        ),
+        (
+            # Token removed from the start
+            [0, 0, 2, 0, 0, 1, 0, 4, 1, 0],
+            [1, 0, 4, 1, 0],
+            [types.SemanticTokensEdit(start=0, delete_count=5, data=None)],
+        ),
+    ],
+)
+def test_compute_edits(old, new, expected):
+    """Ensure that we compute the expected edits between two token arrays."""
+    assert compute_edits(array("I", old), array("I", new)) == expected
+    assert apply_edits(old, expected) == new
+
+
+def test_compute_edits_repeated_data():
+    """Ensure that we produce valid edits when prefix and suffix could overlap."""
+    old = array("I", [1, 1, 1, 1])
+    new = array("I", [1, 1, 1, 1, 1, 1])
+
+    edits = compute_edits(old, new)
+    assert apply_edits(old, edits) == list(new)
+    assert edits[0].delete_count == 0
+    assert edits[0].data == [1, 1]
+
+
+def test_cache_full_assigns_result_id():
+    """Ensure that a result id is assigned to tokens that do not have one."""
+    cache = SemanticTokensCache()
+
+    tokens = cache.full("file:///a.txt", types.SemanticTokens(data=[0, 0, 2, 0, 0]))
+    assert tokens.result_id is not None
+    assert list(cache.get("file:///a.txt", tokens.result_id)) == [0, 0, 2, 0, 0]
+
+    tokens = cache.full(
+        "file:///b.txt", types.SemanticTokens(data=[0, 0, 2, 0, 0], result_id="abc")
+    )
+    assert tokens.result_id == "abc"
+    assert cache.get("file:///b.txt", "abc") is not None
+
+
+def test_cache_delta():
+    """Ensure that full tokens are converted into a delta when possible."""
+    cache = SemanticTokensCache()
+    uri = "file:///a.txt"
+
+    first = cache.full(uri, types.SemanticTokens(data=[0, 0, 2, 0, 0]))
+    result = cache.delta(
+        uri, first.result_id, types.SemanticTokens(data=[0, 0, 3, 0, 0])
+    )
+
+    assert isinstance(result, types.SemanticTokensDelta)
+    assert result.result_id != first.result_id
+    assert result.edits == [types.SemanticTokensEdit(start=2, delete_count=1, data=[3])]
+
+    # The new tokens should now be the baseline for the next delta
+    assert cache.get(uri, first.result_id) is None
+    assert list(cache.get(uri, result.result_id)) == [0, 0, 3, 0, 0]
+
+
+def test_cache_delta_unknown_result_id():
+    """Ensure that the full tokens are returned if the previous result is unknown."""
+    cache = SemanticTokensCache()
+    uri = "file:///a.txt"
+
+    cache.full(uri, types.SemanticTokens(data=[0, 0, 2, 0, 0]))
+    tokens = types.SemanticTokens(data=[0, 0, 3, 0, 0])
+
+    result = cache.delta(uri, "unknown", tokens)
+    assert result is tokens
+    assert list(cache.get(uri, tokens.result_id)) == [0, 0, 3, 0, 0]
+
+
+def test_cache_delta_passthrough():
+    """Ensure that deltas computed by the server are passed through as-is."""
+    cache = SemanticTokensCache()
+    uri = "file:///a.txt"
+
+    first = cache.full(uri, types.SemanticTokens(data=[0, 0, 2, 0, 0]))
+    delta = types.SemanticTokensDelta(edits=[], result_id="2")
+
+    assert cache.delta(uri, first.result_id, delta) is delta
+    assert cache.get(uri, first.result_id) is None
+
+
+def test_builder_encodes_relative_positions():
+    """Ensure that tokens are encoded relative to the previous token."""
+    builder = SemanticTokensBuilder(LEGEND)
+    builder.push(0, 0, 2, "keyword")
+    builder.push(0, 3, 4, "function", ["definition"])
+    builder.push(2, 4, 1, 1, 0b01)
+
+    document = TextDocument("file:///a.txt", "fn area\n\n    x\n")
+    tokens = builder.build(document, result_id="1")
+
+    assert len(builder) == 3
+    assert tokens.result_id == "1"
+    assert list(tokens.data) == [
+        # fmt: off
+        0, 0, 2, 0, 0,
+        0, 3, 4, 2, 2,
+        2, 4, 1, 1, 1,
+        # fmt: on
+    ]
+
+
+def test_builder_sorts_tokens():
+    """Ensure that tokens pushed out of order are sorted by position."""
+    builder = SemanticTokensBuilder(LEGEND)
+    builder.push(1, 0, 1, "variable")
+    builder.push(0, 3, 4, "function")
+    builder.push(0, 0, 2, "keyword")
+
+    document = TextDocument("file:///a.txt", "fn area\nx\n")
+    assert list(builder.build(document).data) == [
+        # fmt: off
+        0, 0, 2, 0, 0,
+        0, 3, 4, 2, 0,
+        1, 0, 1, 1, 0,
+        # fmt: on
+    ]
+
+
+@pytest.mark.parametrize(
+    "encoding, expected",
+    [
+        (
+            types.PositionEncodingKind.Utf8,
+            # fmt: off
+            [0, 4, 6, 1, 0, 0, 9, 1, 1, 0],
+            # fmt: on
+        ),
+        (
+            types.PositionEncodingKind.Utf16,
+            # fmt: off
+            [0, 4, 4, 1, 0, 0, 7, 1, 1, 0],
+            # fmt: on
+        ),
+        (
+            types.PositionEncodingKind.Utf32,
+            # fmt: off
+            [0, 4, 3, 1, 0, 0, 6, 1, 1, 0],
+            # fmt: on
+        ),
+    ],
+)
+def test_builder_converts_to_client_units(encoding, expected):
+    """Ensure that token positions are converted into the client's encoding."""
+    builder = SemanticTokensBuilder(LEGEND)
+    builder.push(0, 4, 3, "variable")
+    builder.push(0, 10, 1, "variable")
+
+    document = TextDocument(
+        "file:///a.txt",
+        'x = "😋" + y\n',
+        position_codec=PositionCodec(encoding=encoding),
+    )
+    assert list(builder.build(document).data) == expected
+
+
+@pytest.mark.parametrize(
+    "encoding",
+    [
+        types.PositionEncodingKind.Utf8,
+        types.PositionEncodingKind.Utf16,
+        types.PositionEncodingKind.Utf32,
+    ],
+)
+def test_builder_converts_many_tokens_per_line(encoding):
+    """Ensure that positions are converted correctly when there are many tokens on
+    lines containing non-ASCII text."""
+    lines = ["é😋 = ü + 😋😋 + a + ß\n", "plain = 1\n", "😋 = ß\n"]
+    tokens = [
+        (line, idx, 1)
+        for line, text in enumerate(lines)
+        for idx, char in enumerate(text)
+        if not char.isspace()
+    ]
+
+    builder = SemanticTokensBuilder(LEGEND)
+    for line, character, length in tokens:
+        builder.push(line, character, length, "variable")
+
+    codec = PositionCodec(encoding=encoding)
+    document = TextDocument("file:///a.txt", "".join(lines), position_codec=codec)
+
+    expected = []
+    prev_line, prev_character = 0, 0
+    for line, character, length in tokens:
+        text = lines[line]
+        units = codec.client_num_units(text[:character])
+        expected += [
+            line - prev_line,
+            units - prev_character if line == prev_line else units,
+            codec.client_num_units(text[character : character + length]),
+            1,
+            0,
+        ]
+        prev_line, prev_character = line, units
+
+    assert list(builder.build(document).data) == expected
@@ -85,3 +85,36 @@ def test_win_from_fs_path(path, uri):
 )
 def test_win_to_fs_path(uri, path):
     assert uris.to_fs_path(uri) == path
+
+
+@unix_only
+@pytest.mark.parametrize(
+    "uri, key, scheme, path, fs_path",
+    [
+        (
+            "file:///foo/space%20%3Fbar",
+            "file:///foo/space ?bar",
+            "file",
+            "/foo/space ?bar",
+            "/foo/space ?bar",
+        ),
+        (
+            "untitled:Untitled-1",
+            "untitled:Untitled-1",
+            "untitled",
+            "Untitled-1",
+            None,
+        ),
+    ],
+)
+def test_normalize_uri(uri, key, scheme, path, fs_path):
+    assert uris.normalize_uri(uri) == (key, scheme, path, fs_path)
+
+
+def test_normalize_uri_interned():
+    """Ensure that differently encoded forms of a URI share the same key."""
+    encoded = uris.normalize_uri("file:///C%3A/path/to/file.py")
+    decoded = uris.normalize_uri("".join(["file:///C:/path/", "to/file.py"]))
+
+    assert encoded.key is decoded.key
+    assert uris.normalize_uri("file:///C%3A/path/to/file.py") is encoded
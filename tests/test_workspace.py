@@ -17,6 +17,7 @@
 # limitations under the License.                                           #
 ############################################################################
 import os
+import random
 
 import pytest
 from lsprotocol import types
@@ -123,6 +124,106 @@ def test_get_missing_document(tmpdir, workspace):
     assert workspace.get_text_document(doc_uri).source == DOC_TEXT
 
 
+def test_get_missing_document_cached(tmpdir, workspace):
+    """Ensure that documents read from disk are cached until the file changes."""
+    doc_path = tmpdir.join("test_document.py")
+    doc_path.write(DOC_TEXT)
+    doc_uri = uris.from_fs_path(str(doc_path))
+
+    document = workspace.get_text_document(doc_uri)
+    assert document.source == DOC_TEXT
+    assert workspace.get_text_document(doc_uri) is document
+
+    # Same size, but a different modification time
+    doc_path.write("TEST")
+    stat = os.stat(str(doc_path))
+    os.utime(str(doc_path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert document.source == "TEST"
+
+    # Same modification time, but a different size
+    doc_path.write("test, again")
+    os.utime(str(doc_path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert document.source == "test, again"
+
+
+def test_get_missing_document_unchanged(tmpdir, workspace):
+    """Ensure that files are not read again if their stat result is unchanged."""
+    doc_path = tmpdir.join("test_document.py")
+    doc_path.write(DOC_TEXT)
+    doc_uri = uris.from_fs_path(str(doc_path))
+
+    document = workspace.get_text_document(doc_uri)
+    assert document.source == DOC_TEXT
+
+    # Rewrite the file, but keep the same size and modification time
+    stat = os.stat(str(doc_path))
+    doc_path.write("TEST")
+    os.utime(str(doc_path), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert document.source == DOC_TEXT
+
+    # Until the document is invalidated
+    workspace.invalidate_text_document(doc_uri)
+
+    document = workspace.get_text_document(doc_uri)
+    assert document.source == "TEST"
+
+
+def test_get_missing_document_cache_size(tmpdir, workspace):
+    """Ensure that the number of cached documents is bounded."""
+    workspace.DISK_CACHE_SIZE = 2
+    uris_ = []
+
+    for idx in range(3):
+        doc_path = tmpdir.join(f"test_document_{idx}.py")
+        doc_path.write(DOC_TEXT)
+        uris_.append(uris.from_fs_path(str(doc_path)))
+
+    first = workspace.get_text_document(uris_[0])
+    second = workspace.get_text_document(uris_[1])
+
+    # Accessing the first document makes the second the least recently used
+    assert workspace.get_text_document(uris_[0]) is first
+    workspace.get_text_document(uris_[2])
+
+    assert workspace.get_text_document(uris_[0]) is first
+    assert workspace.get_text_document(uris_[1]) is not second
+
+
+def test_get_missing_document_open(tmpdir, workspace):
+    """Ensure that opened documents take precedence over the cached file."""
+    doc_path = tmpdir.join("test_document.py")
+    doc_path.write(DOC_TEXT)
+    doc_uri = uris.from_fs_path(str(doc_path))
+
+    assert workspace.get_text_document(doc_uri).source == DOC_TEXT
+
+    workspace.put_text_document(
+        types.TextDocumentItem(
+            uri=doc_uri, language_id="python", version=1, text="opened"
+        )
+    )
+    assert workspace.get_text_document(doc_uri).source == "opened"
+
+    workspace.remove_text_document(doc_uri)
+    assert workspace.get_text_document(doc_uri).source == DOC_TEXT
+
+
+async def test_get_text_document_async(tmpdir, workspace):
+    """Ensure that documents can be read from disk without blocking the event
+    loop."""
+    doc_path = tmpdir.join("test_document.py")
+    doc_path.write(DOC_TEXT)
+    doc_uri = uris.from_fs_path(str(doc_path))
+
+    document = await workspace.get_text_document_async(doc_uri)
+    assert document._disk_source is not None
+    assert document.source == DOC_TEXT
+
+    workspace.put_text_document(DOC)
+    document = await workspace.get_text_document_async(DOC_URI)
+    assert document.source == DOC_TEXT
+
+
 def test_put_notebook_document(workspace):
     """Ensure that we can add notebook documents to the workspace correctly."""
     params = types.DidOpenNotebookDocumentParams(
@@ -144,6 +245,30 @@ def test_put_text_document(workspace):
     assert DOC_URI in workspace._text_documents
 
 
+def test_update_text_document(workspace):
+    workspace.put_text_document(DOC)
+
+    [edit] = workspace.update_text_document(
+        types.VersionedTextDocumentIdentifier(uri=DOC_URI, version=1),
+        types.TextDocumentContentChangePartial(
+            range=types.Range(
+                start=types.Position(line=0, character=0),
+                end=types.Position(line=0, character=4),
+            ),
+            text="tést",
+        ),
+    )
+
+    document = workspace.get_text_document(DOC_URI)
+    assert document.source == "tést"
+    assert document.version == 1
+    assert document.edits == (edit,)
+
+    assert (edit.start_offset, edit.old_end_offset, edit.new_end_offset) == (0, 4, 4)
+    assert (edit.start_byte, edit.old_end_byte, edit.new_end_byte) == (0, 4, 5)
+    assert edit.new_end_point == (0, 5)
+
+
 def test_remove_folder(workspace):
     dir_uri = os.path.dirname(DOC_URI)
     dir_name = "test"
@@ -425,6 +550,322 @@ def test_update_notebook_new_cells(workspace):
     assert cell_uris == [NB_CELL_1.uri, NB_CELL_3.uri, NB_CELL_2.uri]
 
 
+def test_notebook_is_not_shared(workspace):
+    """Ensure that the workspace's copy of a notebook is independent of the params
+    it was opened with."""
+    params = types.DidOpenNotebookDocumentParams(
+        notebook_document=NOTEBOOK,
+        cell_text_documents=[NB_CELL_1, NB_CELL_2],
+    )
+    workspace.put_notebook_document(params)
+
+    notebook = workspace.get_notebook_document(notebook_uri=NOTEBOOK.uri)
+    assert notebook is not NOTEBOOK
+    assert notebook.cells is not NOTEBOOK.cells
+    assert all(a is not b for a, b in zip(notebook.cells, NOTEBOOK.cells))
+
+
+@pytest.mark.parametrize(
+    "start, delete_count, cells, expected",
+    [
+        (1, 0, [NB_CELL_3], [NB_CELL_1, NB_CELL_3, NB_CELL_2]),
+        (0, 1, [], [NB_CELL_2]),
+        (0, 1, [NB_CELL_3], [NB_CELL_3, NB_CELL_2]),
+        (0, 2, [NB_CELL_2, NB_CELL_1], [NB_CELL_2, NB_CELL_1]),
+        (2, 0, [NB_CELL_3], [NB_CELL_1, NB_CELL_2, NB_CELL_3]),
+    ],
+)
+def test_update_notebook_cell_index(workspace, start, delete_count, cells, expected):
+    """Ensure that cells can be found after changes to the notebook's structure."""
+    params = types.DidOpenNotebookDocumentParams(
+        notebook_document=NOTEBOOK,
+        cell_text_documents=[NB_CELL_1, NB_CELL_2],
+    )
+    workspace.put_notebook_document(params)
+
+    params = types.DidChangeNotebookDocumentParams(
+        notebook_document=types.VersionedNotebookDocumentIdentifier(
+            uri=NOTEBOOK.uri, version=1
+        ),
+        change=types.NotebookDocumentChangeEvent(
+            cells=types.NotebookDocumentCellChanges(
+                structure=types.NotebookDocumentCellChangeStructure(
+                    array=types.NotebookCellArrayChange(
+                        start=start,
+                        delete_count=delete_count,
+                        cells=[
+                            types.NotebookCell(
+                                kind=types.NotebookCellKind.Code, document=cell.uri
+                            )
+                            for cell in cells
+                        ],
+                    ),
+                    did_open=[c for c in cells if c is NB_CELL_3],
+                )
+            )
+        ),
+    )
+    workspace.update_notebook_document(params)
+
+    notebook = workspace.get_notebook_document(notebook_uri=NOTEBOOK.uri)
+    assert [c.document for c in notebook.cells] == [c.uri for c in expected]
+
+    for idx, cell in enumerate(expected):
+        assert workspace.get_notebook_cell_index(cell.uri) == idx
+        assert workspace.get_notebook_cell(cell.uri) is notebook.cells[idx]
+
+    for cell in {NB_CELL_1.uri, NB_CELL_2.uri} - {c.uri for c in expected}:
+        assert workspace.get_notebook_cell_index(cell) is None
+
+
+def test_get_notebook_cell_unknown(workspace):
+    assert workspace.get_notebook_cell(NB_CELL_1.uri) is None
+    assert workspace.get_notebook_cell_index(NB_CELL_1.uri) is None
+
+
+def test_concatenated_notebook_document(workspace):
+    """Ensure that positions can be mapped between a notebook's cells and its
+    concatenated document."""
+    params = types.DidOpenNotebookDocumentParams(
+        notebook_document=NOTEBOOK,
+        cell_text_documents=[NB_CELL_1, NB_CELL_2],
+    )
+    workspace.put_notebook_document(params)
+
+    document = workspace.get_concatenated_notebook_document(cell_uri=NB_CELL_2.uri)
+    assert document is workspace.get_concatenated_notebook_document(
+        notebook_uri=NOTEBOOK.uri
+    )
+    assert document.source == "# cell 1\n# cell 2\n"
+
+    position = types.Position(line=1, character=3)
+    assert document.position_to_cell(position) == (
+        NB_CELL_2.uri,
+        types.Position(line=0, character=3),
+    )
+    assert (
+        document.position_from_cell(NB_CELL_2.uri, types.Position(line=0, character=3))
+        == position
+    )
+    assert document.offset_at_position(position) == 12
+    assert document.position_to_cell(types.Position(line=2, character=0)) is None
+    assert document.position_from_cell(NB_CELL_3.uri, position) is None
+
+    cell_range = types.Range(
+        start=types.Position(line=0, character=2),
+        end=types.Position(line=0, character=6),
+    )
+    virtual_range = document.range_from_cell(NB_CELL_2.uri, cell_range)
+    assert virtual_range == types.Range(
+        start=types.Position(line=1, character=2),
+        end=types.Position(line=1, character=6),
+    )
+    assert document.range_to_cell(virtual_range) == (NB_CELL_2.uri, cell_range)
+
+    spanning = types.Range(
+        start=types.Position(line=0, character=2),
+        end=types.Position(line=1, character=6),
+    )
+    assert document.range_to_cell(spanning) is None
+
+
+def test_concatenated_notebook_document_changes(workspace):
+    """Ensure that the concatenated document is updated as the notebook changes."""
+    rng = random.Random(42)
+    cells = [
+        types.TextDocumentItem(
+            uri=f"nb-cell-scheme://path/to/notebook.ipynb#cell{n}",
+            language_id="python",
+            version=0,
+            text="".join(rng.choice(["a", "b\n", "\n"]) for _ in range(n % 4)),
+        )
+        for n in range(6)
+    ]
+    params = types.DidOpenNotebookDocumentParams(
+        notebook_document=types.NotebookDocument(
+            uri=NOTEBOOK.uri,
+            notebook_type="jupyter-notebook",
+            version=0,
+            cells=[
+                types.NotebookCell(kind=types.NotebookCellKind.Code, document=c.uri)
+                for c in cells
+            ],
+        ),
+        cell_text_documents=cells,
+    )
+    workspace.put_notebook_document(params)
+    document = workspace.get_concatenated_notebook_document(notebook_uri=NOTEBOOK.uri)
+    next_cell = len(cells)
+
+    for version in range(1, 200):
+        notebook = workspace.get_notebook_document(notebook_uri=NOTEBOOK.uri)
+        uris = [c.document for c in notebook.cells]
+        cell_changes = types.NotebookDocumentCellChanges()
+
+        if rng.random() < 0.3:
+            start = rng.randint(0, len(uris))
+            delete_count = rng.randint(0, min(2, len(uris) - start))
+            removed = uris[start : start + delete_count]
+            new_uris = []
+            opened = []
+            for _ in range(rng.randint(0, 2)):
+                if removed and rng.random() < 0.5:
+                    # Move a cell
+                    new_uris.append(removed.pop())
+                else:
+                    uri = f"nb-cell-scheme://path/to/notebook.ipynb#cell{next_cell}"
+                    next_cell += 1
+                    new_uris.append(uri)
+                    opened.append(
+                        types.TextDocumentItem(
+                            uri=uri, language_id="python", version=0, text="new\n"
+                        )
+                    )
+
+            cell_changes.structure = types.NotebookDocumentCellChangeStructure(
+                array=types.NotebookCellArrayChange(
+                    start=start,
+                    delete_count=delete_count,
+                    cells=[
+                        types.NotebookCell(kind=types.NotebookCellKind.Code, document=u)
+                        for u in new_uris
+                    ],
+                ),
+                did_open=opened,
+                did_close=[types.TextDocumentIdentifier(uri=u) for u in removed],
+            )
+        elif uris:
+            uri = rng.choice(uris)
+            cell = workspace.get_text_document(uri)
+            line = rng.randint(0, len(cell.lines))
+            cell_changes.text_content = [
+                types.NotebookDocumentCellContentChanges(
+                    document=types.VersionedTextDocumentIdentifier(
+                        uri=uri, version=version
+                    ),
+                    changes=[
+                        types.TextDocumentContentChangePartial(
+                            range=types.Range(
+                                start=types.Position(line=line, character=0),
+                                end=types.Position(line=line, character=0),
+                            ),
+                            text=rng.choice(["x", "y\n", "\n\n"]),
+                        )
+                    ],
+                )
+            ]
+
+        workspace.update_notebook_document(
+            types.DidChangeNotebookDocumentParams(
+                notebook_document=types.VersionedNotebookDocumentIdentifier(
+                    uri=NOTEBOOK.uri, version=version
+                ),
+                change=types.NotebookDocumentChangeEvent(cells=cell_changes),
+            )
+        )
+        assert document.version == version
+
+        # Compare with the concatenation of the current cells
+        notebook = workspace.get_notebook_document(notebook_uri=NOTEBOOK.uri)
+        expected = []
+        for cell in notebook.cells:
+            source = workspace.get_text_document(cell.document).source
+            if not source.endswith("\n"):
+                source += "\n"
+
+            for line in range(len(source.splitlines())):
+                position = types.Position(line=line, character=0)
+                virtual = types.Position(
+                    line=sum(len(s.splitlines()) for s in expected) + line,
+                    character=0,
+                )
+                assert document.position_from_cell(cell.document, position) == virtual
+                assert document.position_to_cell(virtual) == (cell.document, position)
+
+            expected.append(source)
+
+        assert document.source == "".join(expected)
+
+
+def test_concatenated_notebook_document_reopened(workspace):
+    """Ensure that the concatenated document is recreated when a notebook is
+    reopened."""
+    workspace.put_notebook_document(
+        types.DidOpenNotebookDocumentParams(
+            notebook_document=NOTEBOOK,
+            cell_text_documents=[NB_CELL_1, NB_CELL_2],
+        )
+    )
+    document = workspace.get_concatenated_notebook_document(notebook_uri=NOTEBOOK.uri)
+    assert document.source == "# cell 1\n# cell 2\n"
+
+    workspace.put_notebook_document(
+        types.DidOpenNotebookDocumentParams(
+            notebook_document=types.NotebookDocument(
+                uri=NOTEBOOK.uri,
+                notebook_type="jupyter-notebook",
+                version=1,
+                cells=[
+                    types.NotebookCell(
+                        kind=types.NotebookCellKind.Code, document=NB_CELL_3.uri
+                    ),
+                ],
+            ),
+            cell_text_documents=[NB_CELL_3],
+        )
+    )
+
+    document = workspace.get_concatenated_notebook_document(notebook_uri=NOTEBOOK.uri)
+    assert document.source == "# cell 3\n"
+    assert document.position_to_cell(types.Position(line=0, character=0)) == (
+        NB_CELL_3.uri,
+        types.Position(line=0, character=0),
+    )
+
+
+def test_concatenated_notebook_document_cell_opened(workspace):
+    """Ensure that the concatenated document is updated when a cell that was not
+    open is opened, or changed."""
+    workspace.put_notebook_document(
+        types.DidOpenNotebookDocumentParams(
+            notebook_document=NOTEBOOK,
+            cell_text_documents=[NB_CELL_1],
+        )
+    )
+    document = workspace.get_concatenated_notebook_document(notebook_uri=NOTEBOOK.uri)
+    assert document.source == "# cell 1\n\n"
+
+    workspace.put_text_document(NB_CELL_2, notebook_uri=NOTEBOOK.uri)
+    assert document.source == "# cell 1\n# cell 2\n"
+    assert document.cells[1] is workspace.get_text_document(NB_CELL_2.uri)
+
+    workspace.update_text_document(
+        types.VersionedTextDocumentIdentifier(uri=NB_CELL_2.uri, version=1),
+        types.TextDocumentContentChangeWholeDocument(text="x = 1\ny = 2"),
+    )
+    assert document.source == "# cell 1\nx = 1\ny = 2\n"
+    assert document.position_to_cell(types.Position(line=2, character=0)) == (
+        NB_CELL_2.uri,
+        types.Position(line=1, character=0),
+    )
+
+
+def test_concatenated_notebook_document_lines_are_immutable(workspace):
+    """Ensure that the lines of the concatenated document cannot be modified."""
+    workspace.put_notebook_document(
+        types.DidOpenNotebookDocumentParams(
+            notebook_document=NOTEBOOK,
+            cell_text_documents=[NB_CELL_1, NB_CELL_2],
+        )
+    )
+    document = workspace.get_concatenated_notebook_document(notebook_uri=NOTEBOOK.uri)
+
+    with pytest.raises(TypeError):
+        document.lines[0] = "changed\n"  # type: ignore[index]
+
+    assert document.lines == ("# cell 1\n", "# cell 2\n")
+
+
 def test_workspace_folders():
     wf1 = types.WorkspaceFolder(uri="/ws/f1", name="ws1")
     wf2 = types.WorkspaceFolder(uri="/ws/f2", name="ws2")
@@ -435,6 +876,48 @@ def test_workspace_folders():
     assert workspace.folders["/ws/f2"] is wf2
 
 
+@pytest.mark.parametrize(
+    "uri, expected",
+    [
+        ("file:///ws/f1/a.py", "ws1"),
+        ("file:///ws/f1", "ws1"),
+        ("file:///ws/f1/", "ws1"),
+        ("file:///ws/f10/a.py", None),
+        ("file:///ws/f1/nested/a.py", "nested"),
+        ("file:///ws/f1/nested/deeper/a.py", "nested"),
+        ("file:///ws/f1/nested2/a.py", "ws1"),
+        ("file:///ws/f2/a%20b.py", "ws2"),
+        ("file:///ws/a.py", None),
+        ("untitled:Untitled-1", None),
+    ],
+)
+def test_folder_for(uri, expected):
+    folders = [
+        types.WorkspaceFolder(uri="file:///ws/f1", name="ws1"),
+        types.WorkspaceFolder(uri="file:///ws/f1/nested/", name="nested"),
+        types.WorkspaceFolder(uri="file:///ws/f%32", name="ws2"),
+    ]
+    workspace = Workspace("file:///ws", workspace_folders=folders)
+
+    folder = workspace.folder_for(uri)
+    assert (folder.name if folder else None) == expected
+
+
+def test_folder_for_removed_folder():
+    """Ensure that removed folders are no longer returned."""
+    outer = types.WorkspaceFolder(uri="file:///ws", name="outer")
+    inner = types.WorkspaceFolder(uri="file:///ws/inner", name="inner")
+    workspace = Workspace("file:///ws", workspace_folders=[outer, inner])
+    assert workspace.folder_for("file:///ws/inner/a.py") is inner
+
+    workspace.remove_folder(inner.uri)
+    assert workspace.folder_for("file:///ws/inner/a.py") is outer
+
+    workspace.remove_folder(outer.uri)
+    assert workspace.folder_for("file:///ws/inner/a.py") is None
+    assert workspace._folder_tree.children == {}
+
+
 def test_null_workspace():
     workspace = Workspace(None)
 